@@ -1,28 +1,59 @@
 """Flask application factory."""
+import hmac
+import math
 import os
-from flask import Flask, send_from_directory, jsonify
+import sqlite3
+from flask import Flask, Response, request, send_from_directory, jsonify
 from flask_cors import CORS
 from flask_jwt_extended import JWTManager
 from flask_sqlalchemy import SQLAlchemy
-from flask_migrate import Migrate
 from flask_limiter import Limiter
 from flask_limiter.util import get_remote_address
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
 
 # Initialize extensions
 db = SQLAlchemy()
 jwt = JWTManager()
-migrate = Migrate()
 limiter = Limiter(
     key_func=get_remote_address,
     default_limits=["200 per day", "50 per hour"]
 )
 
 
+@event.listens_for(Engine, 'connect')
+def _enable_sqlite_foreign_keys(dbapi_connection, connection_record):
+    """Enforce foreign keys on SQLite, so ON DELETE CASCADE/SET NULL apply.
+
+    Relationships use passive deletes and leave dependent rows to the
+    database, as on PostgreSQL.
+    """
+    if isinstance(dbapi_connection, sqlite3.Connection):
+        cursor = dbapi_connection.cursor()
+        cursor.execute('PRAGMA foreign_keys=ON')
+        cursor.close()
+        # Builds without SQLITE_ENABLE_MATH_FUNCTIONS lack exp(), used by
+        # the trending snapshot merge
+        dbapi_connection.create_function('exp', 1, math.exp, deterministic=True)
+
+
+def init_migrations(app):
+    """Set up Flask-Migrate on ``app``.
+
+    Importing Flask-Migrate imports Alembic, a large share of start-up
+    time, so this only happens for ``flask db`` commands and migrate.py.
+    """
+    if 'migrate' not in app.extensions:
+        from flask_migrate import Migrate
+        Migrate(app, db)
+
+
 def create_app(config_name=None):
     """Create and configure the Flask application.
 
     Args:
-        config_name: Configuration to use (development, testing, production)
+        config_name: Configuration to use (development, testing,
+            production), or a configuration class
 
     Returns:
         Configured Flask application
@@ -34,14 +65,42 @@ def create_app(config_name=None):
         config_name = os.environ.get('FLASK_ENV', 'development')
 
     from app.config import config
-    app.config.from_object(config[config_name])
+    app.config.from_object(config[config_name] if isinstance(config_name, str) else config_name)
 
     # Initialize extensions
     db.init_app(app)
     jwt.init_app(app)
-    migrate.init_app(app, db)
+    from app.services import ratelimit  # noqa: F401 (registers the sqlite:// and resp:// storages)
     limiter.init_app(app)
 
+    # Initialize in-process services
+    from app.services.trending import trending
+    from app.services.related import related_posts
+    from app.services.autocomplete import tag_index, category_index
+    from app.services.title_index import title_index
+    from app.services.media_upload import upload_slots
+    from app.services.background import background
+    from app.services.metrics import metrics
+    from app.services.query_audit import query_audit
+    from app.services.tracing import tracer
+    from app.services.profiling import profiler
+    from app.services.access_log import access_log
+    from app.services.warmup import warmup
+    trending.init_app(app)
+    related_posts.init_app(app)
+    tag_index.init_app(app)
+    category_index.init_app(app)
+    title_index.init_app(app)
+    upload_slots.init_app(app)
+    background.init_app(app)
+    profiler.init_app(app)
+    warmup.init_app(app)
+    with app.app_context():
+        metrics.init_app(app, db.engine)
+        query_audit.init_app(app, db.engine)
+        tracer.init_app(app, db.engine)
+    access_log.init_app(app)
+
     # CORS configuration
     CORS(app, resources={
         r"/api/*": {
@@ -51,7 +110,7 @@ def create_app(config_name=None):
     })
 
     # Register blueprints
-    from app.routes import auth, posts, users, media, categories, tags, analytics
+    from app.routes import auth, posts, users, media, categories, tags, analytics, admin
 
     app.register_blueprint(auth.bp, url_prefix='/api/auth')
     app.register_blueprint(posts.bp, url_prefix='/api/posts')
@@ -60,12 +119,32 @@ def create_app(config_name=None):
     app.register_blueprint(categories.bp, url_prefix='/api/categories')
     app.register_blueprint(tags.bp, url_prefix='/api/tags')
     app.register_blueprint(analytics.bp, url_prefix='/api/analytics')
+    app.register_blueprint(admin.bp, url_prefix='/api/admin')
+
+    # CLI commands
+    from app.cli import corpus_cli, purge_posts_command, seed_command, warmup_command, MigrateCommands
+    app.cli.add_command(MigrateCommands('db', help='Perform database migrations.'))
+    app.cli.add_command(corpus_cli)
+    app.cli.add_command(seed_command)
+    app.cli.add_command(purge_posts_command)
+    app.cli.add_command(warmup_command)
 
     # Health check endpoint
     @app.route('/api/health')
     def health_check():
         return jsonify({"status": "healthy"}), 200
 
+    # Metrics endpoint (Prometheus text exposition format)
+    @app.route('/api/metrics')
+    @limiter.exempt
+    def metrics_endpoint():
+        if not metrics.enabled:
+            return jsonify({"error": "Not found"}), 404
+        token = app.config['METRICS_TOKEN']
+        if token and not hmac.compare_digest(request.headers.get('Authorization', ''), f'Bearer {token}'):
+            return jsonify({"error": "Unauthorized"}), 401
+        return Response(metrics.render(), mimetype='text/plain; version=0.0.4')
+
     # Serve React frontend for all non-API routes
     @app.route('/', defaults={'path': ''})
     @app.route('/<path:path>')
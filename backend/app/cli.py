@@ -0,0 +1,112 @@
+"""Flask CLI commands."""
+import click
+from flask.cli import AppGroup, ScriptInfo, with_appcontext
+from app.services.corpus import export_posts, import_posts
+from app.services.purge import pending_purges, purge_post
+from app.services.synthetic import SyntheticDataset, seed_database
+from app.services.warmup import warmup
+
+
+class MigrateCommands(click.Group):
+    """``flask db``: Flask-Migrate's commands, loaded when first used.
+
+    Listing or running them sets up Flask-Migrate on the app; other
+    commands and the web workers never import Alembic.
+    """
+
+    def _commands(self, ctx):
+        from flask_migrate.cli import db as commands
+        from app import init_migrations
+
+        init_migrations(ctx.ensure_object(ScriptInfo).load_app())
+        return commands
+
+    def list_commands(self, ctx):
+        return self._commands(ctx).list_commands(ctx)
+
+    def get_command(self, ctx, name):
+        return self._commands(ctx).get_command(ctx, name)
+
+
+corpus_cli = AppGroup('corpus', help='Export and import the post corpus as NDJSON.')
+
+
+@corpus_cli.command('export')
+@click.option('--output', '-o', type=click.File('w', encoding='utf-8'), default='-',
+              help='File to write (default: stdout)')
+@click.option('--batch-size', default=1000, show_default=True, help='Rows fetched per round trip')
+def export_command(output, batch_size):
+    """Write every post, with its author, categories and tags, as NDJSON."""
+    count = 0
+    for line in export_posts(batch_size):
+        output.write(line)
+        count += 1
+    click.echo(f"Exported {count} posts", err=True)
+
+
+@corpus_cli.command('import')
+@click.argument('source', type=click.File('r', encoding='utf-8'))
+@click.option('--batch-size', default=1000, show_default=True, help='Posts inserted per transaction')
+@click.option('--author', help='Username to attribute posts whose author does not exist')
+def import_command(source, batch_size, author):
+    """Import posts from an NDJSON file made by ``flask corpus export``."""
+    try:
+        result = import_posts(source, batch_size=batch_size, default_author=author)
+    except ValueError as e:
+        raise click.BadParameter(str(e), param_hint='--author')
+
+    for error in result['errors']:
+        click.echo(f"line {error['line']}: {error['error']}", err=True)
+    click.echo(f"Imported {result['imported']} posts, skipped {result['skipped']}", err=True)
+
+
+@click.command('seed')
+@click.option('--posts', default=10000, show_default=True)
+@click.option('--tags', default=500, show_default=True)
+@click.option('--categories', default=20, show_default=True, help='Also the number of topics')
+@click.option('--authors', default=50, show_default=True, help='Accounts author1..N, password "password123"')
+@click.option('--views', default=1000000, show_default=True, help='Page view rows')
+@click.option('--published-ratio', default=0.9, show_default=True)
+@click.option('--skew', default=1.0, show_default=True, help='Zipf exponent for popularity and tag use')
+@click.option('--days', default=365, show_default=True, help='History the posts and views span')
+@click.option('--seed', default=42, show_default=True, help='Random seed; equal seeds give equal data')
+@click.option('--batch-size', default=50000, show_default=True, help='Rows per COPY or executemany call')
+@with_appcontext
+def seed_command(posts, tags, categories, authors, views, published_ratio, skew, days, seed, batch_size):
+    """Fill an empty database with a reproducible synthetic blog."""
+    dataset = SyntheticDataset(posts=posts, tags=tags, categories=categories, authors=authors, views=views,
+                               published_ratio=published_ratio, skew=skew, days=days, seed=seed)
+
+    def progress(step, count, seconds):
+        click.echo(f"{step:12} {count:>10} {seconds:8.1f} s", err=True)
+
+    try:
+        counts = seed_database(dataset, batch_size=batch_size, progress=progress)
+    except ValueError as e:
+        raise click.ClickException(str(e))
+    click.echo(f"Seeded {sum(counts.values())} rows", err=True)
+
+
+@click.command('purge-posts')
+@with_appcontext
+def purge_posts_command():
+    """Finish purging deleted posts whose background purge was interrupted."""
+    post_ids = pending_purges()
+    for post_id in post_ids:
+        purge_post(post_id)
+        click.echo(f"Purged post {post_id}", err=True)
+    click.echo(f"Purged {len(post_ids)} posts", err=True)
+
+
+@click.command('warmup')
+@click.option('--budget', type=float, help='Seconds to spend (default: WARMUP_BUDGET)')
+@click.pass_context
+def warmup_command(ctx, budget):
+    """Run the worker warm-up once and report what it loaded."""
+    report = warmup.run(ctx.ensure_object(ScriptInfo).load_app(), budget)
+    for step in report['steps']:
+        details = ', '.join(f'{key} {value}' for key, value in step.items() if key not in ('name', 'status', 'ms'))
+        click.echo(f"{step['name']:10} {step['status']:8} {step['ms']:8.1f} ms  {details}")
+    for name, size in report['caches'].items():
+        click.echo(f"{name:18} {size}")
+    click.echo(f"Warm-up took {report['elapsed_ms']:.0f} ms of {report['budget_ms']:.0f} ms", err=True)
@@ -33,6 +33,37 @@ class Config:
     IMAGEKIT_PRIVATE_KEY = os.environ.get('IMAGEKIT_PRIVATE_KEY')
     IMAGEKIT_PUBLIC_KEY = os.environ.get('IMAGEKIT_PUBLIC_KEY')
     IMAGEKIT_URL_ENDPOINT = os.environ.get('IMAGEKIT_URL_ENDPOINT')
+    IMAGEKIT_UPLOAD_URL = os.environ.get('IMAGEKIT_UPLOAD_URL', 'https://upload.imagekit.io/api/v1/files/upload')
+    IMAGEKIT_API_URL = os.environ.get('IMAGEKIT_API_URL', 'https://api.imagekit.io/v1')
+    IMAGEKIT_FOLDER = os.environ.get('IMAGEKIT_FOLDER')
+
+    # Media uploads (streamed to ImageKit)
+    MEDIA_UPLOAD_CHUNK_SIZE = 64 * 1024  # bytes
+    MEDIA_MAX_UPLOAD_SIZE = int(os.environ.get('MEDIA_MAX_UPLOAD_SIZE', 1024 * 1024 * 1024))  # bytes
+    MEDIA_MAX_CONCURRENT_UPLOADS = int(os.environ.get('MEDIA_MAX_CONCURRENT_UPLOADS', 4))  # per worker
+    MEDIA_UPLOAD_QUEUE_TIMEOUT = 10  # seconds to wait for a free upload slot
+    MEDIA_UPLOAD_TIMEOUT = 300  # seconds for the ImageKit request
+    # Accepted file types, checked against the declared Content-Type and the
+    # type sniffed from the file's first bytes. SVG is left out: it can carry scripts
+    MEDIA_ALLOWED_TYPES = [
+        'image/png', 'image/jpeg', 'image/gif', 'image/webp', 'image/avif', 'image/heic', 'image/bmp',
+        'video/mp4', 'video/webm', 'video/quicktime',
+        'audio/mpeg', 'audio/ogg', 'audio/wav',
+        'application/pdf',
+    ]
+
+    # Media processing (runs in the background worker pool after upload)
+    BACKGROUND_WORKERS = int(os.environ.get('BACKGROUND_WORKERS', os.cpu_count() or 1))
+    MEDIA_VARIANT_WIDTHS = [320, 640, 960, 1280, 1920]
+    MEDIA_PLACEHOLDER_WIDTH = 16  # pixels
+    MEDIA_PROBE_BYTES = 256 * 1024  # ranged fetch when dimensions are not in the upload head
+    MEDIA_FETCH_TIMEOUT = 10  # seconds
+
+    # Responsive image renditions served through ImageKit transformations
+    IMAGE_PROFILES = {
+        'thumbnail': {'widths': [160, 320, 480, 640], 'sizes': '(max-width: 640px) 100vw, 320px', 'quality': 75},
+        'hero': {'widths': [480, 768, 1024, 1440, 1920], 'sizes': '100vw', 'quality': 80},
+    }
 
     # CORS
     CORS_ORIGINS = os.environ.get('CORS_ORIGINS', '*').split(',')
@@ -40,14 +71,112 @@ class Config:
     # Pagination
     POSTS_PER_PAGE = 10
 
+    # Trending posts (exponentially decayed view scores per window)
+    TRENDING_WINDOWS = ['24h', '7d', '30d']
+    TRENDING_SNAPSHOT_INTERVAL = int(os.environ.get('TRENDING_SNAPSHOT_INTERVAL', 300))  # seconds
+    TRENDING_MIN_SCORE = 0.01
+
+    # Related posts (sparse tag/category/TF-IDF similarity)
+    RELATED_POSTS_K = 10
+    RELATED_MAX_TERMS = 16  # TF-IDF terms kept per post
+    RELATED_MAX_POSTINGS = 2000  # features shared by more posts don't generate candidates
+    RELATED_WEIGHTS = {'tags': 1.0, 'categories': 0.5, 'text': 1.0}
+    RELATED_REBUILD_INTERVAL = 3600  # seconds
+    RELATED_PRECOMPUTE = True  # fill every post's top-k list after a rebuild, in the background
+
+    # Tag and category autocomplete
+    AUTOCOMPLETE_MAX_RESULTS = 20
+    AUTOCOMPLETE_REBUILD_INTERVAL = 300  # seconds
+
+    # Post title suggestions (pg_trgm on PostgreSQL, in-process trigram index otherwise)
+    TITLE_SUGGEST_THRESHOLD = 0.6  # pg_trgm.word_similarity_threshold default
+    TITLE_SUGGEST_MAX_CANDIDATES = 500
+    TITLE_SUGGEST_REBUILD_INTERVAL = 300  # seconds
+
+    # Batch post writes
+    POST_BATCH_MAX_SIZE = 500  # operations per request
+
+    # Deletes: posts with at least this many page views are purged in background batches
+    POST_PURGE_VIEW_THRESHOLD = 50000
+    PURGE_BATCH_SIZE = 10000  # rows per transaction
+
+    # Metrics (Prometheus text format at /api/metrics, per worker process).
+    # Production only enables them when METRICS_TOKEN is set
+    METRICS_ENABLED = os.environ.get('METRICS_ENABLED', 'true').lower() == 'true'
+    METRICS_TOKEN = os.environ.get('METRICS_TOKEN')  # if set, scrapes need "Authorization: Bearer <token>"
+
+    # Query audit: flags a statement repeated more than the threshold in one
+    # request (an N+1 loop). Action is 'warn' or 'raise'
+    QUERY_AUDIT_ENABLED = False
+    QUERY_AUDIT_REPEAT_THRESHOLD = int(os.environ.get('QUERY_AUDIT_REPEAT_THRESHOLD', 10))
+    QUERY_AUDIT_ACTION = os.environ.get('QUERY_AUDIT_ACTION', 'warn')
+
+    # Tracing: sampled per request; an incoming traceparent header's sampling
+    # decision is only followed with TRACING_TRUST_INCOMING (set it when only
+    # upstream services or a proxy can set the header). Spans are appended in
+    # batches to a JSONL file, or POSTed as JSONL to a collector when
+    # TRACING_COLLECTOR_URL is set
+    TRACING_ENABLED = os.environ.get('TRACING_ENABLED', 'false').lower() == 'true'
+    TRACING_SAMPLE_RATE = float(os.environ.get('TRACING_SAMPLE_RATE', 0.01))
+    TRACING_TRUST_INCOMING = os.environ.get('TRACING_TRUST_INCOMING', 'false').lower() == 'true'
+    TRACING_EXPORT_PATH = os.environ.get('TRACING_EXPORT_PATH', 'traces.jsonl')
+    TRACING_COLLECTOR_URL = os.environ.get('TRACING_COLLECTOR_URL')
+    TRACING_BATCH_SIZE = 512  # spans per write
+    TRACING_FLUSH_INTERVAL = 5  # seconds
+    TRACING_QUEUE_SIZE = 10000  # spans buffered before new ones are dropped
+
+    # Request profiling: admins get a signed token from POST
+    # /api/admin/profiles/token and send it as an X-Profile-Token header (or
+    # ?_profile=) with their own JWT to profile that request; the token is
+    # bound to the admin who asked for it. PROFILING_SAMPLE_RATE > 0 also
+    # profiles a random share of all requests. Folded stacks are kept in
+    # PROFILING_DIR (default: <instance path>/profiles)
+    PROFILING_ENABLED = os.environ.get('PROFILING_ENABLED', 'true').lower() == 'true'
+    PROFILING_DIR = os.environ.get('PROFILING_DIR')
+    PROFILING_SAMPLE_RATE = float(os.environ.get('PROFILING_SAMPLE_RATE', 0))
+    PROFILING_INTERVAL = 0.005  # seconds between stack samples
+    PROFILING_TOKEN_TTL = 3600  # seconds
+    PROFILING_MAX_STORED = 200  # newest profiles kept
+
+    # Access log: one JSON line per request, written by a background thread
+    # to ACCESS_LOG_PATH (default stdout). Requests are sampled per endpoint
+    # (e.g. {'posts.get_post': 0.05}, default ACCESS_LOG_SAMPLE_RATE); errors
+    # and slow requests are always logged. SQL statement counts are read from
+    # metrics or the query audit, and left null when both are off
+    ACCESS_LOG_ENABLED = os.environ.get('ACCESS_LOG_ENABLED', 'true').lower() == 'true'
+    ACCESS_LOG_PATH = os.environ.get('ACCESS_LOG_PATH')
+    ACCESS_LOG_SAMPLE_RATE = float(os.environ.get('ACCESS_LOG_SAMPLE_RATE', 1.0))
+    ACCESS_LOG_ROUTE_SAMPLE_RATES = {}
+    ACCESS_LOG_SLOW_MS = int(os.environ.get('ACCESS_LOG_SLOW_MS', 1000))
+    ACCESS_LOG_ERROR_STATUS = 500  # statuses from here up are always logged
+    ACCESS_LOG_QUEUE_SIZE = 10000  # records buffered before new ones are dropped
+    ACCESS_LOG_FLUSH_INTERVAL = 0.5  # seconds between writes
+
+    # Warm-up: each gunicorn worker (see gunicorn.conf.py) preloads the first
+    # post list pages, taxonomy lists, trending and most viewed posts and the
+    # suggestion indexes before taking requests, for at most WARMUP_BUDGET
+    # seconds; index builds not done by then finish in the background. Keep
+    # it well under the gunicorn worker timeout (GUNICORN_TIMEOUT, 60 s)
+    WARMUP_ENABLED = os.environ.get('WARMUP_ENABLED', 'true').lower() == 'true'
+    WARMUP_BUDGET = float(os.environ.get('WARMUP_BUDGET', 10))
+    WARMUP_LIST_PAGES = 3
+    WARMUP_TOP_POSTS = 20
+    WARMUP_POOL_CONNECTIONS = 5  # at most the pool size
+
     # Rate Limiting
-    RATELIMIT_STORAGE_URL = os.environ.get('RATELIMIT_STORAGE_URL', 'memory://')
+    # memory:// counts per worker process. With several workers use a shared
+    # store: sqlite:////path/ratelimit.db (one host, SQLite in WAL mode) or
+    # resp://[:password@]host:6379[/db] (any Redis-protocol server)
+    RATELIMIT_STORAGE_URI = os.environ.get('RATELIMIT_STORAGE_URI',
+                                           os.environ.get('RATELIMIT_STORAGE_URL', 'memory://'))
+    RATELIMIT_STRATEGY = 'sliding-window-counter'
 
 
 class DevelopmentConfig(Config):
     """Development configuration."""
     DEBUG = True
     CORS_ORIGINS = ['http://localhost:5173', 'http://localhost:3000']
+    QUERY_AUDIT_ENABLED = True
 
 
 class TestingConfig(Config):
@@ -55,6 +184,9 @@ class TestingConfig(Config):
     TESTING = True
     SQLALCHEMY_DATABASE_URI = 'sqlite:///:memory:'
     WTF_CSRF_ENABLED = False
+    BACKGROUND_WORKERS = 0  # run background jobs inline
+    QUERY_AUDIT_ENABLED = True
+    ACCESS_LOG_ENABLED = False
 
 
 class ProductionConfig(Config):
@@ -69,6 +201,9 @@ class ProductionConfig(Config):
     if not os.environ.get('DOCKER_BUILD') and not os.environ.get('JWT_SECRET_KEY'):
         raise ValueError("JWT_SECRET_KEY environment variable must be set in production")
 
+    # Never expose /api/metrics without a scrape token
+    METRICS_ENABLED = Config.METRICS_ENABLED and bool(Config.METRICS_TOKEN)
+
 
 # Configuration dictionary
 config = {
@@ -4,6 +4,7 @@ from flask import jsonify
 from flask_jwt_extended import get_jwt_identity
 from app.models.user import User
 from app.models.post import Post
+from app.services.tracing import tracer
 
 
 def require_role(*roles):
@@ -19,8 +20,8 @@ def require_role(*roles):
     def decorator(fn):
         @wraps(fn)
         def wrapper(*args, **kwargs):
-            user_id = get_jwt_identity()
-            user = User.query.get(int(user_id))
+            with tracer.span('rbac.require_role', check='user'):
+                user = User.query.get(int(get_jwt_identity()))
 
             if not user:
                 return jsonify({"error": "User not found"}), 401
@@ -53,8 +54,8 @@ def can_edit_post(fn):
     """
     @wraps(fn)
     def wrapper(*args, **kwargs):
-        user_id = get_jwt_identity()
-        user = User.query.get(int(user_id))
+        with tracer.span('rbac.can_edit_post', check='user'):
+            user = User.query.get(int(get_jwt_identity()))
 
         if not user:
             return jsonify({"error": "User not found"}), 401
@@ -68,9 +69,11 @@ def can_edit_post(fn):
         if not post_id:
             return jsonify({"error": "Post ID not provided"}), 400
 
-        post = Post.query.get(post_id)
+        with tracer.span('rbac.can_edit_post', check='post'):
+            post = Post.query.get(post_id)
 
-        if not post:
+        # Posts being purged are already deleted as far as clients are concerned
+        if not post or post.purge_requested_at:
             return jsonify({"error": "Post not found"}), 404
 
         # Admin and Editor can edit any post
@@ -99,8 +102,8 @@ def can_delete_post(fn):
     """
     @wraps(fn)
     def wrapper(*args, **kwargs):
-        user_id = get_jwt_identity()
-        user = User.query.get(int(user_id))
+        with tracer.span('rbac.can_delete_post', check='user'):
+            user = User.query.get(int(get_jwt_identity()))
 
         if not user:
             return jsonify({"error": "User not found"}), 401
@@ -114,9 +117,10 @@ def can_delete_post(fn):
         if not post_id:
             return jsonify({"error": "Post ID not provided"}), 400
 
-        post = Post.query.get(post_id)
+        with tracer.span('rbac.can_delete_post', check='post'):
+            post = Post.query.get(post_id)
 
-        if not post:
+        if not post or post.purge_requested_at:
             return jsonify({"error": "Post not found"}), 404
 
         # Admin can delete any post
@@ -146,8 +150,8 @@ def can_publish_post(fn):
     """
     @wraps(fn)
     def wrapper(*args, **kwargs):
-        user_id = get_jwt_identity()
-        user = User.query.get(int(user_id))
+        with tracer.span('rbac.can_publish_post', check='user'):
+            user = User.query.get(int(get_jwt_identity()))
 
         if not user:
             return jsonify({"error": "User not found"}), 401
@@ -161,9 +165,10 @@ def can_publish_post(fn):
         if not post_id:
             return jsonify({"error": "Post ID not provided"}), 400
 
-        post = Post.query.get(post_id)
+        with tracer.span('rbac.can_publish_post', check='post'):
+            post = Post.query.get(post_id)
 
-        if not post:
+        if not post or post.purge_requested_at:
             return jsonify({"error": "Post not found"}), 404
 
         # Admin and Editor can publish any post
@@ -188,8 +193,8 @@ def authenticated_user(fn):
     """
     @wraps(fn)
     def wrapper(*args, **kwargs):
-        user_id = get_jwt_identity()
-        user = User.query.get(int(user_id))
+        with tracer.span('rbac.authenticated_user', check='user'):
+            user = User.query.get(int(get_jwt_identity()))
 
         if not user:
             return jsonify({"error": "User not found"}), 401
@@ -4,6 +4,6 @@ from app.models.post import Post
 from app.models.media import Media
 from app.models.category import Category, post_categories
 from app.models.tag import Tag, post_tags
-from app.models.analytics import PageView, AutosaveDraft
+from app.models.analytics import PageView, AutosaveDraft, TrendingScore
 
-__all__ = ['User', 'Post', 'Media', 'Category', 'Tag', 'PageView', 'AutosaveDraft', 'post_categories', 'post_tags']
+__all__ = ['User', 'Post', 'Media', 'Category', 'Tag', 'PageView', 'AutosaveDraft', 'TrendingScore', 'post_categories', 'post_tags']
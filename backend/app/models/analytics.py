@@ -25,8 +25,8 @@ class PageView(db.Model):
     viewed_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False, index=True)
 
     # Relationships
-    post = db.relationship('Post', backref=db.backref('views', lazy='dynamic', cascade='all, delete-orphan'))
-    user = db.relationship('User', backref=db.backref('page_views', lazy='dynamic'))
+    post = db.relationship('Post', backref=db.backref('views', lazy='dynamic', cascade='all, delete-orphan', passive_deletes=True))
+    user = db.relationship('User', backref=db.backref('page_views', lazy='dynamic', passive_deletes=True))
 
     def to_dict(self):
         """Convert page view to dictionary.
@@ -67,8 +67,8 @@ class AutosaveDraft(db.Model):
     saved_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, nullable=False)
 
     # Relationships
-    post = db.relationship('Post', backref=db.backref('autosave_drafts', lazy='dynamic', cascade='all, delete-orphan'))
-    user = db.relationship('User', backref=db.backref('autosaves', lazy='dynamic'))
+    post = db.relationship('Post', backref=db.backref('autosave_drafts', lazy='dynamic', cascade='all, delete-orphan', passive_deletes=True))
+    user = db.relationship('User', backref=db.backref('autosaves', lazy='dynamic', passive_deletes=True))
 
     # Constraints: One autosave per post per user
     __table_args__ = (
@@ -91,3 +91,22 @@ class AutosaveDraft(db.Model):
 
     def __repr__(self):
         return f'<AutosaveDraft post_id={self.post_id} user_id={self.user_id}>'
+
+
+class TrendingScore(db.Model):
+    """Snapshot of a post's time-decayed trending score for one window."""
+
+    __tablename__ = 'trending_scores'
+
+    # Composite primary key: one score per window per post
+    window = db.Column(db.String(10), primary_key=True)
+    post_id = db.Column(db.Integer, db.ForeignKey('posts.id', ondelete='CASCADE'), primary_key=True)
+
+    # Decayed score as of updated_at
+    score = db.Column(db.Float, nullable=False)
+
+    # Timestamp
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
+
+    def __repr__(self):
+        return f'<TrendingScore {self.window} post_id={self.post_id} score={self.score:.3f}>'
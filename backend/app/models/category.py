@@ -1,6 +1,7 @@
 """Category model."""
 from datetime import datetime
 from app import db
+from app.services.tracing import tracer
 
 
 # Association table for post-category many-to-many relationship
@@ -27,11 +28,16 @@ class Category(db.Model):
     created_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
 
     # Relationships
-    posts = db.relationship('Post', secondary=post_categories, backref=db.backref('categories', lazy='dynamic'))
+    posts = db.relationship('Post', secondary=post_categories, passive_deletes=True,
+                            backref=db.backref('categories', lazy='dynamic', passive_deletes=True))
 
-    def to_dict(self):
+    @tracer.traced('serialize.category')
+    def to_dict(self, post_count=None):
         """Convert category to dictionary.
 
+        Args:
+            post_count: Number of posts, if already known (counted otherwise)
+
         Returns:
             dict: Category data
         """
@@ -40,7 +46,9 @@ class Category(db.Model):
             'name': self.name,
             'slug': self.slug,
             'description': self.description,
-            'post_count': len(self.posts),
+            'post_count': post_count if post_count is not None else db.session.scalar(
+                db.select(db.func.count()).select_from(post_categories).where(post_categories.c.category_id == self.id)
+            ),
             'created_at': self.created_at.isoformat() if self.created_at else None
         }
 
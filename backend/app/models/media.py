@@ -1,6 +1,7 @@
 """Media model."""
 from datetime import datetime
 from app import db
+from app.services.tracing import tracer
 
 
 class Media(db.Model):
@@ -21,9 +22,15 @@ class Media(db.Model):
     file_size = db.Column(db.Integer)  # in bytes
     width = db.Column(db.Integer)
     height = db.Column(db.Integer)
+    content_hash = db.Column(db.String(64))  # hex SHA-256
+
+    # Filled in by background processing after upload
+    variants = db.Column(db.JSON)  # [{width, url}] resized renditions
+    placeholder = db.Column(db.Text)  # tiny blurred data URI
+    processed_at = db.Column(db.DateTime)
 
     # Uploader relationship
-    uploaded_by = db.Column(db.Integer, db.ForeignKey('users.id', ondelete='SET NULL'), index=True)
+    uploaded_by = db.Column(db.Integer, db.ForeignKey('users.id', ondelete='SET NULL'))
 
     # Accessibility
     alt_text = db.Column(db.String(255))
@@ -31,5 +38,40 @@ class Media(db.Model):
     # Timestamp
     created_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
 
+    # Indexes: media library listing (keyset pagination per uploader) and
+    # upload deduplication, which only matches the uploader's own files
+    __table_args__ = (
+        db.Index('ix_media_uploaded_by_created_at_id', 'uploaded_by', 'created_at', 'id'),
+        db.Index('ix_media_uploaded_by_content_hash', 'uploaded_by', 'content_hash', unique=True),
+    )
+
+    # Columns returned by library listings
+    LIST_COLUMNS = ('id', 'filename', 'imagekit_url', 'file_type', 'file_size',
+                    'width', 'height', 'placeholder', 'created_at')
+
+    @tracer.traced('serialize.media')
+    def to_dict(self):
+        """Convert media to dictionary.
+
+        Returns:
+            dict: Media data
+        """
+        return {
+            'id': self.id,
+            'filename': self.filename,
+            'url': self.imagekit_url,
+            'file_type': self.file_type,
+            'file_size': self.file_size,
+            'content_hash': self.content_hash,
+            'width': self.width,
+            'height': self.height,
+            'variants': self.variants or [],
+            'placeholder': self.placeholder,
+            'processed': self.processed_at is not None,
+            'alt_text': self.alt_text,
+            'uploaded_by': self.uploaded_by,
+            'created_at': self.created_at.isoformat() if self.created_at else None
+        }
+
     def __repr__(self):
         return f'<Media {self.filename}>'
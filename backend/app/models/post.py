@@ -1,6 +1,8 @@
 """Post model."""
 from datetime import datetime
 from app import db
+from app.services.tracing import tracer
+from app.utils.images import responsive_image
 
 
 class Post(db.Model):
@@ -28,6 +30,7 @@ class Post(db.Model):
     published_at = db.Column(db.DateTime, index=True)
     created_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
     updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, nullable=False)
+    purge_requested_at = db.Column(db.DateTime)  # deleted, page views still being purged
 
     # Analytics
     view_count = db.Column(db.Integer, default=0, nullable=False)
@@ -53,21 +56,35 @@ class Post(db.Model):
         """Increment the view count."""
         self.view_count += 1
 
-    def to_dict(self, include_content=True):
+    @tracer.traced('serialize.post')
+    def to_dict(self, include_content=True, image_profile=None, links=None):
         """Convert post to dictionary.
 
         Args:
             include_content: Whether to include full content (False for list views)
+            image_profile: Featured image rendition profile; defaults to
+                'hero' with content and 'thumbnail' without
+            links: Preloaded {'categories': [...], 'tags': [...]} (see
+                ``to_dicts``); queried for this post when omitted
 
         Returns:
             dict: Post data
         """
+        if image_profile is None:
+            image_profile = 'hero' if include_content else 'thumbnail'
+        if links is None:
+            links = {
+                'categories': [{'id': c.id, 'name': c.name, 'slug': c.slug} for c in self.categories],
+                'tags': [{'id': t.id, 'name': t.name, 'slug': t.slug} for t in self.tags],
+            }
+
         data = {
             'id': self.id,
             'title': self.title,
             'slug': self.slug,
             'excerpt': self.excerpt,
             'featured_image_url': self.featured_image_url,
+            'featured_image': responsive_image(self.featured_image_url, image_profile),
             'author': {
                 'id': self.author.id,
                 'username': self.author.username,
@@ -78,8 +95,8 @@ class Post(db.Model):
             'published_at': self.published_at.isoformat() if self.published_at else None,
             'created_at': self.created_at.isoformat() if self.created_at else None,
             'updated_at': self.updated_at.isoformat() if self.updated_at else None,
-            'categories': [{'id': c.id, 'name': c.name, 'slug': c.slug} for c in self.categories],
-            'tags': [{'id': t.id, 'name': t.name, 'slug': t.slug} for t in self.tags]
+            'categories': links['categories'],
+            'tags': links['tags']
         }
 
         if include_content:
@@ -87,5 +104,46 @@ class Post(db.Model):
 
         return data
 
+    @staticmethod
+    def to_dicts(posts, include_content=False, image_profile=None):
+        """Convert a page of posts to dictionaries.
+
+        Authors, categories and tags are loaded with one IN query each for
+        the whole page, instead of per post.
+
+        Args:
+            posts: Post instances
+            include_content: Whether to include full content
+            image_profile: Featured image rendition profile (see ``to_dict``)
+
+        Returns:
+            list: Post data, in the order of ``posts``
+        """
+        from app.models.category import Category, post_categories
+        from app.models.tag import Tag, post_tags
+        from app.models.user import User
+
+        post_ids = [post.id for post in posts]
+        if not post_ids:
+            return []
+
+        # Kept referenced so post.author finds them in the identity map
+        authors = User.query.filter(User.id.in_({post.author_id for post in posts})).all()  # noqa: F841
+
+        links = {post_id: {'categories': [], 'tags': []} for post_id in post_ids}
+        for key, table, column, model in (
+            ('categories', post_categories, 'category_id', Category),
+            ('tags', post_tags, 'tag_id', Tag),
+        ):
+            rows = db.session.execute(
+                db.select(table.c.post_id, model.id, model.name, model.slug)
+                .join(model, model.id == table.c[column])
+                .where(table.c.post_id.in_(post_ids))
+            )
+            for post_id, term_id, name, slug in rows:
+                links[post_id][key].append({'id': term_id, 'name': name, 'slug': slug})
+
+        return [post.to_dict(include_content, image_profile, links[post.id]) for post in posts]
+
     def __repr__(self):
         return f'<Post {self.title}>'
@@ -1,6 +1,7 @@
 """Tag model."""
 from datetime import datetime
 from app import db
+from app.services.tracing import tracer
 
 
 # Association table for post-tag many-to-many relationship
@@ -26,11 +27,16 @@ class Tag(db.Model):
     created_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
 
     # Relationships
-    posts = db.relationship('Post', secondary=post_tags, backref=db.backref('tags', lazy='dynamic'))
+    posts = db.relationship('Post', secondary=post_tags, passive_deletes=True,
+                            backref=db.backref('tags', lazy='dynamic', passive_deletes=True))
 
-    def to_dict(self):
+    @tracer.traced('serialize.tag')
+    def to_dict(self, post_count=None):
         """Convert tag to dictionary.
 
+        Args:
+            post_count: Number of posts, if already known (counted otherwise)
+
         Returns:
             dict: Tag data
         """
@@ -38,7 +44,9 @@ class Tag(db.Model):
             'id': self.id,
             'name': self.name,
             'slug': self.slug,
-            'post_count': len(self.posts),
+            'post_count': post_count if post_count is not None else db.session.scalar(
+                db.select(db.func.count()).select_from(post_tags).where(post_tags.c.tag_id == self.id)
+            ),
             'created_at': self.created_at.isoformat() if self.created_at else None
         }
 
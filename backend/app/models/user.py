@@ -2,6 +2,7 @@
 from datetime import datetime
 from werkzeug.security import generate_password_hash, check_password_hash
 from app import db
+from app.services.tracing import tracer
 
 
 class User(db.Model):
@@ -34,8 +35,8 @@ class User(db.Model):
     last_login = db.Column(db.DateTime)
 
     # Relationships
-    posts = db.relationship('Post', backref='author', lazy='dynamic', cascade='all, delete-orphan')
-    media = db.relationship('Media', backref='uploader', lazy='dynamic')
+    posts = db.relationship('Post', backref='author', lazy='dynamic', cascade='all, delete-orphan', passive_deletes=True)
+    media = db.relationship('Media', backref='uploader', lazy='dynamic', passive_deletes=True)
 
     # Constraints
     __table_args__ = (
@@ -95,6 +96,7 @@ class User(db.Model):
         """Check if user is an author (or higher)."""
         return self.role in ['admin', 'editor', 'author']
 
+    @tracer.traced('serialize.user')
     def to_dict(self, include_email=False):
         """Convert user to dictionary.
 
@@ -0,0 +1,107 @@
+"""Admin routes."""
+from flask import Blueprint, Response, request, jsonify, stream_with_context
+from flask_jwt_extended import jwt_required
+from marshmallow import Schema, fields, validate, ValidationError
+from app.middleware.rbac import require_role
+from app.services.corpus import export_posts, import_posts
+from app.services.profiling import profiler, MODES, TOKEN_HEADER, TOKEN_PARAM
+
+bp = Blueprint('admin', __name__)
+
+
+class ProfileTokenSchema(Schema):
+    """Schema for requesting a profiling token."""
+    mode = fields.Str(load_default='sample', validate=validate.OneOf(MODES))
+
+
+@bp.route('/corpus/export', methods=['GET'])
+@jwt_required()
+@require_role('admin')
+def export_corpus(current_user):
+    """Stream every post as NDJSON (admin only)."""
+    return Response(
+        stream_with_context(export_posts()),
+        mimetype='application/x-ndjson',
+        headers={'Content-Disposition': 'attachment; filename=posts.ndjson'}
+    )
+
+
+@bp.route('/corpus/import', methods=['POST'])
+@jwt_required()
+@require_role('admin')
+def import_corpus(current_user):
+    """Import posts from an NDJSON request body (admin only).
+
+    The body is read line by line, so it can be arbitrarily large.
+
+    Query params:
+        - author: username for posts whose author does not exist
+    """
+    try:
+        result = import_posts(request.stream, default_author=request.args.get('author'))
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
+    return jsonify({
+        "message": f"Imported {result['imported']} posts",
+        **result
+    }), 200
+
+
+@bp.route('/profiles/token', methods=['POST'])
+@jwt_required()
+@require_role('admin')
+def create_profile_token(current_user):
+    """Issue a signed token that profiles the requests carrying it (admin only).
+
+    Send it as the X-Profile-Token header or the ``_profile`` query
+    parameter, along with your own access token: it only profiles your
+    requests. The response then has an X-Profile-Id header naming the
+    stored profile.
+
+    Request body:
+        - mode: 'sample' (stack sampling, default) or 'trace' (every call)
+    """
+    if not profiler.enabled:
+        return jsonify({"error": "Profiling is disabled"}), 404
+    try:
+        data = ProfileTokenSchema().load(request.get_json(silent=True) or {})
+    except ValidationError as err:
+        return jsonify({"error": "Validation failed", "messages": err.messages}), 400
+
+    return jsonify({
+        "token": profiler.issue_token(data['mode'], current_user.id),
+        "mode": data['mode'],
+        "header": TOKEN_HEADER,
+        "query_param": TOKEN_PARAM,
+        "expires_in": profiler.token_ttl
+    }), 201
+
+
+@bp.route('/profiles', methods=['GET'])
+@jwt_required()
+@require_role('admin')
+def list_profiles(current_user):
+    """List stored request profiles, newest first (admin only).
+
+    Query params:
+        - limit: maximum profiles (default 50, max 500)
+    """
+    limit = min(max(request.args.get('limit', 50, type=int), 1), 500)
+    return jsonify({"profiles": profiler.list_profiles(limit)}), 200
+
+
+@bp.route('/profiles/<profile_id>', methods=['GET'])
+@jwt_required()
+@require_role('admin')
+def get_profile(current_user, profile_id):
+    """Download a profile as folded stacks (admin only).
+
+    One ``frame;frame;frame weight`` line per stack, ready for
+    flamegraph.pl, speedscope or inferno.
+    """
+    folded = profiler.folded(profile_id)
+    if folded is None:
+        return jsonify({"error": "Profile not found"}), 404
+    return Response(folded, mimetype='text/plain',
+                    headers={'Content-Disposition': f'attachment; filename={profile_id}.folded'})
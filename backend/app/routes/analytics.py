@@ -1,7 +1,48 @@
 """Analytics routes."""
-from flask import Blueprint
+from flask import Blueprint, request, jsonify
+from app.models.post import Post
+from app.services.trending import trending
 
 bp = Blueprint('analytics', __name__)
 
-# Routes will be implemented here
 
+@bp.route('/popular', methods=['GET'])
+def popular_posts():
+    """Get trending posts ranked by time-decayed views (public).
+
+    Query params:
+        - window: scoring window, one of TRENDING_WINDOWS (default: 24h)
+        - limit: number of posts (default: 10, max 50)
+    """
+    window = request.args.get('window', '24h')
+    limit = min(max(request.args.get('limit', 10, type=int), 1), 50)
+
+    if window not in trending.windows:
+        return jsonify({
+            "error": "Invalid window",
+            "allowed_windows": list(trending.windows)
+        }), 400
+
+    # Drafts stay ranked until they are forgotten, so fetch more of the
+    # ranking until enough published posts are found
+    fetch = limit * 2
+    while True:
+        ranked = trending.top(window, fetch)
+        scores = dict(ranked)
+        posts = Post.query.filter(
+            Post.id.in_(list(scores)),
+            Post.status == 'published'
+        ).all() if scores else []
+        if len(posts) >= limit or len(ranked) < fetch:
+            break
+        fetch *= 4
+    posts.sort(key=lambda post: scores[post.id], reverse=True)
+    posts = posts[:limit]
+
+    return jsonify({
+        'window': window,
+        'posts': [
+            dict(data, trending_score=round(scores[post.id], 4))
+            for post, data in zip(posts, Post.to_dicts(posts))
+        ]
+    }), 200
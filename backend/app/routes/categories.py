@@ -4,8 +4,11 @@ from flask_jwt_extended import jwt_required
 from marshmallow import Schema, fields, validate, ValidationError
 from slugify import slugify
 from app import db
-from app.models.category import Category
+from app.models.category import Category, post_categories
 from app.middleware.rbac import require_role, authenticated_user
+from app.services.associations import unknown_ids
+from app.services.autocomplete import category_index
+from app.services.taxonomy import merge_terms, apply_merge
 
 bp = Blueprint('categories', __name__)
 
@@ -17,13 +20,50 @@ class CategorySchema(Schema):
     description = fields.Str()
 
 
+class CategoryMergeSchema(Schema):
+    """Schema for merging categories into another."""
+    source_ids = fields.List(fields.Int(), required=True, validate=validate.Length(min=1, max=1000))
+    name = fields.Str(validate=validate.Length(min=1, max=100))
+
+
+def _unique_slug(name, category_id):
+    """Slug for a renamed category, suffixed if another category has it."""
+    base_slug = slugify(name)
+    slug = base_slug
+    counter = 1
+    while Category.query.filter(Category.slug == slug, Category.id != category_id).first():
+        slug = f"{base_slug}-{counter}"
+        counter += 1
+    return slug
+
+
 @bp.route('', methods=['GET'])
 def list_categories():
     """Get all categories (public)."""
     categories = Category.query.order_by(Category.name).all()
+    # Post counts for every category in one grouped query
+    counts = dict(db.session.execute(
+        db.select(post_categories.c.category_id, db.func.count()).group_by(post_categories.c.category_id)
+    ).all())
+
+    return jsonify({
+        'categories': [category.to_dict(post_count=counts.get(category.id, 0)) for category in categories]
+    }), 200
+
+
+@bp.route('/suggest', methods=['GET'])
+def suggest_categories():
+    """Autocomplete categories by name or slug prefix (public).
+
+    Query params:
+        - q: text typed so far
+        - limit: number of suggestions (default: 10, max 20)
+    """
+    query = request.args.get('q', '')
+    limit = max(request.args.get('limit', 10, type=int), 1)
 
     return jsonify({
-        'categories': [category.to_dict() for category in categories]
+        'suggestions': category_index.suggest(query, limit) if query.strip() else []
     }), 200
 
 
@@ -65,6 +105,7 @@ def create_category(current_user):
     try:
         db.session.add(category)
         db.session.commit()
+        category_index.add(category.id, category.name, category.slug, 0)
 
         return jsonify({
             "message": "Category created successfully",
@@ -90,13 +131,7 @@ def update_category(id, current_user):
 
     # Update slug if name changed
     if data['name'] != category.name:
-        base_slug = slugify(data['name'])
-        slug = base_slug
-        counter = 1
-        while Category.query.filter(Category.slug == slug, Category.id != id).first():
-            slug = f"{base_slug}-{counter}"
-            counter += 1
-        category.slug = slug
+        category.slug = _unique_slug(data['name'], id)
 
     category.name = data['name']
     if 'description' in data:
@@ -104,6 +139,7 @@ def update_category(id, current_user):
 
     try:
         db.session.commit()
+        category_index.add(category.id, category.name, category.slug)
         return jsonify({
             "message": "Category updated successfully",
             "category": category.to_dict()
@@ -123,7 +159,56 @@ def delete_category(id, current_user):
     try:
         db.session.delete(category)
         db.session.commit()
+        category_index.remove(id)
         return jsonify({"message": "Category deleted successfully"}), 200
     except Exception as e:
         db.session.rollback()
         return jsonify({"error": "Failed to delete category"}), 500
+
+
+@bp.route('/<int:id>/merge', methods=['POST'])
+@jwt_required()
+@require_role('admin')
+def merge_categories(id, current_user):
+    """Merge categories into this one (admin only).
+
+    Every post linked to a source category is linked to this category instead and
+    the sources are deleted, all in one transaction.
+
+    Request body:
+        - source_ids: ids of the categories to merge in
+        - name: optional new name for this category
+    """
+    category = Category.query.get_or_404(id)
+
+    try:
+        schema = CategoryMergeSchema()
+        data = schema.load(request.json)
+    except ValidationError as err:
+        return jsonify({"error": "Validation failed", "messages": err.messages}), 400
+
+    missing = unknown_ids(Category, data['source_ids'])
+    if missing:
+        return jsonify({
+            "error": "Validation failed",
+            "messages": {"source_ids": [f"Unknown ids: {', '.join(map(str, missing))}"]}
+        }), 400
+
+    try:
+        result = merge_terms(Category, category, data['source_ids'])
+        # Source slugs are free once the merge has deleted them
+        if 'name' in data and data['name'] != category.name:
+            category.slug = _unique_slug(data['name'], id)
+            category.name = data['name']
+        db.session.commit()
+        apply_merge(Category, category, result)
+        category_index.add(category.id, category.name, category.slug)
+        return jsonify({
+            "message": f"Merged {len(result['merged'])} categories into {category.name}",
+            "merged_ids": result['merged'],
+            "posts_relinked": result['linked'],
+            "category": category.to_dict()
+        }), 200
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({"error": "Failed to merge categories"}), 500
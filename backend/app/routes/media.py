@@ -1,7 +1,254 @@
 """Media routes."""
-from flask import Blueprint
+import os
+from flask import Blueprint, request, jsonify, current_app
+from flask_jwt_extended import jwt_required
+from sqlalchemy.exc import IntegrityError
+from werkzeug.http import parse_options_header
+from app import db
+from app.models.media import Media
+from app.middleware.rbac import authenticated_user
+from app.services.background import background
+from app.services.imagekit import upload_stream, delete_file, ImageKitError
+from app.services.media_processing import schedule_processing
+from app.services.media_upload import (
+    upload_slots, StreamStats, MultipartUpload, UploadTooLarge, UnsupportedType, iter_raw, normalize_sha256
+)
+from app.utils.pagination import encode_cursor, decode_cursor, escape_like
 
 bp = Blueprint('media', __name__)
 
-# Routes will be implemented here
 
+@bp.route('', methods=['GET'])
+@jwt_required()
+@authenticated_user
+def list_media(current_user):
+    """List a user's media library, newest first (authenticated).
+
+    Uses keyset pagination on (uploaded_by, created_at, id), so every page
+    is an index range scan no matter how deep the cursor is.
+
+    Query params:
+        - cursor: next_cursor from the previous page
+        - limit: items per page (default: 50, max 100)
+        - type: file_type prefix, e.g. ``image/`` or ``video/mp4``
+        - q: filename prefix (case-insensitive)
+        - uploaded_by: user id (admins only; defaults to the current user)
+    """
+    limit = min(max(request.args.get('limit', 50, type=int), 1), 100)
+
+    uploader_id = request.args.get('uploaded_by', current_user.id, type=int)
+    if uploader_id != current_user.id and not current_user.is_admin():
+        return jsonify({"error": "Insufficient permissions"}), 403
+
+    query = db.select(*(getattr(Media, column) for column in Media.LIST_COLUMNS)).where(
+        Media.uploaded_by == uploader_id
+    )
+
+    cursor = request.args.get('cursor')
+    if cursor:
+        position = decode_cursor(cursor)
+        if position is None:
+            return jsonify({"error": "Invalid cursor"}), 400
+        query = query.where(db.tuple_(Media.created_at, Media.id) < position)
+
+    file_type = request.args.get('type')
+    if file_type:
+        query = query.where(Media.file_type.like(f'{escape_like(file_type)}%', escape='\\'))
+
+    prefix = request.args.get('q')
+    if prefix:
+        query = query.where(Media.filename.ilike(f'{escape_like(prefix)}%', escape='\\'))
+
+    rows = db.session.execute(
+        query.order_by(Media.created_at.desc(), Media.id.desc()).limit(limit + 1)
+    ).all()
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+
+    return jsonify({
+        'media': [{
+            'id': row.id,
+            'filename': row.filename,
+            'url': row.imagekit_url,
+            'file_type': row.file_type,
+            'file_size': row.file_size,
+            'width': row.width,
+            'height': row.height,
+            'placeholder': row.placeholder,
+            'created_at': row.created_at.isoformat()
+        } for row in rows],
+        'next_cursor': encode_cursor(rows[-1].created_at, rows[-1].id) if has_more else None
+    }), 200
+
+
+@bp.route('', methods=['POST'])
+@jwt_required()
+@authenticated_user
+def upload_media(current_user):
+    """Upload a file to ImageKit (authenticated users only).
+
+    The body is streamed to ImageKit as it arrives, never buffered whole.
+    Accepts either multipart/form-data with a ``file`` field (plus an
+    optional ``alt_text`` field), or the raw file as the request body with
+    the name in the ``filename`` query param or ``X-Filename`` header.
+
+    Uploads are deduplicated by SHA-256 among the uploader's own files. If
+    the client sends the digest in ``X-Content-SHA256`` and the user already
+    stored the file, the existing media is returned without reading the body. Otherwise the digest is computed
+    while streaming, and a duplicate found afterwards is dropped from
+    ImageKit in favour of the existing copy. Duplicates answer 200 with
+    ``"duplicate": true`` instead of 201.
+
+    Only MEDIA_ALLOWED_TYPES are accepted (415 otherwise). The declared
+    type is checked up front and the type sniffed from the file's first
+    bytes before the rest is streamed; the stored ``file_type`` is the
+    sniffed one.
+    """
+    config = current_app.config
+
+    claimed_hash = normalize_sha256(request.headers.get('X-Content-SHA256'))
+    if claimed_hash:
+        existing = Media.query.filter_by(uploaded_by=current_user.id, content_hash=claimed_hash).first()
+        if existing:
+            return _duplicate_response(existing)
+
+    chunk_size = config['MEDIA_UPLOAD_CHUNK_SIZE']
+    mimetype, options = parse_options_header(request.headers.get('Content-Type', ''))
+
+    # Set up the incoming file stream
+    if mimetype == 'multipart/form-data':
+        if 'boundary' not in options:
+            return jsonify({"error": "Missing multipart boundary"}), 400
+        source = MultipartUpload(request.stream, options['boundary'], chunk_size)
+        if not source.open():
+            return jsonify({"error": "No file provided"}), 400
+        filename = source.filename
+        declared_type = source.content_type
+        fields = source.fields
+    else:
+        source = iter_raw(request.stream, chunk_size)
+        filename = request.args.get('filename') or request.headers.get('X-Filename')
+        declared_type = mimetype or None
+        fields = request.args
+
+    filename = os.path.basename(filename or '').strip()
+    if not filename:
+        return jsonify({"error": "Filename is required"}), 400
+
+    allowed_types = config['MEDIA_ALLOWED_TYPES']
+    declared_type = parse_options_header(declared_type or '')[0].lower() or None
+    # Generic types say nothing about the file; its content is checked either way
+    if declared_type not in (None, 'application/octet-stream') and declared_type not in allowed_types:
+        return jsonify({"error": f"Unsupported file type: {declared_type}"}), 415
+
+    if not upload_slots.acquire(timeout=config['MEDIA_UPLOAD_QUEUE_TIMEOUT']):
+        return jsonify({"error": "Too many uploads in progress, try again shortly"}), 503
+
+    stats = StreamStats(source, max_size=config['MEDIA_MAX_UPLOAD_SIZE'], allowed_types=allowed_types)
+    try:
+        result = upload_stream(stats, filename, declared_type, folder=config.get('IMAGEKIT_FOLDER'))
+    except UploadTooLarge as e:
+        return jsonify({"error": str(e)}), 413
+    except UnsupportedType as e:
+        return jsonify({"error": str(e)}), 415
+    except ImageKitError as e:
+        current_app.logger.warning("ImageKit upload failed: %s", e)
+        return jsonify({"error": "Upload failed"}), 502
+    finally:
+        upload_slots.release()
+
+    if isinstance(source, MultipartUpload):
+        source.finish()
+
+    if stats.mime_type not in allowed_types:
+        # ImageKit answered before the stream (and its type check) was read through
+        background.submit(delete_file, result['fileId'])
+        return jsonify({"error": f"Unsupported file type: {stats.mime_type or 'unrecognised'}"}), 415
+
+    content_hash = stats.sha256
+    existing = Media.query.filter_by(uploaded_by=current_user.id, content_hash=content_hash).first()
+    if existing:
+        background.submit(delete_file, result['fileId'])
+        return _duplicate_response(existing)
+
+    media = Media(
+        filename=filename,
+        imagekit_file_id=result['fileId'],
+        imagekit_url=result['url'],
+        file_type=stats.mime_type,
+        file_size=stats.size,
+        content_hash=content_hash,
+        width=result.get('width'),
+        height=result.get('height'),
+        uploaded_by=current_user.id,
+        alt_text=(fields.get('alt_text') or None)
+    )
+
+    try:
+        db.session.add(media)
+        db.session.commit()
+
+        # Dimensions, variants and placeholder are filled in afterwards
+        schedule_processing(media, stats.head)
+
+        return jsonify({
+            "message": "File uploaded successfully",
+            "media": media.to_dict()
+        }), 201
+    except IntegrityError:
+        # The same file finished uploading concurrently
+        db.session.rollback()
+        existing = Media.query.filter_by(uploaded_by=current_user.id, content_hash=content_hash).first()
+        if existing is None:
+            return jsonify({"error": "Failed to save media"}), 500
+        background.submit(delete_file, result['fileId'])
+        return _duplicate_response(existing)
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({"error": "Failed to save media"}), 500
+
+
+def _duplicate_response(media):
+    return jsonify({
+        "message": "File already uploaded",
+        "duplicate": True,
+        "media": media.to_dict()
+    }), 200
+
+
+@bp.route('/check', methods=['POST'])
+@jwt_required()
+@authenticated_user
+def check_media(current_user):
+    """Check whether the current user already stored a file, before uploading it.
+
+    Expected JSON:
+        {
+            "sha256": "hex digest of the file"
+        }
+    """
+    data = request.get_json(silent=True) or {}
+    content_hash = normalize_sha256(data.get('sha256'))
+    if not content_hash:
+        return jsonify({"error": "sha256 must be a hex SHA-256 digest"}), 400
+
+    media = Media.query.filter_by(uploaded_by=current_user.id, content_hash=content_hash).first()
+
+    return jsonify({
+        'exists': media is not None,
+        'media': media.to_dict() if media else None
+    }), 200
+
+
+@bp.route('/<int:id>', methods=['GET'])
+@jwt_required()
+@authenticated_user
+def get_media(current_user, id):
+    """Get a single media item (uploader or admin)."""
+    media = Media.query.get_or_404(id)
+    if media.uploaded_by != current_user.id and not current_user.is_admin():
+        return jsonify({"error": "Media not found"}), 404
+
+    return jsonify({
+        'media': media.to_dict()
+    }), 200
@@ -1,15 +1,24 @@
 """Posts routes."""
-from flask import Blueprint, request, jsonify
+from flask import Blueprint, request, jsonify, current_app
 from flask_jwt_extended import jwt_required, get_jwt_identity
 from marshmallow import Schema, fields, validate, ValidationError
-from slugify import slugify
 from datetime import datetime
 from app import db, limiter
 from app.models.post import Post
-from app.models.category import Category
-from app.models.tag import Tag
+from app.models.category import Category, post_categories
+from app.models.tag import Tag, post_tags
 from app.models.analytics import AutosaveDraft, PageView
 from app.middleware.rbac import authenticated_user, can_edit_post, can_delete_post, can_publish_post
+from app.services.associations import unknown_ids, ensure_tags, sync_links
+from app.services.autocomplete import tag_index, category_index
+from app.services.background import background
+from app.services.facets import facet_counts
+from app.services.post_batch import PostBatch
+from app.services.purge import purge_post
+from app.services.related import related_posts
+from app.services.title_index import title_index, suggest_titles
+from app.services.trending import trending
+from app.utils.slugs import allocate_slug
 
 bp = Blueprint('posts', __name__)
 
@@ -23,6 +32,7 @@ class PostCreateSchema(Schema):
     featured_image_url = fields.Url()
     category_ids = fields.List(fields.Int())
     tag_ids = fields.List(fields.Int())
+    tag_names = fields.List(fields.Str(validate=validate.Length(min=1, max=50)))
     status = fields.Str(validate=validate.OneOf(['draft', 'published']))
 
 
@@ -34,15 +44,83 @@ class PostUpdateSchema(Schema):
     featured_image_url = fields.Url()
     category_ids = fields.List(fields.Int())
     tag_ids = fields.List(fields.Int())
+    tag_names = fields.List(fields.Str(validate=validate.Length(min=1, max=50)))
     status = fields.Str(validate=validate.OneOf(['draft', 'published']))
 
 
+class PostTagsSchema(Schema):
+    """Schema for assigning categories and tags to a post."""
+    category_ids = fields.List(fields.Int())
+    tag_ids = fields.List(fields.Int())
+    tag_names = fields.List(fields.Str(validate=validate.Length(min=1, max=50)))
+    mode = fields.Str(validate=validate.OneOf(['add', 'replace']), load_default='add')
+
+
+class BatchSchema(Schema):
+    """Schema for a batch of post operations."""
+    operations = fields.List(fields.Dict(), required=True, validate=validate.Length(min=1))
+    atomic = fields.Bool(load_default=False)
+
+
+# Operation name -> (schema for its data, whether it targets an existing post)
+BATCH_OPERATIONS = {
+    'create': (PostCreateSchema, False),
+    'update': (PostUpdateSchema, True),
+    'publish': (None, True),
+    'tag': (PostTagsSchema, True),
+}
+
+
 class AutosaveSchema(Schema):
     """Schema for autosaving post content."""
     title = fields.Str(validate=validate.Length(max=255))
     content = fields.Str(required=True)
 
 
+def _unknown_association_ids(data):
+    """Validation messages for category/tag ids that do not exist."""
+    messages = {}
+    for field, model in (('category_ids', Category), ('tag_ids', Tag)):
+        missing = unknown_ids(model, data.get(field, ()))
+        if missing:
+            messages[field] = [f"Unknown ids: {', '.join(map(str, missing))}"]
+    return messages
+
+
+def _sync_associations(post_id, data, is_new=False):
+    """Apply category_ids/tag_ids/tag_names from request data to a post.
+
+    ``tag_names`` are created as needed and combined with ``tag_ids``;
+    giving either replaces the post's tags.
+
+    Returns:
+        dict: field -> (added ids, removed ids), plus 'created_tags'
+    """
+    changes = {'created_tags': []}
+    if 'category_ids' in data:
+        changes['category_ids'] = sync_links(
+            post_categories, 'category_id', post_id, data['category_ids'], set() if is_new else None
+        )
+    if 'tag_ids' in data or 'tag_names' in data:
+        tag_ids = list(data.get('tag_ids', []))
+        if data.get('tag_names'):
+            named_ids, changes['created_tags'] = ensure_tags(data['tag_names'])
+            tag_ids.extend(named_ids.values())
+        changes['tag_ids'] = sync_links(post_tags, 'tag_id', post_id, tag_ids, set() if is_new else None)
+    return changes
+
+
+def _apply_association_counts(changes):
+    """Update the autocomplete indexes after ``_sync_associations`` commits."""
+    for tag_id, name, slug in changes['created_tags']:
+        tag_index.add(tag_id, name, slug, 0)
+    for field, index in (('category_ids', category_index), ('tag_ids', tag_index)):
+        if field in changes:
+            added, removed = changes[field]
+            index.adjust_counts(added, 1)
+            index.adjust_counts(removed, -1)
+
+
 @bp.route('', methods=['GET'])
 def list_posts():
     """Get list of posts (public for published, authenticated for drafts).
@@ -52,7 +130,9 @@ def list_posts():
         - category: category slug
         - tag: tag slug
         - author: author username
+        - month: publication month (YYYY-MM)
         - search: search query
+        - facets: if true, include per-category/tag/author/month counts
         - page: page number (default: 1)
         - per_page: posts per page (default: 10)
     """
@@ -64,8 +144,8 @@ def list_posts():
     except:
         user_id = None
 
-    # Build query
-    query = Post.query
+    # Build query (posts being purged are already deleted for clients)
+    query = Post.query.filter(Post.purge_requested_at.is_(None))
 
     # Filter by status
     status = request.args.get('status')
@@ -97,6 +177,16 @@ def list_posts():
         if author:
             query = query.filter_by(author_id=author.id)
 
+    # Filter by publication month
+    month = request.args.get('month')
+    if month:
+        try:
+            start = datetime.strptime(month, '%Y-%m')
+        except ValueError:
+            return jsonify({"error": "Invalid month, expected YYYY-MM"}), 400
+        end = start.replace(year=start.year + 1, month=1) if start.month == 12 else start.replace(month=start.month + 1)
+        query = query.filter(Post.published_at >= start, Post.published_at < end)
+
     # Search
     search_query = request.args.get('search')
     if search_query:
@@ -118,12 +208,44 @@ def list_posts():
     # Execute pagination
     pagination = query.paginate(page=page, per_page=per_page, error_out=False)
 
-    return jsonify({
-        'posts': [post.to_dict(include_content=False) for post in pagination.items],
+    response = {
+        'posts': Post.to_dicts(pagination.items),
         'total': pagination.total,
         'pages': pagination.pages,
         'current_page': page,
         'per_page': per_page
+    }
+
+    # Facet counts for the current filter set
+    if request.args.get('facets', '').lower() in ('1', 'true', 'yes'):
+        response['facets'] = facet_counts(query)
+
+    return jsonify(response), 200
+
+
+@bp.route('/suggest', methods=['GET'])
+def suggest_posts():
+    """Suggest published post titles while the user types (public).
+
+    Tolerates typos by matching on title trigrams.
+
+    Query params:
+        - q: text typed so far
+        - limit: number of suggestions (default: 10, max 20)
+    """
+    query = request.args.get('q', '').strip()
+    limit = min(max(request.args.get('limit', 10, type=int), 1), 20)
+
+    if not query:
+        return jsonify({'suggestions': []}), 200
+
+    matches = suggest_titles(query, limit, current_app.config['TITLE_SUGGEST_THRESHOLD'])
+
+    return jsonify({
+        'suggestions': [
+            {'id': post_id, 'title': title, 'slug': slug, 'score': round(score, 3)}
+            for post_id, title, slug, score in matches
+        ]
     }), 200
 
 
@@ -131,7 +253,7 @@ def list_posts():
 @jwt_required()
 def get_post_by_id(id):
     """Get a single post by ID (authenticated, for editor)."""
-    post = Post.query.get_or_404(id)
+    post = Post.query.filter_by(id=id, purge_requested_at=None).first_or_404()
 
     user_id = get_jwt_identity()
 
@@ -153,7 +275,7 @@ def get_post_by_id(id):
 @bp.route('/<slug>', methods=['GET'])
 def get_post(slug):
     """Get a single post by slug (public for published, authenticated for drafts)."""
-    post = Post.query.filter_by(slug=slug).first_or_404()
+    post = Post.query.filter_by(slug=slug, purge_requested_at=None).first_or_404()
 
     # Check if user can view this post
     try:
@@ -178,12 +300,42 @@ def get_post(slug):
         db.session.add(view)
         post.increment_view_count()
         db.session.commit()
+        trending.record_view(post.id)
 
     return jsonify({
         'post': post.to_dict(include_content=True)
     }), 200
 
 
+@bp.route('/<slug>/related', methods=['GET'])
+def get_related_posts(slug):
+    """Get published posts related to a post (public).
+
+    Query params:
+        - limit: number of posts (default and max: RELATED_POSTS_K)
+    """
+    limit = request.args.get('limit', type=int)
+
+    ranked = related_posts.related_by_slug(slug, limit)
+    if ranked is None:
+        # Published on another worker since the last rebuild, or the first
+        # build is still running in the background (no related posts yet)
+        post = Post.query.filter_by(slug=slug, status='published').first_or_404()
+        related_posts.update_post(post)
+        ranked = related_posts.related_by_slug(slug, limit) or []
+
+    scores = dict(ranked)
+    posts = Post.query.filter(
+        Post.id.in_(list(scores)),
+        Post.status == 'published'
+    ).all() if scores else []
+    posts.sort(key=lambda post: scores[post.id], reverse=True)
+
+    return jsonify({
+        'posts': Post.to_dicts(posts)
+    }), 200
+
+
 @bp.route('', methods=['POST'])
 @jwt_required()
 @limiter.limit("10 per minute")
@@ -196,13 +348,12 @@ def create_post(current_user):
     except ValidationError as err:
         return jsonify({"error": "Validation failed", "messages": err.messages}), 400
 
+    messages = _unknown_association_ids(data)
+    if messages:
+        return jsonify({"error": "Validation failed", "messages": messages}), 400
+
     # Generate unique slug
-    base_slug = slugify(data['title'])
-    slug = base_slug
-    counter = 1
-    while Post.query.filter_by(slug=slug).first():
-        slug = f"{base_slug}-{counter}"
-        counter += 1
+    slug = allocate_slug(data['title'])
 
     # Create post
     post = Post(
@@ -219,19 +370,14 @@ def create_post(current_user):
     if post.status == 'published':
         post.published_at = datetime.utcnow()
 
-    # Add categories
-    if 'category_ids' in data:
-        categories = Category.query.filter(Category.id.in_(data['category_ids'])).all()
-        post.categories.extend(categories)
-
-    # Add tags
-    if 'tag_ids' in data:
-        tags = Tag.query.filter(Tag.id.in_(data['tag_ids'])).all()
-        post.tags.extend(tags)
-
     try:
         db.session.add(post)
+        db.session.flush()
+        changes = _sync_associations(post.id, data, is_new=True)
         db.session.commit()
+        related_posts.update_post(post)
+        title_index.update_post(post)
+        _apply_association_counts(changes)
 
         return jsonify({
             "message": "Post created successfully",
@@ -242,6 +388,69 @@ def create_post(current_user):
         return jsonify({"error": "Failed to create post"}), 500
 
 
+@bp.route('/batch', methods=['POST'])
+@jwt_required()
+@limiter.limit("10 per minute")
+@authenticated_user
+def batch_posts(current_user):
+    """Create, update, publish and tag many posts in one request.
+
+    Expected JSON:
+        {
+            "operations": [
+                {"op": "create", "data": {...create fields...}},
+                {"op": "update", "id": 12, "data": {...update fields...}},
+                {"op": "publish", "id": 12},
+                {"op": "tag", "id": 13, "data": {"tag_ids": [1], "mode": "add"}}
+            ],
+            "atomic": false
+        }
+
+    Items are validated with the single-post schemas and permission
+    rules; valid items are written in one transaction. With ``atomic``,
+    nothing is written unless every item is valid (400). Returns one
+    result per item, in request order.
+    """
+    try:
+        batch = BatchSchema().load(request.json or {})
+    except ValidationError as err:
+        return jsonify({"error": "Validation failed", "messages": err.messages}), 400
+
+    max_size = current_app.config['POST_BATCH_MAX_SIZE']
+    if len(batch['operations']) > max_size:
+        return jsonify({"error": f"A batch may contain at most {max_size} operations"}), 400
+
+    results = [None] * len(batch['operations'])
+    operations = []
+    for index, item in enumerate(batch['operations']):
+        op = item.get('op')
+        if op not in BATCH_OPERATIONS:
+            results[index] = {'index': index, 'status': 400, 'error': f"Unknown operation: {op}"}
+            continue
+        schema, needs_id = BATCH_OPERATIONS[op]
+        if needs_id and not isinstance(item.get('id'), int):
+            results[index] = {'index': index, 'status': 400, 'error': "Post id is required"}
+            continue
+        try:
+            data = schema().load(item.get('data') or {}) if schema else {}
+        except ValidationError as err:
+            results[index] = {'index': index, 'status': 400, 'error': "Validation failed", 'messages': err.messages}
+            continue
+        operations.append({'op': op, 'index': index, 'id': item.get('id'), 'data': data})
+
+    try:
+        results, committed = PostBatch(current_user).apply(operations, results, atomic=batch['atomic'])
+    except Exception as e:
+        return jsonify({"error": "Failed to apply batch"}), 500
+
+    succeeded = sum(1 for result in results if result['status'] < 300)
+    return jsonify({
+        "message": f"{succeeded} of {len(results)} operations applied",
+        "committed": committed,
+        "results": results
+    }), 400 if batch['atomic'] and not committed else 200
+
+
 @bp.route('/<int:id>', methods=['PUT'])
 @jwt_required()
 @can_edit_post
@@ -253,17 +462,15 @@ def update_post(id, current_user, post):
     except ValidationError as err:
         return jsonify({"error": "Validation failed", "messages": err.messages}), 400
 
+    messages = _unknown_association_ids(data)
+    if messages:
+        return jsonify({"error": "Validation failed", "messages": messages}), 400
+
     # Update fields
     if 'title' in data:
         # Regenerate slug if title changed
         if data['title'] != post.title:
-            base_slug = slugify(data['title'])
-            slug = base_slug
-            counter = 1
-            while Post.query.filter(Post.slug == slug, Post.id != post.id).first():
-                slug = f"{base_slug}-{counter}"
-                counter += 1
-            post.slug = slug
+            post.slug = allocate_slug(data['title'], post.id)
         post.title = data['title']
 
     if 'content' in data:
@@ -281,21 +488,16 @@ def update_post(id, current_user, post):
         # Set published_at when publishing
         if old_status == 'draft' and data['status'] == 'published':
             post.published_at = datetime.utcnow()
-
-    # Update categories
-    if 'category_ids' in data:
-        post.categories.clear()
-        categories = Category.query.filter(Category.id.in_(data['category_ids'])).all()
-        post.categories.extend(categories)
-
-    # Update tags
-    if 'tag_ids' in data:
-        post.tags.clear()
-        tags = Tag.query.filter(Tag.id.in_(data['tag_ids'])).all()
-        post.tags.extend(tags)
+        elif data['status'] == 'draft':
+            trending.forget(post.id)
 
     try:
+        # Categories and tags: only changed association rows are written
+        changes = _sync_associations(post.id, data)
         db.session.commit()
+        related_posts.update_post(post)
+        title_index.update_post(post)
+        _apply_association_counts(changes)
         return jsonify({
             "message": "Post updated successfully",
             "post": post.to_dict()
@@ -309,15 +511,42 @@ def update_post(id, current_user, post):
 @jwt_required()
 @can_delete_post
 def delete_post(id, current_user, post):
-    """Delete a post (owner or admin)."""
+    """Delete a post (owner or admin).
+
+    Page views, autosaves and tag/category links are removed by the
+    database's ON DELETE CASCADE. Posts with very many page views are
+    unpublished and marked for purging at once, then purged by a
+    background job in batches (202 Accepted). A purge cut short by a
+    restart is finished by ``flask purge-posts``.
+    """
+    category_ids = [c.id for c in post.categories]
+    tag_ids = [t.id for t in post.tags]
+    purge = post.view_count >= current_app.config['POST_PURGE_VIEW_THRESHOLD']
+
     try:
-        db.session.delete(post)
+        if purge:
+            post.unpublish()
+            post.purge_requested_at = datetime.utcnow()
+        else:
+            db.session.delete(post)
         db.session.commit()
-        return jsonify({"message": "Post deleted successfully"}), 200
+        trending.forget(id)
+        related_posts.remove(id)
+        title_index.remove(id)
+        if not purge:
+            # A purged post's counts are adjusted when the purge commits
+            category_index.adjust_counts(category_ids, -1)
+            tag_index.adjust_counts(tag_ids, -1)
     except Exception as e:
         db.session.rollback()
         return jsonify({"error": "Failed to delete post"}), 500
 
+    if purge:
+        background.submit(purge_post, id)
+        return jsonify({"message": "Post deletion scheduled"}), 202
+
+    return jsonify({"message": "Post deleted successfully"}), 200
+
 
 @bp.route('/<int:id>/publish', methods=['POST'])
 @jwt_required()
@@ -331,6 +560,8 @@ def publish_post(id, current_user, post):
 
     try:
         db.session.commit()
+        related_posts.update_post(post)
+        title_index.update_post(post)
         return jsonify({
             "message": "Post published successfully",
             "post": post.to_dict()
@@ -345,7 +576,7 @@ def publish_post(id, current_user, post):
 @authenticated_user
 def autosave_post(id, current_user):
     """Autosave post content (for editor)."""
-    post = Post.query.get_or_404(id)
+    post = Post.query.filter_by(id=id, purge_requested_at=None).first_or_404()
 
     # Check if user can edit this post
     if not (current_user.role in ['admin', 'editor'] or post.author_id == current_user.id):
@@ -393,7 +624,7 @@ def autosave_post(id, current_user):
 @authenticated_user
 def get_autosave(id, current_user):
     """Get autosaved content for a post."""
-    post = Post.query.get_or_404(id)
+    post = Post.query.filter_by(id=id, purge_requested_at=None).first_or_404()
 
     # Check if user can edit this post
     if not (current_user.role in ['admin', 'editor'] or post.author_id == current_user.id):
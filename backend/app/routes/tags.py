@@ -4,8 +4,11 @@ from flask_jwt_extended import jwt_required
 from marshmallow import Schema, fields, validate, ValidationError
 from slugify import slugify
 from app import db
-from app.models.tag import Tag
+from app.models.tag import Tag, post_tags
 from app.middleware.rbac import require_role, authenticated_user
+from app.services.associations import unknown_ids
+from app.services.autocomplete import tag_index
+from app.services.taxonomy import merge_terms, apply_merge
 
 bp = Blueprint('tags', __name__)
 
@@ -16,13 +19,50 @@ class TagSchema(Schema):
     name = fields.Str(required=True, validate=validate.Length(min=1, max=50))
 
 
+class TagMergeSchema(Schema):
+    """Schema for merging tags into another."""
+    source_ids = fields.List(fields.Int(), required=True, validate=validate.Length(min=1, max=1000))
+    name = fields.Str(validate=validate.Length(min=1, max=50))
+
+
+def _unique_slug(name, tag_id):
+    """Slug for a renamed tag, suffixed if another tag has it."""
+    base_slug = slugify(name)
+    slug = base_slug
+    counter = 1
+    while Tag.query.filter(Tag.slug == slug, Tag.id != tag_id).first():
+        slug = f"{base_slug}-{counter}"
+        counter += 1
+    return slug
+
+
 @bp.route('', methods=['GET'])
 def list_tags():
     """Get all tags (public)."""
     tags = Tag.query.order_by(Tag.name).all()
+    # Post counts for every tag in one grouped query
+    counts = dict(db.session.execute(
+        db.select(post_tags.c.tag_id, db.func.count()).group_by(post_tags.c.tag_id)
+    ).all())
+
+    return jsonify({
+        'tags': [tag.to_dict(post_count=counts.get(tag.id, 0)) for tag in tags]
+    }), 200
+
+
+@bp.route('/suggest', methods=['GET'])
+def suggest_tags():
+    """Autocomplete tags by name or slug prefix (public).
+
+    Query params:
+        - q: text typed so far
+        - limit: number of suggestions (default: 10, max 20)
+    """
+    query = request.args.get('q', '')
+    limit = max(request.args.get('limit', 10, type=int), 1)
 
     return jsonify({
-        'tags': [tag.to_dict() for tag in tags]
+        'suggestions': tag_index.suggest(query, limit) if query.strip() else []
     }), 200
 
 
@@ -63,6 +103,7 @@ def create_tag(current_user):
     try:
         db.session.add(tag)
         db.session.commit()
+        tag_index.add(tag.id, tag.name, tag.slug, 0)
 
         return jsonify({
             "message": "Tag created successfully",
@@ -88,18 +129,13 @@ def update_tag(id, current_user):
 
     # Update slug if name changed
     if data['name'] != tag.name:
-        base_slug = slugify(data['name'])
-        slug = base_slug
-        counter = 1
-        while Tag.query.filter(Tag.slug == slug, Tag.id != id).first():
-            slug = f"{base_slug}-{counter}"
-            counter += 1
-        tag.slug = slug
+        tag.slug = _unique_slug(data['name'], id)
 
     tag.name = data['name']
 
     try:
         db.session.commit()
+        tag_index.add(tag.id, tag.name, tag.slug)
         return jsonify({
             "message": "Tag updated successfully",
             "tag": tag.to_dict()
@@ -119,7 +155,56 @@ def delete_tag(id, current_user):
     try:
         db.session.delete(tag)
         db.session.commit()
+        tag_index.remove(id)
         return jsonify({"message": "Tag deleted successfully"}), 200
     except Exception as e:
         db.session.rollback()
         return jsonify({"error": "Failed to delete tag"}), 500
+
+
+@bp.route('/<int:id>/merge', methods=['POST'])
+@jwt_required()
+@require_role('admin')
+def merge_tags(id, current_user):
+    """Merge tags into this one (admin only).
+
+    Every post linked to a source tag is linked to this tag instead and
+    the sources are deleted, all in one transaction.
+
+    Request body:
+        - source_ids: ids of the tags to merge in
+        - name: optional new name for this tag
+    """
+    tag = Tag.query.get_or_404(id)
+
+    try:
+        schema = TagMergeSchema()
+        data = schema.load(request.json)
+    except ValidationError as err:
+        return jsonify({"error": "Validation failed", "messages": err.messages}), 400
+
+    missing = unknown_ids(Tag, data['source_ids'])
+    if missing:
+        return jsonify({
+            "error": "Validation failed",
+            "messages": {"source_ids": [f"Unknown ids: {', '.join(map(str, missing))}"]}
+        }), 400
+
+    try:
+        result = merge_terms(Tag, tag, data['source_ids'])
+        # Source slugs are free once the merge has deleted them
+        if 'name' in data and data['name'] != tag.name:
+            tag.slug = _unique_slug(data['name'], id)
+            tag.name = data['name']
+        db.session.commit()
+        apply_merge(Tag, tag, result)
+        tag_index.add(tag.id, tag.name, tag.slug)
+        return jsonify({
+            "message": f"Merged {len(result['merged'])} tags into {tag.name}",
+            "merged_ids": result['merged'],
+            "posts_relinked": result['linked'],
+            "tag": tag.to_dict()
+        }), 200
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({"error": "Failed to merge tags"}), 500
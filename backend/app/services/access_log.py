@@ -0,0 +1,238 @@
+"""Sampled JSON access logs written from a background thread."""
+import atexit
+import json
+import logging
+import os
+import queue
+import random
+import sys
+import threading
+import time
+from contextvars import ContextVar
+from datetime import datetime
+from logging.handlers import QueueHandler
+from flask import request
+from flask_jwt_extended import get_jwt
+from app.services.metrics import metrics
+from app.services.query_audit import query_audit
+
+
+# [start, status, bytes] for the current request
+_request_state = ContextVar('access_log_request_state', default=None)
+
+
+class JSONLineFormatter(logging.Formatter):
+    """Format a record whose ``msg`` is a dict as one JSON line."""
+
+    def format(self, record):
+        return json.dumps(record.msg, separators=(',', ':'), default=str)
+
+
+class DroppingQueueHandler(QueueHandler):
+    """Queue handler that drops records when the queue is full.
+
+    The stock handler reports a full queue through ``handleError`` (a
+    traceback on stderr per record); under load that is worse than the
+    blocking writes it replaces. Records are also queued as-is: the dict
+    message is formatted on the writer thread, not in the request.
+    """
+
+    def __init__(self, log_queue):
+        super().__init__(log_queue)
+        self.dropped = 0
+
+    def prepare(self, record):
+        return record
+
+    def enqueue(self, record):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+
+class AccessLog:
+    """One structured log line per request, off the request thread.
+
+    Each finished request is timed from the first ``before_request`` hook
+    to teardown. Whether it is logged is decided then: always when the
+    status is at least ACCESS_LOG_ERROR_STATUS or it took at least
+    ACCESS_LOG_SLOW_MS, otherwise with the endpoint's rate from
+    ACCESS_LOG_ROUTE_SAMPLE_RATES (default ACCESS_LOG_SAMPLE_RATE). Lines
+    record the rate they were sampled at so counts can be scaled back up.
+
+    Records go through a bounded queue to a writer thread that wakes every
+    ACCESS_LOG_FLUSH_INTERVAL, formats everything queued and writes it in
+    one call (to ACCESS_LOG_PATH, or stdout). Waking per interval rather
+    than per record keeps the writer from contending for the GIL with
+    every request. When the queue is full records are dropped and counted
+    in ``dropped``; records that could not be written (an unwritable
+    ACCESS_LOG_PATH, a full disk, a closed stdout) are counted in
+    ``failed`` and the writer carries on.
+
+    The SQL statement count comes from the metrics or query audit request
+    state, whichever is enabled; with neither, ``queries`` is null.
+    """
+
+    def __init__(self):
+        self.enabled = False
+        self.sample_rate = 1.0
+        self.route_rates = {}
+        self.slow_seconds = 1.0
+        self.error_status = 500
+        self.logger = logging.getLogger('app.access')
+        self.logger.propagate = False
+        self.interval = 0.5
+        self.failed = 0
+        self._handler = None
+        self._path = None
+        self._formatter = JSONLineFormatter()
+        self._stop = None
+        self._writer = None
+        self._pid = None
+        self._lock = threading.Lock()
+        atexit.register(self.flush)
+
+    def init_app(self, app):
+        """Install the request hooks if ACCESS_LOG_ENABLED.
+
+        Args:
+            app: Flask application
+        """
+        self.enabled = app.config.get('ACCESS_LOG_ENABLED', True)
+        if not self.enabled:
+            return
+        self.sample_rate = app.config.get('ACCESS_LOG_SAMPLE_RATE', 1.0)
+        self.route_rates = dict(app.config.get('ACCESS_LOG_ROUTE_SAMPLE_RATES') or {})
+        self.slow_seconds = app.config.get('ACCESS_LOG_SLOW_MS', 1000) / 1000
+        self.error_status = app.config.get('ACCESS_LOG_ERROR_STATUS', 500)
+
+        self.interval = app.config.get('ACCESS_LOG_FLUSH_INTERVAL', 0.5)
+        self._path = app.config.get('ACCESS_LOG_PATH')
+        if self._handler is not None:
+            self.logger.removeHandler(self._handler)
+        self._handler = DroppingQueueHandler(queue.Queue(app.config.get('ACCESS_LOG_QUEUE_SIZE', 10000)))
+        self.logger.addHandler(self._handler)
+        self.logger.setLevel(logging.INFO)
+        self._pid = None
+
+        app.before_request_funcs.setdefault(None, []).insert(0, self._start_request)
+        app.after_request(self._finish_response)
+        # Registered after metrics and query audit, so this teardown runs
+        # before theirs clear the request's statement count
+        app.teardown_request(self._end_request)
+
+    @property
+    def dropped(self):
+        return self._handler.dropped if self._handler is not None else 0
+
+    def _start_writer(self):
+        # Per process: a thread started before a fork does not survive in
+        # the children
+        with self._lock:
+            if self._pid == os.getpid():
+                return
+            self._stop = threading.Event()
+            self._writer = threading.Thread(target=self._run, args=(self._stop,), name='access-log', daemon=True)
+            self._writer.start()
+            self._pid = os.getpid()
+
+    def _run(self, stop):
+        while not stop.wait(self.interval):
+            self._write()
+        self._write()
+
+    def _write(self):
+        records = []
+        log_queue = self._handler.queue
+        try:
+            while True:
+                records.append(log_queue.get_nowait())
+        except queue.Empty:
+            pass
+        if not records:
+            return
+        text = ''.join(self._formatter.format(record) + '\n' for record in records)
+        try:
+            if self._path:
+                with open(self._path, 'a', encoding='utf-8') as f:
+                    f.write(text)
+            else:
+                sys.stdout.write(text)
+                sys.stdout.flush()
+        except OSError as e:
+            # Losing these lines beats losing the writer thread
+            if not self.failed:
+                sys.stderr.write(f'access log: write failed ({e}), dropping records\n')
+            self.failed += len(records)
+
+    def flush(self):
+        """Write out queued records and stop the writer (restarted on next use)."""
+        with self._lock:
+            if self._writer is not None and self._pid == os.getpid():
+                self._stop.set()
+                self._writer.join()
+                self._pid = None
+
+    # Requests
+
+    def _start_request(self):
+        _request_state.set([time.perf_counter(), 500, None])
+
+    def _finish_response(self, response):
+        state = _request_state.get()
+        if state is not None:
+            state[1] = response.status_code
+            state[2] = response.calculate_content_length()
+        return response
+
+    def _end_request(self, exc):
+        state = _request_state.get()
+        if state is None:
+            return
+        _request_state.set(None)
+        started, status, size = state
+        elapsed = time.perf_counter() - started
+
+        if status >= self.error_status:
+            reason, rate = 'error', 1.0
+        elif elapsed >= self.slow_seconds:
+            reason, rate = 'slow', 1.0
+        else:
+            rate = self.route_rates.get(request.endpoint, self.sample_rate)
+            if rate < 1.0 and random.random() >= rate:
+                return
+            reason = 'sampled'
+
+        try:
+            user_id = get_jwt().get('sub')
+        except RuntimeError:
+            user_id = None
+
+        self._log({
+            'ts': datetime.utcnow().isoformat(timespec='milliseconds') + 'Z',
+            'method': request.method,
+            'route': request.url_rule.rule if request.url_rule else None,
+            'endpoint': request.endpoint,
+            'path': request.path,
+            'status': status,
+            'latency_ms': round(elapsed * 1000, 3),
+            'user_id': user_id,
+            'queries': self._statements(),
+            'bytes': size,
+            'remote_addr': request.remote_addr,
+            'reason': reason,
+            'sample_rate': rate,
+        })
+
+    def _log(self, entry):
+        if self._pid != os.getpid():
+            self._start_writer()
+        self.logger.info(entry)
+
+    def _statements(self):
+        statements = metrics.current_statements()
+        return statements if statements is not None else query_audit.current_statements()
+
+
+access_log = AccessLog()
@@ -0,0 +1,114 @@
+"""Set-based sync of post category and tag associations."""
+from datetime import datetime
+from slugify import slugify
+from sqlalchemy.dialects import postgresql, sqlite
+from app import db
+from app.models.tag import Tag
+
+
+def insert_ignoring_conflicts(table):
+    """``INSERT ... ON CONFLICT DO NOTHING`` for the current database."""
+    dialect = postgresql if db.engine.dialect.name == 'postgresql' else sqlite
+    return dialect.insert(table).on_conflict_do_nothing()
+
+
+def unknown_ids(model, ids):
+    """Get the ids in ``ids`` that have no ``model`` row (one IN query).
+
+    Returns:
+        list: Missing ids, sorted
+    """
+    ids = set(ids)
+    if not ids:
+        return []
+    found = set(db.session.scalars(db.select(model.id).where(model.id.in_(ids))))
+    return sorted(ids - found)
+
+
+def tag_slug(name):
+    """Slug a tag name is stored under (whitespace collapsed)."""
+    return slugify(' '.join(name.split()))
+
+
+def ensure_tags(names):
+    """Get tag ids for names, creating the missing tags.
+
+    Missing tags are inserted with a single ``INSERT ... ON CONFLICT DO
+    NOTHING RETURNING``, so concurrent requests creating the same tag do
+    not fail; tags that already existed are read back in one query.
+
+    Args:
+        names: Tag names
+
+    Returns:
+        tuple: (dict of ``tag_slug(name)`` -> tag id, list of created
+        (id, name, slug) tuples)
+    """
+    wanted = {}
+    for name in names:
+        slug = tag_slug(name)
+        if slug and slug not in wanted:
+            wanted[slug] = ' '.join(name.split())
+    if not wanted:
+        return {}, []
+
+    now = datetime.utcnow()
+    created = db.session.execute(
+        insert_ignoring_conflicts(Tag.__table__)
+        .values([{'name': name, 'slug': slug, 'created_at': now} for slug, name in wanted.items()])
+        .returning(Tag.id, Tag.name, Tag.slug)
+    ).all()
+
+    by_slug = {slug: tag_id for tag_id, _, slug in created}
+    by_name = {}
+    rest = [slug for slug in wanted if slug not in by_slug]
+    if rest:
+        # Conflicts on either unique column: match by slug or by name
+        rows = db.session.execute(
+            db.select(Tag.id, Tag.name, Tag.slug)
+            .where(db.or_(Tag.slug.in_(rest), Tag.name.in_([wanted[slug] for slug in rest])))
+        )
+        for tag_id, name, slug in rows:
+            by_slug[slug] = tag_id
+            by_name[name] = tag_id
+
+    ids = {}
+    for slug, name in wanted.items():
+        tag_id = by_slug.get(slug, by_name.get(name))
+        if tag_id is not None:
+            ids[slug] = tag_id
+    return ids, [tuple(row) for row in created]
+
+
+def sync_links(table, column, post_id, ids, current_ids=None):
+    """Make a post's association rows match ``ids`` by set difference.
+
+    Only changed rows are written: one bulk DELETE for removed links and
+    one executemany INSERT for added ones. Unchanged links are not
+    touched, so they are neither rewritten nor locked.
+
+    Args:
+        table: Association table (``post_tags`` or ``post_categories``)
+        column: Name of the linked id column (``tag_id``, ``category_id``)
+        post_id: Post id
+        ids: Desired linked ids
+        current_ids: Current linked ids, if already known
+
+    Returns:
+        tuple: (added ids, removed ids) as sets
+    """
+    if current_ids is None:
+        current_ids = set(db.session.scalars(
+            db.select(table.c[column]).where(table.c.post_id == post_id)
+        ))
+    ids = set(ids)
+    added = ids - current_ids
+    removed = current_ids - ids
+
+    if removed:
+        db.session.execute(
+            table.delete().where(table.c.post_id == post_id, table.c[column].in_(removed))
+        )
+    if added:
+        db.session.execute(table.insert(), [{'post_id': post_id, column: link_id} for link_id in added])
+    return added, removed
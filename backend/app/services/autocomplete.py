@@ -0,0 +1,237 @@
+"""In-process prefix indexes for tag and category autocomplete."""
+import heapq
+import threading
+import time
+from bisect import bisect_left, insort
+from slugify import slugify
+from app import db
+from app.models.category import Category, post_categories
+from app.models.tag import Tag, post_tags
+from app.services.background import BackgroundRebuild
+
+
+# Prefixes this short match too many keys to rank per request, so their
+# results are kept precomputed
+SHORT_PREFIX = 2
+
+
+def normalize(text):
+    """Normalize a name or query for prefix matching."""
+    return ' '.join((text or '').casefold().split())
+
+
+class PrefixIndex(BackgroundRebuild):
+    """Sorted-array prefix index over names and slugs, ranked by post count.
+
+    Keys are ``(normalized key, id)`` tuples kept sorted, so a prefix maps
+    to a contiguous range found with two bisections. Results for one- and
+    two-character prefixes are precomputed because their ranges are large.
+
+    Built from the database on a background job and rebuilt every
+    ``AUTOCOMPLETE_REBUILD_INTERVAL`` seconds to correct drift; between
+    rebuilds ``add``, ``remove`` and ``adjust_counts`` keep it current.
+    """
+
+    _STATE = ('_built_at', '_entries', '_keys', '_short')
+
+    def __init__(self, model, association, column, max_results=20, rebuild_interval=300):
+        self.model = model
+        self.association = association
+        self.column = column
+        self.max_results = max_results
+        self.rebuild_interval = rebuild_interval
+        self._lock = threading.RLock()
+        self._init_rebuild()
+        self._reset()
+
+    def init_app(self, app):
+        """Configure the index from the application config."""
+        self.max_results = app.config.get('AUTOCOMPLETE_MAX_RESULTS', 20)
+        self.rebuild_interval = app.config.get('AUTOCOMPLETE_REBUILD_INTERVAL', 300)
+        with self._lock:
+            self._reset()
+            self._scheduled_at = 0.0
+
+    def _reset(self):
+        self._built_at = None
+        self._entries = {}  # id -> (name, slug, post count)
+        self._keys = []  # sorted (key, id)
+        self._short = {}  # short prefix -> ranked ids
+
+    def __len__(self):
+        return len(self._entries)
+
+    @staticmethod
+    def _entry_keys(name, slug):
+        return {normalize(name), slug}
+
+    def _rank_key(self, entry_id):
+        name, _, count = self._entries[entry_id]
+        return -count, name.casefold(), entry_id
+
+    def _range(self, prefix):
+        start = bisect_left(self._keys, (prefix,))
+        end = bisect_left(self._keys, (prefix + '\uffff',), start)
+        return {entry_id for _, entry_id in self._keys[start:end]}
+
+    def _refresh_short(self, keys):
+        prefixes = {key[:n] for key in keys for n in range(1, SHORT_PREFIX + 1) if len(key) >= n}
+        for prefix in prefixes:
+            ranked = heapq.nsmallest(self.max_results, self._range(prefix), key=self._rank_key)
+            if ranked:
+                self._short[prefix] = ranked
+            else:
+                self._short.pop(prefix, None)
+
+    # Building
+
+    def build(self, rows):
+        """Rebuild the index and swap it in.
+
+        Args:
+            rows: Iterable of (id, name, slug, post count) tuples
+        """
+        fresh = PrefixIndex(self.model, self.association, self.column, self.max_results)
+        fresh._load(rows)
+        self._swap(fresh)
+
+    def _load(self, rows):
+        for entry_id, name, slug, count in rows:
+            self._entries[entry_id] = (name, slug, count or 0)
+            self._keys.extend((key, entry_id) for key in self._entry_keys(name, slug))
+        self._keys.sort()
+
+        # Walk entries best-first so each short prefix fills in rank order
+        for entry_id in sorted(self._entries, key=self._rank_key):
+            name, slug, _ = self._entries[entry_id]
+            for key in self._entry_keys(name, slug):
+                for n in range(1, min(SHORT_PREFIX, len(key)) + 1):
+                    ranked = self._short.setdefault(key[:n], [])
+                    if len(ranked) < self.max_results and entry_id not in ranked:
+                        ranked.append(entry_id)
+        self._built_at = time.time()
+
+    def build_from_db(self):
+        """Rebuild the index from the model table and its post associations."""
+        model = self.model
+        count = db.func.count(self.association.c[self.column])
+        rows = db.session.execute(
+            db.select(model.id, model.name, model.slug, count)
+            .outerjoin(self.association, self.association.c[self.column] == model.id)
+            .group_by(model.id, model.name, model.slug)
+        )
+        self.build(rows)
+
+    def _replay(self, change, *args):
+        # Count adjustments are not replayed: the rebuilt counts may already
+        # include them, and the next rebuild corrects any drift
+        if change == 'add':
+            self._add(*args)
+        else:
+            self._remove(*args)
+
+    # Incremental updates
+
+    def add(self, entry_id, name, slug, count=None):
+        """Insert or replace an entry.
+
+        Args:
+            entry_id: Tag or category ID
+            name: Display name
+            slug: URL slug
+            count: Post count (default: keep the current count, or 0)
+        """
+        with self._lock:
+            self._log_change('add', entry_id, name, slug, count)
+            if self._built_at is not None:
+                self._add(entry_id, name, slug, count)
+
+    def _add(self, entry_id, name, slug, count):
+        old = self._entries.get(entry_id)
+        if count is None:
+            count = old[2] if old else 0
+        touched = self._remove_keys(entry_id)
+        self._entries[entry_id] = (name, slug, count)
+        for key in self._entry_keys(name, slug):
+            insort(self._keys, (key, entry_id))
+            touched.add(key)
+        self._refresh_short(touched)
+
+    def remove(self, entry_id):
+        """Remove an entry."""
+        with self._lock:
+            self._log_change('remove', entry_id)
+            self._remove(entry_id)
+
+    def _remove(self, entry_id):
+        if entry_id in self._entries:
+            touched = self._remove_keys(entry_id)
+            del self._entries[entry_id]
+            self._refresh_short(touched)
+
+    def _remove_keys(self, entry_id):
+        old = self._entries.get(entry_id)
+        if old is None:
+            return set()
+        keys = self._entry_keys(old[0], old[1])
+        for key in keys:
+            index = bisect_left(self._keys, (key, entry_id))
+            if index < len(self._keys) and self._keys[index] == (key, entry_id):
+                del self._keys[index]
+        return keys
+
+    def adjust_counts(self, entry_ids, delta):
+        """Shift post counts after posts gain or lose associations.
+
+        Args:
+            entry_ids: IDs whose counts changed
+            delta: Amount to add to each count (negative to subtract)
+        """
+        with self._lock:
+            if self._built_at is None:
+                return
+            touched = set()
+            for entry_id in entry_ids:
+                entry = self._entries.get(entry_id)
+                if entry:
+                    name, slug, count = entry
+                    self._entries[entry_id] = (name, slug, max(count + delta, 0))
+                    touched |= self._entry_keys(name, slug)
+            self._refresh_short(touched)
+
+    # Lookups
+
+    def suggest(self, query, limit=10):
+        """Get entries whose name or slug starts with ``query``.
+
+        Args:
+            query: Text typed so far
+            limit: Maximum number of results (capped at AUTOCOMPLETE_MAX_RESULTS)
+
+        Returns:
+            list: Dicts with id, name, slug and post_count, most used first
+        """
+        self._ensure_built()
+        limit = min(limit, self.max_results)
+        prefixes = {normalize(query), slugify(query or '')} - {''}
+
+        with self._lock:
+            if all(len(prefix) <= SHORT_PREFIX for prefix in prefixes):
+                ids = set()
+                for prefix in prefixes:
+                    ids.update(self._short.get(prefix, ()))
+            else:
+                ids = set()
+                for prefix in prefixes:
+                    ids |= self._range(prefix)
+            ranked = heapq.nsmallest(limit, ids, key=self._rank_key)
+            entries = [(entry_id, self._entries[entry_id]) for entry_id in ranked]
+
+        return [
+            {'id': entry_id, 'name': name, 'slug': slug, 'post_count': count}
+            for entry_id, (name, slug, count) in entries
+        ]
+
+
+tag_index = PrefixIndex(Tag, post_tags, 'tag_id')
+category_index = PrefixIndex(Category, post_categories, 'category_id')
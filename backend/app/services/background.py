@@ -0,0 +1,197 @@
+"""In-process background worker pool."""
+import os
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from app import db
+from app.services.tracing import tracer
+
+
+class BackgroundWorkers:
+    """Thread pool for work that should not hold up a request.
+
+    Jobs run inside an application context with their own database
+    session. With ``BACKGROUND_WORKERS = 0`` jobs run inline, which keeps
+    tests deterministic.
+    """
+
+    def __init__(self):
+        self.max_workers = os.cpu_count() or 1
+        self._app = None
+        self._executor = None
+        self._lock = threading.Lock()
+
+    def init_app(self, app):
+        """Size the pool from BACKGROUND_WORKERS (defaults to the CPU count)."""
+        self._app = app
+        self.max_workers = app.config.get('BACKGROUND_WORKERS', os.cpu_count() or 1)
+        self.shutdown(wait=False)
+
+    def _run(self, fn, args, kwargs, trace_parent=None):
+        with self._app.app_context(), tracer.span(f'background.{fn.__name__}', parent=trace_parent):
+            try:
+                return fn(*args, **kwargs)
+            except Exception:
+                self._app.logger.exception("Background job %s failed", fn.__name__)
+                raise
+            finally:
+                db.session.remove()
+
+    def submit(self, fn, *args, **kwargs):
+        """Schedule ``fn(*args, **kwargs)`` to run in the pool.
+
+        Returns:
+            Future: Completes with the job's result or exception
+        """
+        # Jobs submitted from a traced request continue its trace
+        trace_parent = tracer.current_span()
+        if not self.max_workers:
+            future = Future()
+            try:
+                future.set_result(self._run(fn, args, kwargs, trace_parent))
+            except Exception as e:
+                future.set_exception(e)
+            return future
+
+        # Created on first use so forked worker processes get their own threads
+        if self._executor is None:
+            with self._lock:
+                if self._executor is None:
+                    self._executor = ThreadPoolExecutor(
+                        max_workers=self.max_workers, thread_name_prefix='background'
+                    )
+        return self._executor.submit(self._run, fn, args, kwargs, trace_parent)
+
+    def shutdown(self, wait=True):
+        """Stop the pool, optionally waiting for queued jobs."""
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=wait)
+
+
+class BackgroundRebuild:
+    """Mixin for in-process indexes rebuilt from the database off the request path.
+
+    ``_ensure_built()`` (called before lookups) schedules a rebuild on the
+    background pool when the index was never built or is older than
+    ``rebuild_interval``; ``invalidate()`` schedules one after bulk writes.
+    At most one runs at a time and lookups keep using the current index
+    until the new one is swapped in.
+
+    Subclasses set ``_STATE`` (the attributes a rebuild replaces), call
+    ``_init_rebuild()`` from ``__init__`` and implement ``build_from_db()``
+    to build a fresh index and pass it to ``_swap()``. Incremental updates
+    call ``_log_change(...)`` under ``self._lock``; changes logged while a
+    rebuild reads the database are handed to ``_replay(*change)`` once it
+    is swapped in, so they must be idempotent.
+    """
+
+    _STATE = ()
+
+    # Seconds before a failed rebuild is tried again
+    retry_delay = 60
+
+    def _init_rebuild(self):
+        self._built_at = None
+        self._building = False
+        self._rebuild_again = False
+        self._scheduled_at = 0.0
+        self._changes = []
+        self._rebuild_future = None
+
+    @property
+    def ready(self):
+        """Whether an index has been built (lookups before that find nothing)."""
+        return self._built_at is not None
+
+    def invalidate(self):
+        """Rebuild in the background after bulk writes; lookups use the current index meanwhile."""
+        with self._lock:
+            if self._built_at is not None:
+                self._built_at = 0.0
+            if self._building:
+                # The running rebuild may have read the database too early
+                self._rebuild_again = True
+                return
+        self.schedule_rebuild()
+
+    def schedule_rebuild(self):
+        """Rebuild from the database on a background job, unless one is running.
+
+        Returns:
+            Future: The scheduled job, or None if one was already running
+        """
+        with self._lock:
+            if self._building:
+                return None
+            # Set now so concurrent lookups don't schedule it again
+            self._building = True
+            self._scheduled_at = time.time()
+        self._rebuild_future = background.submit(self._rebuild)
+        return self._rebuild_future
+
+    def wait_ready(self, timeout=None):
+        """Wait until an index is built, if a rebuild is scheduled.
+
+        Returns as soon as the index is swapped in, without waiting for
+        the rest of the job (such as ``_rebuilt()``).
+
+        Args:
+            timeout: Seconds to wait at most (default: no limit)
+
+        Returns:
+            bool: Whether an index is built
+        """
+        future = self._rebuild_future
+        ends = None if timeout is None else time.monotonic() + timeout
+        while not self.ready and future is not None and not future.done():
+            remaining = 0.05 if ends is None else min(ends - time.monotonic(), 0.05)
+            if remaining <= 0:
+                break
+            try:
+                future.result(remaining)
+            except Exception:
+                # Not done yet, or failed (already logged by the job)
+                pass
+        return self.ready
+
+    def _rebuild(self):
+        try:
+            self.build_from_db()
+        finally:
+            with self._lock:
+                self._building = False
+                self._changes = []
+                again, self._rebuild_again = self._rebuild_again, False
+        if again:
+            self.schedule_rebuild()
+        else:
+            self._rebuilt()
+
+    def _rebuilt(self):
+        """Called on the background job after a rebuild was swapped in."""
+
+    def _ensure_built(self):
+        stale = self._built_at is None or time.time() - self._built_at > self.rebuild_interval
+        if stale and not self._building and time.time() - self._scheduled_at >= self.retry_delay:
+            self.schedule_rebuild()
+
+    def _log_change(self, *change):
+        if self._building:
+            self._changes.append(change)
+
+    def _swap(self, fresh):
+        with self._lock:
+            for name in self._STATE:
+                setattr(self, name, getattr(fresh, name))
+            # Writes that happened while the database was being read
+            changes, self._changes = self._changes, []
+            for change in changes:
+                self._replay(*change)
+
+    def _replay(self, *change):
+        raise NotImplementedError
+
+
+background = BackgroundWorkers()
@@ -0,0 +1,317 @@
+"""Streaming NDJSON export and import of the post corpus."""
+import json
+from collections import defaultdict
+from datetime import datetime
+from marshmallow import EXCLUDE, Schema, ValidationError, fields, validate
+from sqlalchemy.exc import SQLAlchemyError
+from app import db
+from app.models.post import Post
+from app.models.user import User
+from app.models.category import Category, post_categories
+from app.models.tag import Tag, post_tags
+from app.routes.posts import PostCreateSchema
+from app.services.autocomplete import tag_index, category_index
+from app.services.related import related_posts
+from app.services.title_index import title_index
+from app.utils.slugs import allocate_slugs
+
+
+# (record key, association table, link column, model)
+LINKS = (
+    ('categories', post_categories, 'category_id', Category),
+    ('tags', post_tags, 'tag_id', Tag),
+)
+
+DATETIME_FIELDS = ('published_at', 'created_at', 'updated_at')
+
+# Import errors reported back in full; the rest are only counted
+MAX_REPORTED_ERRORS = 20
+
+
+def _term_schema(max_length):
+    class TermSchema(Schema):
+        class Meta:
+            unknown = EXCLUDE
+
+        name = fields.Str(required=True, validate=validate.Length(min=1, max=max_length))
+        slug = fields.Str(required=True, validate=validate.Length(min=1, max=max_length))
+
+    return TermSchema
+
+
+class CorpusRecordSchema(PostCreateSchema):
+    """One NDJSON record: the post fields clients may set, plus what the export adds."""
+
+    class Meta:
+        unknown = EXCLUDE
+
+    slug = fields.Str(allow_none=True, validate=validate.Length(max=255))
+    excerpt = fields.Str(allow_none=True, validate=validate.Length(max=500))
+    featured_image_url = fields.Url(allow_none=True, validate=validate.Length(max=500))
+    status = fields.Str(allow_none=True, validate=validate.OneOf(['draft', 'published']))
+    view_count = fields.Int(allow_none=True, validate=validate.Range(min=0, max=2**31 - 1))
+    author = fields.Str(allow_none=True)
+    published_at = fields.DateTime(allow_none=True)
+    created_at = fields.DateTime(allow_none=True)
+    updated_at = fields.DateTime(allow_none=True)
+    categories = fields.List(fields.Nested(_term_schema(100)), load_default=list)
+    tags = fields.List(fields.Nested(_term_schema(50)), load_default=list)
+
+
+def _isoformat(value):
+    return value.isoformat() if value else None
+
+
+def _links_for(post_ids):
+    """Category and tag {name, slug} lists for a chunk of posts."""
+    links = {key: defaultdict(list) for key, _, _, _ in LINKS}
+    for key, table, column, model in LINKS:
+        rows = db.session.execute(
+            db.select(table.c.post_id, model.name, model.slug)
+            .join(model, model.id == table.c[column])
+            .where(table.c.post_id.in_(post_ids))
+        )
+        for post_id, name, slug in rows:
+            links[key][post_id].append({'name': name, 'slug': slug})
+    return links
+
+
+def export_posts(batch_size=1000):
+    """Yield every post as one NDJSON line, oldest id first.
+
+    Posts are read as plain rows with ``yield_per`` (a server-side cursor
+    on PostgreSQL), and categories and tags are fetched per chunk, so
+    memory use does not grow with the corpus.
+
+    Args:
+        batch_size: Rows fetched per round trip
+
+    Yields:
+        str: JSON object followed by a newline
+    """
+    result = db.session.execute(
+        db.select(
+            Post.id, Post.title, Post.slug, Post.content, Post.excerpt,
+            Post.featured_image_url, Post.status, Post.view_count,
+            Post.published_at, Post.created_at, Post.updated_at,
+            User.username.label('author')
+        )
+        .join(User, User.id == Post.author_id)
+        # Posts being purged are already deleted
+        .where(Post.purge_requested_at.is_(None))
+        .order_by(Post.id)
+        .execution_options(yield_per=batch_size)
+    )
+    for rows in result.partitions():
+        links = _links_for([row.id for row in rows])
+        for row in rows:
+            record = {
+                'title': row.title,
+                'slug': row.slug,
+                'content': row.content,
+                'excerpt': row.excerpt,
+                'featured_image_url': row.featured_image_url,
+                'status': row.status,
+                'view_count': row.view_count,
+                'author': row.author,
+                'categories': links['categories'].get(row.id, []),
+                'tags': links['tags'].get(row.id, []),
+            }
+            for field in DATETIME_FIELDS:
+                record[field] = _isoformat(getattr(row, field))
+            yield json.dumps(record, ensure_ascii=False) + '\n'
+
+
+class CorpusImporter:
+    """Insert NDJSON post records in batches.
+
+    Authors are matched by username; categories and tags by slug, then by
+    name, and created when missing. Slugs are re-allocated in bulk, so
+    records whose slug is taken get the usual ``-1``, ``-2`` suffix.
+    """
+
+    def __init__(self, batch_size=1000, default_author=None):
+        self.batch_size = batch_size
+        self.default_author_id = None
+        self._authors = {}  # username -> id
+        self._terms = {model: {} for _, _, _, model in LINKS}  # model -> slug -> id
+        self.imported = 0
+        self.skipped = 0
+        self.errors = []
+        if default_author:
+            self.default_author_id = db.session.scalar(db.select(User.id).where(User.username == default_author))
+            if self.default_author_id is None:
+                raise ValueError(f"Unknown author: {default_author}")
+
+    def _error(self, line_number, message, records=1):
+        self.skipped += records
+        if len(self.errors) < MAX_REPORTED_ERRORS:
+            self.errors.append({'line': line_number, 'error': message})
+
+    def _resolve_authors(self, records):
+        missing = {r['author'] for _, r in records if r.get('author') and r['author'] not in self._authors}
+        if missing:
+            rows = db.session.execute(db.select(User.username, User.id).where(User.username.in_(missing)))
+            self._authors.update(dict(rows.all()))
+
+    def _resolve_terms(self, model, terms):
+        """Map term slugs to ids, creating missing categories/tags."""
+        cache = self._terms[model]
+        wanted = {term['slug']: term['name'] for term in terms if term['slug'] not in cache}
+        if not wanted:
+            return
+        cache.update(db.session.execute(db.select(model.slug, model.id).where(model.slug.in_(wanted))).all())
+
+        # Same name under a different slug: reuse it (names are unique too)
+        by_name = defaultdict(list)
+        for slug, name in wanted.items():
+            if slug not in cache:
+                by_name[name].append(slug)
+        if by_name:
+            for name, term_id in db.session.execute(db.select(model.name, model.id).where(model.name.in_(by_name))):
+                for slug in by_name.pop(name):
+                    cache[slug] = term_id
+
+        if by_name:
+            # One new row per name, under the first slug it came with
+            now = datetime.utcnow()
+            db.session.execute(model.__table__.insert(), [
+                {'name': name, 'slug': slugs[0], 'created_at': now} for name, slugs in by_name.items()
+            ])
+            ids = dict(db.session.execute(
+                db.select(model.slug, model.id).where(model.slug.in_([slugs[0] for slugs in by_name.values()]))
+            ).all())
+            for slugs in by_name.values():
+                for slug in slugs:
+                    cache[slug] = ids[slugs[0]]
+
+    def _flush(self, records):
+        """Insert one batch of (line number, record) pairs and commit.
+
+        A batch the database rejects is rolled back and reported as one
+        error; the import goes on with the next batch.
+        """
+        try:
+            self._insert(records)
+        except SQLAlchemyError as e:
+            db.session.rollback()
+            # Ids cached from the rolled back transaction may not exist
+            for cache in self._terms.values():
+                cache.clear()
+            message = str(getattr(e, 'orig', None) or e).splitlines()[0]
+            self._error(records[0][0], f"Lines {records[0][0]}-{records[-1][0]} not imported: {message}",
+                        records=len(records))
+
+    def _insert(self, records):
+        self._resolve_authors(records)
+        rows = []
+        accepted = []
+        for line_number, record in records:
+            author_id = self._authors.get(record.get('author'), self.default_author_id)
+            if author_id is None:
+                self._error(line_number, f"Unknown author: {record.get('author')}")
+                continue
+            accepted.append(record)
+            row = {
+                'title': record['title'],
+                'content': record['content'],
+                'excerpt': record.get('excerpt'),
+                'featured_image_url': record.get('featured_image_url'),
+                'status': record.get('status') or 'draft',
+                'view_count': record.get('view_count') or 0,
+                'author_id': author_id,
+            }
+            for field in DATETIME_FIELDS:
+                row[field] = record.get(field)
+            row['created_at'] = row['created_at'] or datetime.utcnow()
+            row['updated_at'] = row['updated_at'] or row['created_at']
+            if row['status'] == 'published' and row['published_at'] is None:
+                row['published_at'] = row['created_at']
+            rows.append(row)
+
+        if not rows:
+            return
+
+        slugs = allocate_slugs([(record.get('slug') or record['title'], None) for record in accepted])
+        for row, slug in zip(rows, slugs):
+            row['slug'] = slug
+
+        for key, _, _, model in LINKS:
+            self._resolve_terms(model, [term for record in accepted for term in record[key]])
+
+        # Ids matched back by (unique) slug; RETURNING in parameter order
+        # would make SQLite insert row by row
+        ids_by_slug = dict(db.session.execute(
+            Post.__table__.insert().returning(Post.__table__.c.slug, Post.__table__.c.id), rows
+        ).all())
+        post_ids = [ids_by_slug[row['slug']] for row in rows]
+
+        for key, table, column, model in LINKS:
+            cache = self._terms[model]
+            links = [
+                {'post_id': post_id, column: term_id}
+                for post_id, record in zip(post_ids, accepted)
+                for term_id in {cache[term['slug']] for term in record[key]}
+            ]
+            if links:
+                db.session.execute(table.insert(), links)
+
+        db.session.commit()
+        self.imported += len(rows)
+
+    def run(self, lines):
+        """Import NDJSON lines (``str`` or ``bytes``).
+
+        Returns:
+            dict: {imported, skipped, errors}
+        """
+        schema = CorpusRecordSchema()
+        batch = []
+        for line_number, line in enumerate(lines, 1):
+            if not line.strip():
+                continue
+            try:
+                record = schema.load(json.loads(line))
+            except ValidationError as e:
+                self._error(line_number, _format_messages(e.messages))
+                continue
+            except ValueError as e:
+                self._error(line_number, f"Invalid JSON: {e}")
+                continue
+            batch.append((line_number, record))
+            if len(batch) >= self.batch_size:
+                self._flush(batch)
+                batch = []
+        if batch:
+            self._flush(batch)
+
+        if self.imported:
+            # Bulk inserts bypass the per-post index hooks
+            for index in (related_posts, title_index, tag_index, category_index):
+                index.invalidate()
+
+        return {'imported': self.imported, 'skipped': self.skipped, 'errors': self.errors}
+
+
+def _format_messages(messages):
+    """Flatten marshmallow's nested error messages into one line."""
+    if not isinstance(messages, dict):
+        return '; '.join(map(str, messages))
+    return '; '.join(f"{field}: {_format_messages(value)}" for field, value in messages.items())
+
+
+def import_posts(lines, batch_size=1000, default_author=None):
+    """Import posts from NDJSON lines (see ``CorpusImporter``).
+
+    Args:
+        lines: Iterable of NDJSON lines
+        batch_size: Records inserted per transaction
+        default_author: Username for records whose author does not exist
+
+    Returns:
+        dict: {imported, skipped, errors}
+
+    Raises:
+        ValueError: If ``default_author`` does not exist
+    """
+    return CorpusImporter(batch_size, default_author).run(lines)
@@ -0,0 +1,102 @@
+"""Facet counts for filtered post listings."""
+from app import db
+from app.models.post import Post
+from app.models.user import User
+from app.models.category import Category, post_categories
+from app.models.tag import Tag, post_tags
+
+
+FACETS = ('categories', 'tags', 'authors', 'months')
+
+
+def month_expression(column):
+    """SQL expression formatting a datetime column as ``YYYY-MM``."""
+    if db.engine.dialect.name == 'postgresql':
+        return db.func.to_char(column, 'YYYY-MM')
+    return db.func.strftime('%Y-%m', column)
+
+
+def facet_counts(query, limit=20):
+    """Count posts per category, tag, author and publication month.
+
+    All four facets are computed in a single statement. The filtered posts
+    are evaluated once into a CTE (materialized by PostgreSQL and SQLite
+    because it is referenced more than once); each facet counts integer
+    keys from it and only then joins in display names. The facets are
+    combined with UNION ALL.
+
+    Args:
+        query: Filtered ``Post`` query (ordering and paging are ignored)
+        limit: Maximum number of values returned per facet
+
+    Returns:
+        dict: Facet name -> list of {value, label, count}, most posts first
+    """
+    matching = (
+        query.order_by(None)
+        .filter(Post.purge_requested_at.is_(None))
+        .with_entities(Post.id, Post.author_id, Post.published_at)
+        .cte('matching_posts')
+    )
+    matching_ids = db.select(matching.c.id)
+    count = db.func.count().label('count')
+
+    category_counts = (
+        db.select(post_categories.c.category_id, count)
+        .where(post_categories.c.post_id.in_(matching_ids))
+        .group_by(post_categories.c.category_id)
+        .subquery()
+    )
+    categories = (
+        db.select(db.literal('categories').label('facet'), Category.slug.label('value'),
+                  Category.name.label('label'), category_counts.c.count)
+        .join_from(category_counts, Category, Category.id == category_counts.c.category_id)
+    )
+
+    tag_counts = (
+        db.select(post_tags.c.tag_id, count)
+        .where(post_tags.c.post_id.in_(matching_ids))
+        .group_by(post_tags.c.tag_id)
+        .subquery()
+    )
+    tags = (
+        db.select(db.literal('tags').label('facet'), Tag.slug.label('value'),
+                  Tag.name.label('label'), tag_counts.c.count)
+        .join_from(tag_counts, Tag, Tag.id == tag_counts.c.tag_id)
+    )
+
+    author_counts = (
+        db.select(matching.c.author_id, count)
+        .group_by(matching.c.author_id)
+        .subquery()
+    )
+    authors = (
+        db.select(db.literal('authors').label('facet'), User.username.label('value'),
+                  db.func.coalesce(User.display_name, User.username).label('label'),
+                  author_counts.c.count)
+        .join_from(author_counts, User, User.id == author_counts.c.author_id)
+    )
+
+    month = month_expression(matching.c.published_at).label('month')
+    month_counts = (
+        db.select(month, count)
+        .where(matching.c.published_at.isnot(None))
+        .group_by(month)
+        .subquery()
+    )
+    months = db.select(db.literal('months').label('facet'), month_counts.c.month.label('value'),
+                       month_counts.c.month.label('label'), month_counts.c.count)
+
+    facets = {name: [] for name in FACETS}
+    rows = db.session.execute(db.union_all(categories, tags, authors, months))
+    for facet, value, label, total in rows:
+        facets[facet].append({'value': value, 'label': label, 'count': total})
+
+    for name, values in facets.items():
+        if name == 'months':
+            values.sort(key=lambda v: v['value'], reverse=True)
+        else:
+            values.sort(key=lambda v: (-v['count'], v['label']))
+        del values[limit:]
+
+    return facets
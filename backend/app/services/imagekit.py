@@ -0,0 +1,168 @@
+"""ImageKit upload and delivery client."""
+import json
+import uuid
+from flask import current_app
+from app.services.tracing import tracer
+
+
+class ImageKitError(Exception):
+    """Raised when ImageKit rejects a request or cannot be reached."""
+
+    def __init__(self, message, status_code=None):
+        super().__init__(message)
+        self.status_code = status_code
+
+
+def _multipart_body(boundary, fields, filename, content_type, chunks):
+    """Yield a multipart/form-data body whose file part is streamed.
+
+    Form fields come first so ImageKit sees ``fileName`` before the file
+    bytes; the file part is passed through chunk by chunk.
+    """
+    delimiter = f'--{boundary}\r\n'.encode()
+    for name, value in fields.items():
+        yield delimiter
+        yield f'Content-Disposition: form-data; name="{name}"\r\n\r\n{value}\r\n'.encode()
+
+    safe_name = filename.replace('"', '%22').replace('\r', '').replace('\n', '')
+    yield delimiter
+    yield (
+        f'Content-Disposition: form-data; name="file"; filename="{safe_name}"\r\n'
+        f'Content-Type: {content_type or "application/octet-stream"}\r\n\r\n'
+    ).encode()
+    for chunk in chunks:
+        if chunk:
+            yield chunk
+    yield f'\r\n--{boundary}--\r\n'.encode()
+
+
+def upload_stream(chunks, filename, content_type=None, folder=None):
+    """Upload a file to ImageKit without buffering it.
+
+    The request body is sent with chunked transfer encoding straight from
+    ``chunks``, so memory use does not depend on the file size.
+
+    Args:
+        chunks: Iterable of ``bytes`` making up the file
+        filename: Original file name
+        content_type: Declared MIME type of the file
+        folder: Optional ImageKit folder
+
+    Returns:
+        dict: ImageKit upload response (fileId, url, name, size, ...)
+
+    Raises:
+        ImageKitError: If ImageKit is not configured or the upload fails
+    """
+    # Imported lazily: only upload workers need an HTTP client
+    import requests
+
+    config = current_app.config
+    if not config.get('IMAGEKIT_PRIVATE_KEY'):
+        raise ImageKitError("ImageKit is not configured")
+
+    fields = {'fileName': filename, 'useUniqueFileName': 'true'}
+    if folder:
+        fields['folder'] = folder
+
+    boundary = uuid.uuid4().hex
+    with tracer.span('imagekit.upload', **{'http.method': 'POST', 'http.url': config['IMAGEKIT_UPLOAD_URL']}) as span:
+        try:
+            response = requests.post(
+                config['IMAGEKIT_UPLOAD_URL'],
+                data=_multipart_body(boundary, fields, filename, content_type, chunks),
+                headers=tracer.inject({'Content-Type': f'multipart/form-data; boundary={boundary}'}),
+                auth=(config['IMAGEKIT_PRIVATE_KEY'], ''),
+                timeout=config['MEDIA_UPLOAD_TIMEOUT'],
+            )
+        except requests.RequestException as e:
+            raise ImageKitError(f"Upload failed: {e}") from e
+        span.set_attribute('http.status_code', response.status_code)
+
+    if response.status_code >= 400:
+        try:
+            message = response.json().get('message', response.text)
+        except (ValueError, AttributeError):
+            message = response.text
+        raise ImageKitError(f"Upload rejected: {message}", response.status_code)
+
+    try:
+        return response.json()
+    except json.JSONDecodeError as e:
+        raise ImageKitError("Invalid response from ImageKit") from e
+
+
+def transform_url(url, transforms):
+    """Build an ImageKit URL for a transformed rendition of a file.
+
+    ImageKit renders transformations on first request and caches them on
+    its CDN, so renditions need no upload or storage of their own.
+
+    Args:
+        url: Original file URL
+        transforms: Mapping of ImageKit transform keys to values,
+            e.g. ``{'w': 640, 'q': 80}``
+
+    Returns:
+        str: URL with a ``tr`` query parameter
+    """
+    tr = ','.join(f'{key}-{value}' for key, value in transforms.items())
+    return f"{url}{'&' if '?' in url else '?'}tr={tr}"
+
+
+def fetch(url, max_bytes=None):
+    """Download (the start of) a file from ImageKit's CDN.
+
+    Args:
+        url: File or rendition URL
+        max_bytes: Only fetch this many leading bytes (HTTP range request)
+
+    Returns:
+        bytes: File content
+
+    Raises:
+        ImageKitError: If the request fails
+    """
+    import requests
+
+    headers = tracer.inject({'Range': f'bytes=0-{max_bytes - 1}'} if max_bytes else {})
+    with tracer.span('imagekit.fetch', **{'http.method': 'GET', 'http.url': url}) as span:
+        try:
+            with requests.get(url, headers=headers, stream=True,
+                              timeout=current_app.config['MEDIA_FETCH_TIMEOUT']) as response:
+                span.set_attribute('http.status_code', response.status_code)
+                if response.status_code >= 400:
+                    raise ImageKitError(f"Fetch failed with status {response.status_code}", response.status_code)
+                body = bytearray()
+                for chunk in response.iter_content(64 * 1024):
+                    body += chunk
+                    if max_bytes and len(body) >= max_bytes:
+                        break
+        except requests.RequestException as e:
+            raise ImageKitError(f"Fetch failed: {e}") from e
+    return bytes(body[:max_bytes] if max_bytes else body)
+
+
+def delete_file(file_id):
+    """Delete a file from the ImageKit media library.
+
+    Raises:
+        ImageKitError: If the request fails
+    """
+    import requests
+
+    config = current_app.config
+    url = f"{config['IMAGEKIT_API_URL']}/files/{file_id}"
+    with tracer.span('imagekit.delete', **{'http.method': 'DELETE', 'http.url': url}) as span:
+        try:
+            response = requests.delete(
+                url,
+                headers=tracer.inject({}),
+                auth=(config['IMAGEKIT_PRIVATE_KEY'], ''),
+                timeout=config['MEDIA_FETCH_TIMEOUT'],
+            )
+        except requests.RequestException as e:
+            raise ImageKitError(f"Delete failed: {e}") from e
+        span.set_attribute('http.status_code', response.status_code)
+    if response.status_code >= 400 and response.status_code != 404:
+        raise ImageKitError(f"Delete failed with status {response.status_code}", response.status_code)
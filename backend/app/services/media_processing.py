@@ -0,0 +1,102 @@
+"""Post-upload media processing: dimensions, variants and placeholders."""
+import base64
+from datetime import datetime
+from flask import current_app
+from app import db
+from app.models.media import Media
+from app.services.background import background
+from app.services.imagekit import transform_url, fetch, ImageKitError
+from app.utils.media import sniff_mime, image_dimensions
+
+
+# Formats ImageKit can resize; SVG and animations are served as uploaded
+RASTER_TYPES = frozenset({
+    'image/jpeg', 'image/png', 'image/webp', 'image/avif', 'image/heic', 'image/bmp'
+})
+
+# Largest placeholder accepted (they are inlined into API responses)
+MAX_PLACEHOLDER_SIZE = 2048
+
+
+def responsive_variants(url, width, widths):
+    """Get resized rendition URLs for an image.
+
+    Args:
+        url: Original image URL
+        width: Original width in pixels (no upscaled variants are made)
+        widths: Candidate variant widths
+
+    Returns:
+        list: {width, url} dicts, narrowest first
+    """
+    return [
+        {'width': w, 'url': transform_url(url, {'w': w})}
+        for w in sorted(widths) if width is None or w < width
+    ]
+
+
+def blur_placeholder(url, width):
+    """Fetch a tiny blurred rendition of an image as a data URI.
+
+    Returns:
+        str: ``data:image/jpeg;base64,...`` or None if it could not be made
+    """
+    try:
+        data = fetch(transform_url(url, {'w': width, 'q': 40, 'bl': 2, 'f': 'jpg'}))
+    except ImageKitError as e:
+        current_app.logger.warning("Placeholder for %s failed: %s", url, e)
+        return None
+    if not data or len(data) > MAX_PLACEHOLDER_SIZE or sniff_mime(data) != 'image/jpeg':
+        return None
+    return 'data:image/jpeg;base64,' + base64.b64encode(data).decode('ascii')
+
+
+def process_media(media_id, head):
+    """Fill in a media item's dimensions, MIME type, variants and placeholder.
+
+    Dimensions come from the image header. ``head`` is what the upload
+    already read, so normally no download is needed; a ranged fetch of
+    ``MEDIA_PROBE_BYTES`` covers JPEGs whose metadata pushes the frame
+    header further in.
+
+    Args:
+        media_id: ``Media`` id
+        head: Leading bytes of the uploaded file
+    """
+    media = db.session.get(Media, media_id)
+    if media is None:
+        return
+    config = current_app.config
+
+    mime_type = sniff_mime(head) or media.file_type
+    if mime_type and mime_type.startswith('image/'):
+        dimensions = image_dimensions(head, mime_type)
+        probe_bytes = config['MEDIA_PROBE_BYTES']
+        if dimensions is None and len(head) < probe_bytes:
+            try:
+                dimensions = image_dimensions(fetch(media.imagekit_url, probe_bytes), mime_type)
+            except ImageKitError as e:
+                current_app.logger.warning("Probe of media %s failed: %s", media_id, e)
+        if dimensions:
+            media.width, media.height = dimensions
+
+    if mime_type in RASTER_TYPES:
+        media.variants = responsive_variants(media.imagekit_url, media.width, config['MEDIA_VARIANT_WIDTHS'])
+        media.placeholder = blur_placeholder(media.imagekit_url, config['MEDIA_PLACEHOLDER_WIDTH'])
+
+    media.file_type = mime_type
+    media.processed_at = datetime.utcnow()
+    try:
+        db.session.commit()
+    except Exception as e:
+        db.session.rollback()
+        current_app.logger.warning("Saving processed media %s failed: %s", media_id, e)
+
+
+def schedule_processing(media, head):
+    """Queue ``process_media`` for a newly saved media item.
+
+    Returns:
+        Future: Completes when processing is done
+    """
+    return background.submit(process_media, media.id, bytes(head))
@@ -0,0 +1,192 @@
+"""Streaming media upload pipeline."""
+import hashlib
+import re
+import threading
+from werkzeug.sansio.multipart import MultipartDecoder, Field, File, Data, Epilogue, NEED_DATA
+from app.utils.media import sniff_mime
+
+
+# Bytes kept from the start of each upload for type detection
+HEAD_SIZE = 64 * 1024
+
+# Bytes needed before the file type is checked against the allowlist
+SNIFF_SIZE = 512
+
+SHA256_RE = re.compile(r'^[0-9a-f]{64}$')
+
+
+class UploadTooLarge(Exception):
+    """Raised when an upload exceeds MEDIA_MAX_UPLOAD_SIZE."""
+
+
+class UnsupportedType(Exception):
+    """Raised when an upload's content is not one of MEDIA_ALLOWED_TYPES."""
+
+
+class UploadSlots:
+    """Bounded number of concurrent upstream uploads per worker."""
+
+    def __init__(self, limit=4):
+        self._semaphore = threading.BoundedSemaphore(limit)
+
+    def init_app(self, app):
+        """Size the pool from MEDIA_MAX_CONCURRENT_UPLOADS."""
+        self._semaphore = threading.BoundedSemaphore(app.config.get('MEDIA_MAX_CONCURRENT_UPLOADS', 4))
+
+    def acquire(self, timeout):
+        """Wait up to ``timeout`` seconds for a slot.
+
+        Returns:
+            bool: True if a slot was acquired
+        """
+        return self._semaphore.acquire(timeout=timeout)
+
+    def release(self):
+        self._semaphore.release()
+
+
+class StreamStats:
+    """Pass-through iterator that measures a file while it streams.
+
+    Counts bytes, hashes the content, keeps the first ``HEAD_SIZE`` bytes
+    for type detection and enforces a size limit, without ever holding
+    more than one chunk. With ``allowed_types``, the type sniffed from the
+    first ``SNIFF_SIZE`` bytes is checked before they are passed on, so a
+    disallowed file aborts the upload instead of being stored.
+    """
+
+    def __init__(self, chunks, max_size=None, allowed_types=None):
+        self._chunks = chunks
+        self._hash = hashlib.sha256()
+        self.max_size = max_size
+        self.allowed_types = allowed_types
+        self.size = 0
+        self.head = b''
+
+    def __iter__(self):
+        checked = self.allowed_types is None
+        for chunk in self._chunks:
+            self.size += len(chunk)
+            if self.max_size is not None and self.size > self.max_size:
+                raise UploadTooLarge(f"File exceeds {self.max_size} bytes")
+            if len(self.head) < HEAD_SIZE:
+                self.head += chunk[:HEAD_SIZE - len(self.head)]
+            if not checked and len(self.head) >= SNIFF_SIZE:
+                self._check_type()
+                checked = True
+            self._hash.update(chunk)
+            yield chunk
+        if not checked:
+            # Files shorter than SNIFF_SIZE, before the upload is completed
+            self._check_type()
+
+    def _check_type(self):
+        if self.mime_type not in self.allowed_types:
+            raise UnsupportedType(f"Unsupported file type: {self.mime_type or 'unrecognised'}")
+
+    @property
+    def sha256(self):
+        """Hex SHA-256 digest of the bytes streamed so far."""
+        return self._hash.hexdigest()
+
+    @property
+    def mime_type(self):
+        """MIME type detected from the file's leading bytes."""
+        return sniff_mime(self.head)
+
+
+def normalize_sha256(value):
+    """Validate a client-supplied hex SHA-256 digest.
+
+    Returns:
+        str: Lowercase digest, or None if ``value`` is not one
+    """
+    value = (value or '').strip().lower()
+    return value if SHA256_RE.match(value) else None
+
+
+def iter_raw(stream, chunk_size):
+    """Read a request body in chunks."""
+    while True:
+        chunk = stream.read(chunk_size)
+        if not chunk:
+            break
+        yield chunk
+
+
+class MultipartUpload:
+    """Incremental multipart/form-data parser for a single file upload.
+
+    ``open()`` consumes the body up to the start of the ``file`` part and
+    collects any form fields before it; iterating then yields the file's
+    bytes as they arrive; ``finish()`` reads the rest of the body for
+    fields that follow the file.
+    """
+
+    def __init__(self, stream, boundary, chunk_size, file_field='file'):
+        self._stream = stream
+        self._chunk_size = chunk_size
+        self._decoder = MultipartDecoder(boundary.encode('latin-1'), max_form_memory_size=64 * 1024)
+        self._file_field = file_field
+        self._current_field = None
+        self._field_data = []
+        self._done = False
+        self._events_iter = iter(())
+        self.fields = {}
+        self.filename = None
+        self.content_type = None
+
+    def _events(self):
+        while True:
+            event = self._decoder.next_event()
+            if event is NEED_DATA:
+                if self._done:
+                    return
+                chunk = self._stream.read(self._chunk_size)
+                self._decoder.receive_data(chunk or None)
+                self._done = not chunk
+                continue
+            yield event
+            if isinstance(event, Epilogue):
+                return
+
+    def _collect(self, event):
+        if isinstance(event, Field):
+            self._current_field = event.name
+            self._field_data = []
+        elif isinstance(event, Data) and self._current_field is not None:
+            self._field_data.append(event.data)
+            if not event.more_data:
+                self.fields[self._current_field] = b''.join(self._field_data).decode('utf-8', 'replace')
+                self._current_field = None
+
+    def open(self):
+        """Advance to the file part.
+
+        Returns:
+            bool: True if a file part was found
+        """
+        self._events_iter = self._events()
+        for event in self._events_iter:
+            if isinstance(event, File) and event.name == self._file_field:
+                self.filename = event.filename
+                self.content_type = event.headers.get('Content-Type')
+                return True
+            self._collect(event)
+        return False
+
+    def __iter__(self):
+        for event in self._events_iter:
+            if isinstance(event, Data):
+                if event.data:
+                    yield event.data
+                if not event.more_data:
+                    return
+
+    def finish(self):
+        """Read trailing form fields after the file part."""
+        for event in self._events_iter:
+            self._collect(event)
+
+
+upload_slots = UploadSlots()
@@ -0,0 +1,280 @@
+"""Request, SQL and connection pool metrics in Prometheus text format."""
+import threading
+import time
+from bisect import bisect_left
+from contextvars import ContextVar
+from flask import request
+from sqlalchemy import event
+
+
+# Prometheus client defaults, in seconds
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+# [start, SQL statements, SQL seconds, status] for the current request. A
+# context variable rather than flask.g: it is read on every SQL statement
+_request_state = ContextVar('metrics_request_state', default=None)
+
+
+def _format_labels(names, values, extra=''):
+    pairs = [
+        '{}="{}"'.format(name, str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n'))
+        for name, value in zip(names, values)
+    ]
+    if extra:
+        pairs.append(extra)
+    return '{' + ','.join(pairs) + '}' if pairs else ''
+
+
+def _format_value(value):
+    if value == float('inf'):
+        return '+Inf'
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Metric:
+    """Base for metrics keyed by a tuple of label values."""
+
+    kind = None
+
+    def __init__(self, name, documentation, labels=()):
+        self.name = name
+        self.documentation = documentation
+        self.label_names = tuple(labels)
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def _samples(self):
+        raise NotImplementedError
+
+    def render(self):
+        lines = [f'# HELP {self.name} {self.documentation}', f'# TYPE {self.name} {self.kind}']
+        with self._lock:
+            lines.extend(self._samples())
+        return lines
+
+
+class Counter(Metric):
+    """Monotonically increasing count."""
+
+    kind = 'counter'
+
+    def __init__(self, name, documentation, labels=()):
+        super().__init__(name, documentation, labels)
+        if not self.label_names:
+            self._values[()] = 0
+
+    def inc(self, labels=(), amount=1):
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0) + amount
+
+    def _samples(self):
+        return [f'{self.name}{_format_labels(self.label_names, labels)} {_format_value(value)}'
+                for labels, value in sorted(self._values.items())]
+
+
+class Gauge(Counter):
+    """Value that goes up and down, or is read by a callback at scrape time."""
+
+    kind = 'gauge'
+
+    def __init__(self, name, documentation, labels=(), callback=None):
+        super().__init__(name, documentation, labels)
+        self.callback = callback
+
+    def _samples(self):
+        if self.callback is not None:
+            self._values = dict(self.callback())
+        return super()._samples()
+
+
+class Histogram(Metric):
+    """Observations counted into cumulative ``le`` buckets."""
+
+    kind = 'histogram'
+
+    def __init__(self, name, documentation, labels=(), buckets=DEFAULT_BUCKETS):
+        super().__init__(name, documentation, labels)
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, labels, value):
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._values.get(labels)
+            if series is None:
+                # Per-bucket counts (last slot is +Inf), sum
+                series = self._values[labels] = [[0] * (len(self.buckets) + 1), 0.0]
+            series[0][index] += 1
+            series[1] += value
+
+    def _samples(self):
+        lines = []
+        for labels, (counts, total) in sorted(self._values.items()):
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float('inf'),), counts):
+                cumulative += count
+                le = 'le="{}"'.format(_format_value(bound))
+                lines.append(f'{self.name}_bucket{_format_labels(self.label_names, labels, le)} {cumulative}')
+            label_text = _format_labels(self.label_names, labels)
+            lines.append(f'{self.name}_sum{label_text} {_format_value(total)}')
+            lines.append(f'{self.name}_count{label_text} {cumulative}')
+        return lines
+
+
+class Metrics:
+    """Per-process metrics registry with Flask and SQLAlchemy hooks.
+
+    Requests are timed from the first ``before_request`` hook to
+    teardown and labelled by blueprint and endpoint (never by raw path,
+    so label cardinality stays bounded). SQL statements are counted and
+    timed with engine events and charged to the current request. Pool
+    checkout waits are timed around ``Pool.connect``; pool occupancy is
+    read when scraped.
+
+    Each worker process keeps its own registry.
+    """
+
+    def __init__(self):
+        self.enabled = False
+        self._metrics = []
+        self.requests = self.counter(
+            'http_requests_total', 'HTTP requests by endpoint, method and status code.',
+            ('blueprint', 'endpoint', 'method', 'status'))
+        self.latency = self.histogram(
+            'http_request_duration_seconds', 'HTTP request latency.',
+            ('blueprint', 'endpoint', 'method'))
+        self.in_flight = self.gauge('http_requests_in_flight', 'HTTP requests being served.')
+        self.request_statements = self.histogram(
+            'http_request_db_statements', 'SQL statements executed per HTTP request.',
+            ('blueprint', 'endpoint'), (0, 1, 2, 5, 10, 20, 50, 100, 500))
+        self.request_db_time = self.histogram(
+            'http_request_db_duration_seconds', 'Time spent in SQL per HTTP request.',
+            ('blueprint', 'endpoint'))
+        self.statements = self.counter(
+            'db_statements_total', 'SQL statements executed, in and out of requests.')
+        self.statement_time = self.counter(
+            'db_statement_duration_seconds_total', 'Time spent executing SQL statements.')
+        self.checkout_wait = self.histogram(
+            'db_pool_checkout_wait_seconds', 'Time spent waiting to check out a pooled connection.',
+            buckets=(0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0, 30.0))
+        self.pool_state = self.gauge(
+            'db_pool_connections', 'Pooled connections by state.', ('state',), callback=self._pool_state)
+        self._engine = None
+
+    def counter(self, name, documentation, labels=()):
+        return self._register(Counter(name, documentation, labels))
+
+    def gauge(self, name, documentation, labels=(), callback=None):
+        return self._register(Gauge(name, documentation, labels, callback))
+
+    def histogram(self, name, documentation, labels=(), buckets=DEFAULT_BUCKETS):
+        return self._register(Histogram(name, documentation, labels, buckets))
+
+    def _register(self, metric):
+        self._metrics.append(metric)
+        return metric
+
+    def init_app(self, app, engine):
+        """Install request hooks and engine/pool listeners.
+
+        Args:
+            app: Flask application
+            engine: SQLAlchemy engine to instrument
+        """
+        self.enabled = app.config.get('METRICS_ENABLED', True)
+        if not self.enabled:
+            return
+
+        # Run before other hooks (rate limiting, auth) so their time is counted
+        app.before_request_funcs.setdefault(None, []).insert(0, self._start_request)
+        app.after_request(self._finish_response)
+        app.teardown_request(self._end_request)
+
+        if self._engine is not engine:
+            self._engine = engine
+            event.listen(engine, 'before_cursor_execute', self._before_cursor_execute)
+            event.listen(engine, 'after_cursor_execute', self._after_cursor_execute)
+            self._time_checkouts(engine.pool)
+            event.listen(engine, 'engine_disposed', lambda engine: self._time_checkouts(engine.pool))
+
+    # Requests
+
+    def _start_request(self):
+        _request_state.set([time.perf_counter(), 0, 0.0, 500])
+        self.in_flight.inc()
+
+    def _finish_response(self, response):
+        state = _request_state.get()
+        if state is not None:
+            state[3] = response.status_code
+        return response
+
+    def current_statements(self):
+        """SQL statements run so far by the request being served, or None if not counted."""
+        state = _request_state.get()
+        return state[1] if state is not None else None
+
+    def _end_request(self, exc):
+        state = _request_state.get()
+        if state is None:
+            return
+        _request_state.set(None)
+        started, statements, db_time, status = state
+        self.in_flight.inc(amount=-1)
+        blueprint = request.blueprint or ''
+        endpoint = request.endpoint or 'unmatched'
+        method = request.method
+        self.latency.observe((blueprint, endpoint, method), time.perf_counter() - started)
+        self.requests.inc((blueprint, endpoint, method, str(status)))
+        self.request_statements.observe((blueprint, endpoint), statements)
+        self.request_db_time.observe((blueprint, endpoint), db_time)
+
+    # SQL
+
+    def _before_cursor_execute(self, conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault('metrics_started', []).append(time.perf_counter())
+
+    def _after_cursor_execute(self, conn, cursor, statement, parameters, context, executemany):
+        started = conn.info.get('metrics_started')
+        if not started:
+            return
+        elapsed = time.perf_counter() - started.pop()
+        self.statements.inc()
+        self.statement_time.inc(amount=elapsed)
+        state = _request_state.get()
+        if state is not None:
+            state[1] += 1
+            state[2] += elapsed
+
+    # Connection pool
+
+    def _time_checkouts(self, pool):
+        connect = pool.connect
+
+        def timed_connect():
+            started = time.perf_counter()
+            try:
+                return connect()
+            finally:
+                self.checkout_wait.observe((), time.perf_counter() - started)
+
+        pool.connect = timed_connect
+
+    def _pool_state(self):
+        pool = self._engine.pool if self._engine is not None else None
+        if pool is None or not hasattr(pool, 'checkedout'):
+            return []
+        return [
+            (('checked_out',), pool.checkedout()),
+            (('idle',), pool.checkedin()),
+            (('overflow',), max(pool.overflow(), 0)),
+        ]
+
+    def render(self):
+        """Get every metric in Prometheus text exposition format."""
+        lines = []
+        for metric in self._metrics:
+            lines.extend(metric.render())
+        return '\n'.join(lines) + '\n'
+
+
+metrics = Metrics()
@@ -0,0 +1,270 @@
+"""Batched post writes: create, update, publish and tag assignment."""
+from datetime import datetime
+from app import db
+from app.models.post import Post
+from app.models.category import Category, post_categories
+from app.models.tag import Tag, post_tags
+from app.services.associations import ensure_tags, tag_slug
+from app.services.autocomplete import tag_index, category_index
+from app.services.related import related_posts
+from app.services.title_index import title_index
+from app.services.trending import trending
+from app.utils.slugs import allocate_slugs
+
+
+# (association table, link column, model) per association field
+ASSOCIATIONS = {
+    'category_ids': (post_categories, 'category_id', Category),
+    'tag_ids': (post_tags, 'tag_id', Tag),
+}
+
+UPDATABLE_FIELDS = ('title', 'content', 'excerpt', 'featured_image_url')
+
+
+def _error(index, status, message):
+    return {'index': index, 'status': status, 'error': message}
+
+
+class PostBatch:
+    """Apply a list of validated post operations in one transaction.
+
+    Each operation is a dict with ``op`` ('create', 'update', 'publish' or
+    'tag'), ``index`` (position in the request), ``id`` for existing posts
+    and ``data`` (schema-validated fields). Target posts, categories, tags,
+    slugs and existing associations are each resolved with one query for
+    the whole batch; posts are updated in a single flush, inserted with one
+    multi-row INSERT, and association rows written with executemany.
+    """
+
+    def __init__(self, user):
+        self.user = user
+
+    def _can_write(self, post):
+        if self.user.role in ('admin', 'editor'):
+            return True
+        return post.author_id == self.user.id
+
+    def _check_targets(self, operations, results):
+        """Load target posts and drop operations on missing or forbidden posts.
+
+        Posts being purged count as missing, as in the rbac decorators.
+        """
+        ids = {op['id'] for op in operations if op['op'] != 'create'}
+        posts = {post.id: post for post in Post.query.filter(
+            Post.id.in_(ids), Post.purge_requested_at.is_(None)
+        )} if ids else {}
+
+        allowed = []
+        for op in operations:
+            if op['op'] != 'create':
+                post = posts.get(op['id'])
+                if post is None:
+                    results[op['index']] = _error(op['index'], 404, "Post not found")
+                    continue
+                if not self._can_write(post):
+                    results[op['index']] = _error(
+                        op['index'], 403, f"You don't have permission to {op['op']} this post"
+                    )
+                    continue
+                op['post'] = post
+            allowed.append(op)
+        return allowed
+
+    def _check_associations(self, operations, results):
+        """Drop operations naming unknown category/tag ids (one IN query per model)."""
+        unknown = {}
+        for field, (_, _, model) in ASSOCIATIONS.items():
+            requested = set()
+            for op in operations:
+                requested.update(op['data'].get(field, ()))
+            existing = set(db.session.scalars(db.select(model.id).where(model.id.in_(requested)))) if requested else set()
+            unknown[field] = requested - existing
+
+        allowed = []
+        for op in operations:
+            messages = {}
+            for field, missing in unknown.items():
+                bad = sorted(missing.intersection(op['data'].get(field, ())))
+                if bad:
+                    messages[field] = [f"Unknown ids: {', '.join(map(str, bad))}"]
+            if messages:
+                results[op['index']] = {**_error(op['index'], 400, "Validation failed"), 'messages': messages}
+                continue
+            allowed.append(op)
+        return allowed
+
+    def _resolve_tag_names(self, operations):
+        """Fold ``tag_names`` into ``tag_ids``, creating missing tags in one statement.
+
+        Returns:
+            list: Created (id, name, slug) tuples
+        """
+        names = [name for op in operations for name in op['data'].get('tag_names', ())]
+        if not names:
+            return []
+        ids, created = ensure_tags(names)
+        for op in operations:
+            if op['data'].get('tag_names'):
+                named = [ids[slug] for slug in map(tag_slug, op['data']['tag_names']) if slug in ids]
+                op['data']['tag_ids'] = list(op['data'].get('tag_ids', ())) + named
+        return created
+
+    def _current_links(self, post_ids):
+        """Current category/tag ids per existing post (one query per table)."""
+        links = {field: {} for field in ASSOCIATIONS}
+        if not post_ids:
+            return links
+        for field, (table, column, _) in ASSOCIATIONS.items():
+            rows = db.session.execute(
+                db.select(table.c.post_id, table.c[column]).where(table.c.post_id.in_(post_ids))
+            )
+            for post_id, link_id in rows:
+                links[field].setdefault(post_id, set()).add(link_id)
+        return links
+
+    def apply(self, operations, results, atomic=False):
+        """Run the operations.
+
+        Args:
+            operations: Validated operation dicts (see class docstring)
+            results: Per-item result list, pre-filled with validation errors
+            atomic: If True, write nothing unless every item is valid
+
+        Returns:
+            tuple: (results, committed)
+        """
+        operations = self._check_targets(operations, results)
+        operations = self._check_associations(operations, results)
+        if atomic and any(result is not None for result in results):
+            for op in operations:
+                results[op['index']] = _error(op['index'], 409, "Not applied: other items in the batch failed")
+            return results, False
+        if not operations:
+            return results, False
+
+        # Slugs for new posts and retitled posts, allocated together
+        retitled = [
+            op for op in operations
+            if op['op'] == 'create' or (op['op'] == 'update' and 'title' in op['data']
+                                        and op['data']['title'] != op['post'].title)
+        ]
+        slugs = allocate_slugs([(op['data']['title'], op.get('post') and op['post'].id) for op in retitled])
+        for op, slug in zip(retitled, slugs):
+            op['slug'] = slug
+
+        now = datetime.utcnow()
+        created = []
+        for op in operations:
+            data = op['data']
+            if op['op'] == 'create':
+                created.append({
+                    'title': data['title'],
+                    'slug': op['slug'],
+                    'content': data['content'],
+                    'excerpt': data.get('excerpt'),
+                    'featured_image_url': data.get('featured_image_url'),
+                    'author_id': self.user.id,
+                    'status': data.get('status', 'draft'),
+                    'published_at': now if data.get('status') == 'published' else None,
+                    'created_at': now,
+                    'updated_at': now,
+                })
+            elif op['op'] == 'update':
+                post = op['post']
+                for field in UPDATABLE_FIELDS:
+                    if field in data:
+                        setattr(post, field, data[field])
+                if 'slug' in op:
+                    post.slug = op['slug']
+                if 'status' in data:
+                    if post.status == 'draft' and data['status'] == 'published':
+                        post.published_at = now
+                    post.status = data['status']
+            elif op['op'] == 'publish':
+                op['post'].publish()
+
+        try:
+            created_tags = self._resolve_tag_names(operations)
+            # Grouped UPDATEs for changed posts, then one multi-row INSERT for
+            # new ones. Ids are matched back by slug, which is unique: asking
+            # for RETURNING in parameter order would make SQLite insert
+            # row by row
+            db.session.flush()
+            ids_by_slug = dict(db.session.execute(
+                Post.__table__.insert().returning(Post.__table__.c.slug, Post.__table__.c.id), created
+            ).all()) if created else {}
+            for op in operations:
+                op['post_id'] = ids_by_slug[op['slug']] if op['op'] == 'create' else op['post'].id
+
+            existing_ids = {op['post_id'] for op in operations if op['op'] != 'create'}
+            before = self._current_links(existing_ids)
+            after = {field: {post_id: set(ids) for post_id, ids in links.items()}
+                     for field, links in before.items()}
+
+            for op in operations:
+                post_id = op['post_id']
+                for field in ASSOCIATIONS:
+                    if field not in op['data']:
+                        continue
+                    ids = set(op['data'][field])
+                    if op['op'] == 'tag' and op['data'].get('mode') == 'add':
+                        ids |= after[field].get(post_id, set())
+                    after[field][post_id] = ids
+
+            for field, (table, column, _) in ASSOCIATIONS.items():
+                removed = [
+                    {'p': post_id, 'l': link_id}
+                    for post_id, ids in before[field].items()
+                    for link_id in ids - after[field].get(post_id, set())
+                ]
+                added = [
+                    {'post_id': post_id, column: link_id}
+                    for post_id, ids in after[field].items()
+                    for link_id in ids - before[field].get(post_id, set())
+                ]
+                if removed:
+                    db.session.execute(
+                        table.delete().where(table.c.post_id == db.bindparam('p'),
+                                             table.c[column] == db.bindparam('l')),
+                        removed
+                    )
+                if added:
+                    db.session.execute(table.insert(), added)
+
+            db.session.commit()
+        except Exception:
+            db.session.rollback()
+            raise
+
+        # Refresh every touched post with one query before updating indexes
+        touched = {op['post_id'] for op in operations}
+        posts = {post.id: post for post in Post.query.filter(Post.id.in_(touched))}
+        for post_id, post in posts.items():
+            links = {field: after[field].get(post_id, before[field].get(post_id, set())) for field in ASSOCIATIONS}
+            if post.status == 'published':
+                related_posts.update({
+                    'id': post.id, 'slug': post.slug, 'title': post.title,
+                    'excerpt': post.excerpt, 'content': post.content,
+                    'tag_ids': list(links['tag_ids']), 'category_ids': list(links['category_ids']),
+                })
+            else:
+                related_posts.remove(post.id)
+                trending.forget(post.id)
+            title_index.update_post(post)
+
+        for tag_id, name, slug in created_tags:
+            tag_index.add(tag_id, name, slug, 0)
+        for field, index in (('category_ids', category_index), ('tag_ids', tag_index)):
+            for post_id, ids in after[field].items():
+                old = before[field].get(post_id, set())
+                index.adjust_counts(ids - old, 1)
+                index.adjust_counts(old - ids, -1)
+
+        for op in operations:
+            post = posts[op['post_id']]
+            results[op['index']] = {
+                'index': op['index'],
+                'status': 201 if op['op'] == 'create' else 200,
+                'post': {'id': post.id, 'slug': post.slug, 'status': post.status}
+            }
+        return results, True
@@ -0,0 +1,296 @@
+"""On-demand and sampled request profiling with folded-stack output."""
+import json
+import os
+import random
+import sys
+import threading
+import time
+import uuid
+from collections import Counter
+from contextvars import ContextVar
+from datetime import datetime
+from functools import lru_cache
+from urllib.parse import urlencode
+from flask import request
+from flask_jwt_extended import get_jwt_identity, verify_jwt_in_request
+from flask_jwt_extended.exceptions import JWTExtendedException
+from itsdangerous import BadSignature, URLSafeTimedSerializer
+from jwt import PyJWTError
+
+
+MODES = ('sample', 'trace')
+
+# Header (or query parameter) carrying a token from POST /api/admin/profiles/token
+TOKEN_HEADER = 'X-Profile-Token'
+TOKEN_PARAM = '_profile'
+
+# Profile of the request being served, if any
+_active_profile = ContextVar('profiling_active_profile', default=None)
+
+
+def redacted_path():
+    """Path and query string of the current request, without a profiling token."""
+    query = urlencode([(key, value) for key, value in request.args.items(multi=True) if key != TOKEN_PARAM])
+    return f'{request.path}?{query}' if query else request.path
+
+
+@lru_cache(maxsize=4096)
+def _label(code):
+    """Frame label for flame graphs: ``function (path:line)``."""
+    path = code.co_filename.replace('\\', '/')
+    for marker in ('/site-packages/', '/backend/'):
+        if marker in path:
+            path = path.split(marker, 1)[1]
+            break
+    return f'{code.co_name} ({path}:{code.co_firstlineno})'
+
+
+class SamplingProfiler:
+    """Record one thread's stack every ``interval`` seconds from a helper thread.
+
+    The profiled code runs at full speed apart from the GIL hand-offs;
+    stack weights are sample counts.
+    """
+
+    unit = 'samples'
+
+    def __init__(self, interval=0.005):
+        self.interval = interval
+        self.stacks = Counter()
+        self._thread_id = None
+        self._stop = threading.Event()
+        self._sampler = None
+
+    def start(self):
+        self._thread_id = threading.get_ident()
+        self._sampler = threading.Thread(target=self._run, name='profiler', daemon=True)
+        self._sampler.start()
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self._thread_id)
+            labels = []
+            while frame is not None:
+                labels.append(_label(frame.f_code))
+                frame = frame.f_back
+            if labels:
+                self.stacks[';'.join(reversed(labels))] += 1
+
+    def stop(self):
+        self._stop.set()
+        self._sampler.join()
+
+
+class TracingProfiler:
+    """Deterministic profiler: every Python and C call via ``sys.setprofile``.
+
+    Stack weights are self time in microseconds. Exact call counts and
+    timings, at several times the normal run time.
+    """
+
+    unit = 'microseconds'
+
+    def __init__(self):
+        self.stacks = Counter()
+        # Open calls: [label, start ns, time spent in children ns]
+        self._calls = []
+
+    def start(self):
+        sys.setprofile(self._event)
+
+    def _event(self, frame, event, arg):
+        if event == 'call' or event == 'c_call':
+            label = _label(frame.f_code) if event == 'call' else f'{getattr(arg, "__qualname__", arg)} (builtin)'
+            self._calls.append([label, time.perf_counter_ns(), 0])
+        elif self._calls:
+            # return, c_return or c_exception
+            label, started, children = self._calls.pop()
+            elapsed = time.perf_counter_ns() - started
+            path = ';'.join([call[0] for call in self._calls] + [label])
+            self.stacks[path] += (elapsed - children) // 1000
+            if self._calls:
+                self._calls[-1][2] += elapsed
+
+    def stop(self):
+        sys.setprofile(None)
+
+
+class Profiler:
+    """Profile selected requests and keep the results for admins.
+
+    A request is profiled when it carries a valid token from
+    ``issue_token`` in the X-Profile-Token header or ``_profile`` query
+    parameter (the token names the mode) together with a JWT of the admin
+    it was issued to, or when it is picked at
+    PROFILING_SAMPLE_RATE for continuous sampling. Everything else costs
+    a header lookup, plus one random draw when the sample rate is set.
+
+    Profiles are written to PROFILING_DIR as folded stacks (one
+    ``frame;frame;frame weight`` line per stack, as read by flamegraph.pl,
+    speedscope and inferno) next to a JSON metadata file, so every worker
+    process's profiles are listed together. Only the newest
+    PROFILING_MAX_STORED are kept.
+    """
+
+    def __init__(self):
+        self.enabled = False
+        self.directory = None
+        self.sample_rate = 0.0
+        self.interval = 0.005
+        self.token_ttl = 3600
+        self.max_stored = 200
+        self._serializer = None
+
+    def init_app(self, app):
+        """Install the request hooks if PROFILING_ENABLED.
+
+        Args:
+            app: Flask application
+        """
+        self.enabled = app.config.get('PROFILING_ENABLED', True)
+        if not self.enabled:
+            return
+        self.directory = app.config.get('PROFILING_DIR') or os.path.join(app.instance_path, 'profiles')
+        self.sample_rate = app.config.get('PROFILING_SAMPLE_RATE', 0.0)
+        self.interval = app.config.get('PROFILING_INTERVAL', 0.005)
+        self.token_ttl = app.config.get('PROFILING_TOKEN_TTL', 3600)
+        self.max_stored = app.config.get('PROFILING_MAX_STORED', 200)
+        self._serializer = URLSafeTimedSerializer(app.config['SECRET_KEY'], salt='request-profiling')
+        self._logger = app.logger
+
+        # First hook in, last hook out, so other hooks are profiled too
+        app.before_request_funcs.setdefault(None, []).insert(0, self._start_request)
+        app.after_request(self._finish_response)
+        app.teardown_request(self._end_request)
+
+    # Tokens
+
+    def issue_token(self, mode, issued_by):
+        """Sign a token that profiles requests sending it.
+
+        The token is bound to ``issued_by``: it only takes effect on
+        requests that also carry a valid JWT for that user, so a token
+        leaked through a logged URL is useless on its own.
+
+        Args:
+            mode: 'sample' or 'trace'
+            issued_by: Id of the admin asking for it
+
+        Returns:
+            str: Token valid for PROFILING_TOKEN_TTL seconds
+        """
+        return self._serializer.dumps({'mode': mode, 'by': issued_by})
+
+    def _read_token(self, token):
+        try:
+            data = self._serializer.loads(token, max_age=self.token_ttl)
+        except BadSignature:
+            return None
+        return data if data.get('mode') in MODES else None
+
+    def _issued_to_caller(self, data):
+        try:
+            verify_jwt_in_request(optional=True)
+        except (JWTExtendedException, PyJWTError):
+            return False
+        return get_jwt_identity() == str(data.get('by'))
+
+    # Requests
+
+    def _start_request(self):
+        token = request.headers.get(TOKEN_HEADER) or request.args.get(TOKEN_PARAM)
+        if token:
+            data = self._read_token(token)
+            if data is None or not self._issued_to_caller(data):
+                return
+            mode, trigger, issued_by = data['mode'], 'token', data['by']
+        elif self.sample_rate and random.random() < self.sample_rate:
+            mode, trigger, issued_by = 'sample', 'sampled', None
+        else:
+            return
+
+        profiler = SamplingProfiler(self.interval) if mode == 'sample' else TracingProfiler()
+        state = {
+            'id': f"{datetime.utcnow():%Y%m%dT%H%M%S}-{uuid.uuid4().hex[:8]}",
+            'mode': mode,
+            'unit': profiler.unit,
+            'trigger': trigger,
+            'issued_by': issued_by,
+            'method': request.method,
+            'path': redacted_path(),
+            'endpoint': request.endpoint,
+            'status': None,
+            'started_at': datetime.utcnow().isoformat(),
+        }
+        _active_profile.set((profiler, state, time.perf_counter()))
+        profiler.start()
+
+    def _finish_response(self, response):
+        active = _active_profile.get()
+        if active is not None:
+            active[1]['status'] = response.status_code
+            response.headers['X-Profile-Id'] = active[1]['id']
+        return response
+
+    def _end_request(self, exc):
+        active = _active_profile.get()
+        if active is None:
+            return
+        _active_profile.set(None)
+        profiler, state, started = active
+        profiler.stop()
+        state['duration_ms'] = round((time.perf_counter() - started) * 1000, 3)
+        state['stacks'] = len(profiler.stacks)
+        state['total'] = sum(profiler.stacks.values())
+        try:
+            self._save(state, profiler.stacks)
+        except OSError:
+            self._logger.exception("Could not store profile %s", state['id'])
+
+    # Storage
+
+    def _save(self, state, stacks):
+        os.makedirs(self.directory, exist_ok=True)
+        base = os.path.join(self.directory, state['id'])
+        with open(base + '.folded', 'w', encoding='utf-8') as f:
+            f.writelines(f'{stack} {weight}\n' for stack, weight in stacks.most_common() if weight > 0)
+        # Metadata last: listings only show complete profiles
+        with open(base + '.json', 'w', encoding='utf-8') as f:
+            json.dump(state, f)
+        self._prune()
+
+    def _prune(self):
+        stored = sorted(name[:-5] for name in os.listdir(self.directory) if name.endswith('.json'))
+        for profile_id in stored[:-self.max_stored] if len(stored) > self.max_stored else ():
+            for suffix in ('.json', '.folded'):
+                try:
+                    os.remove(os.path.join(self.directory, profile_id + suffix))
+                except FileNotFoundError:
+                    pass
+
+    def list_profiles(self, limit=50):
+        """Get metadata of stored profiles, newest first."""
+        if not self.directory or not os.path.isdir(self.directory):
+            return []
+        names = sorted((name for name in os.listdir(self.directory) if name.endswith('.json')), reverse=True)
+        profiles = []
+        for name in names[:limit]:
+            try:
+                with open(os.path.join(self.directory, name), encoding='utf-8') as f:
+                    profiles.append(json.load(f))
+            except (OSError, ValueError):
+                continue
+        return profiles
+
+    def folded(self, profile_id):
+        """Get a stored profile's folded stacks, or None if unknown."""
+        if not self.directory or os.path.basename(profile_id) != profile_id or profile_id.startswith('.'):
+            return None
+        try:
+            with open(os.path.join(self.directory, profile_id + '.folded'), encoding='utf-8') as f:
+                return f.read()
+        except FileNotFoundError:
+            return None
+
+
+profiler = Profiler()
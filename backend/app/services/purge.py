@@ -0,0 +1,73 @@
+"""Batched background deletion of posts with large view histories."""
+from flask import current_app
+from app import db
+from app.models.analytics import PageView
+from app.models.category import post_categories
+from app.models.post import Post
+from app.models.tag import post_tags
+from app.services.autocomplete import category_index, tag_index
+
+
+def delete_in_batches(column, value, batch_size):
+    """Delete rows where ``column == value``, committing every batch.
+
+    Short transactions keep locks and WAL/undo growth bounded and let
+    other writers interleave, unlike one statement over millions of rows.
+
+    Args:
+        column: Indexed foreign key column, e.g. ``PageView.post_id``
+        value: Key value to delete
+        batch_size: Rows per transaction
+
+    Returns:
+        int: Number of rows deleted
+    """
+    table = column.table
+    primary_key = table.primary_key.columns.values()[0]
+    deleted = 0
+    while True:
+        batch = db.select(primary_key).where(column == value).limit(batch_size).scalar_subquery()
+        result = db.session.execute(db.delete(table).where(primary_key.in_(batch)))
+        db.session.commit()
+        deleted += result.rowcount
+        if result.rowcount < batch_size:
+            return deleted
+
+
+def purge_post(post_id):
+    """Delete a post's page views in batches, then the post itself.
+
+    Only purges posts marked with ``purge_requested_at``, so running it
+    again after an interrupted purge is safe. Autosaves, tag/category links
+    and trending rows go with the post through ON DELETE CASCADE; the
+    autocomplete post counts are adjusted once that has committed.
+
+    Returns:
+        bool: Whether the post was purged
+    """
+    pending = db.session.execute(
+        db.select(Post.id).where(Post.id == post_id, Post.purge_requested_at.is_not(None))
+    ).scalar()
+    if pending is None:
+        return False
+    category_ids = db.session.execute(
+        db.select(post_categories.c.category_id).where(post_categories.c.post_id == post_id)
+    ).scalars().all()
+    tag_ids = db.session.execute(
+        db.select(post_tags.c.tag_id).where(post_tags.c.post_id == post_id)
+    ).scalars().all()
+
+    views = delete_in_batches(PageView.post_id, post_id, current_app.config['PURGE_BATCH_SIZE'])
+    db.session.execute(db.delete(Post).where(Post.id == post_id))
+    db.session.commit()
+    category_index.adjust_counts(category_ids, -1)
+    tag_index.adjust_counts(tag_ids, -1)
+    current_app.logger.info("Purged post %s and %s page views", post_id, views)
+    return True
+
+
+def pending_purges():
+    """IDs of deleted posts whose purge has not finished (e.g. the worker restarted)."""
+    return db.session.execute(
+        db.select(Post.id).where(Post.purge_requested_at.is_not(None)).order_by(Post.purge_requested_at)
+    ).scalars().all()
@@ -0,0 +1,130 @@
+"""Per-request SQL statement auditing: N+1 detection and query budgets."""
+import re
+import traceback
+import warnings
+from contextvars import ContextVar
+from flask import request
+from sqlalchemy import event
+
+
+class RepeatedQueryWarning(UserWarning):
+    """The same parameterized statement ran too often in one request."""
+
+
+class RepeatedQueryError(RuntimeError):
+    """Raised instead of ``RepeatedQueryWarning`` when the action is 'raise'."""
+
+
+# Statements of the request being served: fingerprint -> count, in order
+_request_statements = ContextVar('query_audit_statements', default=None)
+
+_PLACEHOLDER = re.compile(r'%\(\w+\)s|:\w+|\$\d+|\?')
+_IN_LIST = re.compile(r'\(\s*\?(?:\s*,\s*\?)+\s*\)')
+_WHITESPACE = re.compile(r'\s+')
+
+
+def fingerprint(statement):
+    """Normalize a SQL statement so repeats with other parameters match.
+
+    Placeholders of every paramstyle become ``?`` and expanded ``IN``
+    lists collapse to ``(?)``.
+    """
+    statement = _PLACEHOLDER.sub('?', statement)
+    statement = _IN_LIST.sub('(?)', statement)
+    return _WHITESPACE.sub(' ', statement).strip()
+
+
+def _caller():
+    """First stack frame in application code, for pointing at the loop."""
+    for frame in reversed(traceback.extract_stack()[:-3]):
+        if '/app/' in frame.filename.replace('\\', '/') and 'query_audit' not in frame.filename:
+            return f'{frame.filename}:{frame.lineno} in {frame.name}'
+    return 'unknown caller'
+
+
+class QueryAudit:
+    """Count statements per request and flag repeated ones.
+
+    Statements are fingerprinted (parameters stripped) while a request is
+    served. When one fingerprint runs more than QUERY_AUDIT_REPEAT_THRESHOLD
+    times, the usual sign of a lazy relationship loaded in a loop, it is
+    reported once for that request: with ``QUERY_AUDIT_ACTION = 'warn'`` as
+    a ``RepeatedQueryWarning`` (logged too), with ``'raise'`` as a
+    ``RepeatedQueryError``.
+
+    Listeners registered with ``on_request_end`` receive each finished
+    request's statement counts; the test query budgets use this.
+    """
+
+    def __init__(self):
+        self.enabled = False
+        self.threshold = 10
+        self.action = 'warn'
+        self._listeners = []
+        self._engines = set()
+
+    def init_app(self, app, engine):
+        """Install request hooks and engine listeners if QUERY_AUDIT_ENABLED.
+
+        Args:
+            app: Flask application
+            engine: SQLAlchemy engine to audit
+        """
+        self.enabled = app.config.get('QUERY_AUDIT_ENABLED', False)
+        if not self.enabled:
+            return
+        self.threshold = app.config.get('QUERY_AUDIT_REPEAT_THRESHOLD', 10)
+        self.action = app.config.get('QUERY_AUDIT_ACTION', 'warn')
+        self._logger = app.logger
+
+        app.before_request_funcs.setdefault(None, []).insert(0, self._start_request)
+        app.teardown_request(self._end_request)
+        if engine not in self._engines:
+            self._engines.add(engine)
+            event.listen(engine, 'before_cursor_execute', self._before_cursor_execute)
+
+    def on_request_end(self, listener):
+        """Call ``listener(endpoint, counts)`` after each audited request.
+
+        ``counts`` maps statement fingerprints to how often they ran.
+
+        Returns:
+            callable: Removes the listener
+        """
+        self._listeners.append(listener)
+        return lambda: self._listeners.remove(listener)
+
+    def current_statements(self):
+        """SQL statements run so far by the request being served, or None if not audited."""
+        counts = _request_statements.get()
+        return sum(counts.values()) if counts is not None else None
+
+    def _start_request(self):
+        _request_statements.set({})
+
+    def _end_request(self, exc):
+        counts = _request_statements.get()
+        if counts is None:
+            return
+        _request_statements.set(None)
+        for listener in list(self._listeners):
+            listener(request.endpoint, counts)
+
+    def _before_cursor_execute(self, conn, cursor, statement, parameters, context, executemany):
+        counts = _request_statements.get()
+        if counts is None:
+            return
+        key = fingerprint(statement)
+        count = counts[key] = counts.get(key, 0) + 1
+        if count == self.threshold + 1:
+            message = (
+                f"{request.method} {request.path} ({request.endpoint}) ran the same statement "
+                f"more than {self.threshold} times, from {_caller()}: {key}"
+            )
+            if self.action == 'raise':
+                raise RepeatedQueryError(message)
+            self._logger.warning("Repeated query: %s", message)
+            warnings.warn(message, RepeatedQueryWarning, stacklevel=2)
+
+
+query_audit = QueryAudit()
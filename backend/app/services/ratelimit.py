@@ -0,0 +1,321 @@
+"""Rate-limit storage backends shared by every worker process on a host."""
+import os
+import socket
+import sqlite3
+import threading
+import time
+from math import floor
+from urllib.parse import urlparse
+from limits.storage import Storage
+from limits.storage.base import SlidingWindowCounterSupport, TimestampedSlidingWindow
+
+
+class SQLiteStorage(Storage, SlidingWindowCounterSupport, TimestampedSlidingWindow):
+    """Counters in a SQLite database in WAL mode (``sqlite:///path``).
+
+    Every worker opens the same file, so limits hold across gunicorn
+    workers without a separate server. Three slashes give a path relative
+    to the working directory, four an absolute one. Each thread keeps its
+    own connection; a counter update is a single UPSERT, and a sliding
+    window hit reads both windows and increments inside one ``BEGIN
+    IMMEDIATE`` transaction, so concurrent workers cannot overshoot.
+
+    Supports the fixed-window and sliding-window-counter strategies.
+    """
+
+    STORAGE_SCHEME = ['sqlite']
+
+    # Expired counters are deleted every this many writes
+    PURGE_EVERY = 1000
+
+    def __init__(self, uri, wrap_exceptions=False, timeout=5.0, **options):
+        self.path = uri[len('sqlite:///'):] or 'ratelimit.db'
+        self.timeout = float(timeout)
+        self._local = threading.local()
+        self._writes = 0
+        super().__init__(uri, wrap_exceptions=wrap_exceptions, **options)
+        self._execute(
+            'CREATE TABLE IF NOT EXISTS ratelimit_counters ('
+            'key TEXT PRIMARY KEY, count INTEGER NOT NULL, expires_at REAL NOT NULL'
+            ') WITHOUT ROWID'
+        )
+
+    @property
+    def base_exceptions(self):
+        return sqlite3.Error
+
+    def _connection(self):
+        # Reconnect after a fork: SQLite connections must not cross processes
+        connection = getattr(self._local, 'connection', None)
+        if connection is None or self._local.pid != os.getpid():
+            connection = sqlite3.connect(self.path, timeout=self.timeout,
+                                         isolation_level=None, check_same_thread=False)
+            connection.execute('PRAGMA journal_mode=WAL')
+            connection.execute('PRAGMA synchronous=NORMAL')
+            self._local.connection = connection
+            self._local.pid = os.getpid()
+        return connection
+
+    def _execute(self, sql, parameters=()):
+        return self._connection().execute(sql, parameters)
+
+    def _maybe_purge(self, now):
+        self._writes += 1
+        if self._writes % self.PURGE_EVERY == 0:
+            self._execute('DELETE FROM ratelimit_counters WHERE expires_at <= ?', (now,))
+
+    def _incr(self, key, expiry, amount, now):
+        return self._execute(
+            'INSERT INTO ratelimit_counters (key, count, expires_at) VALUES (?1, ?2, ?3) '
+            'ON CONFLICT (key) DO UPDATE SET '
+            'count = CASE WHEN expires_at <= ?4 THEN ?2 ELSE count + ?2 END, '
+            'expires_at = CASE WHEN expires_at <= ?4 THEN ?3 ELSE expires_at END '
+            'RETURNING count',
+            (key, amount, now + expiry, now)
+        ).fetchone()[0]
+
+    def incr(self, key, expiry, amount=1):
+        now = time.time()
+        count = self._incr(key, expiry, amount, now)
+        self._maybe_purge(now)
+        return count
+
+    def get(self, key):
+        row = self._execute(
+            'SELECT count FROM ratelimit_counters WHERE key = ? AND expires_at > ?', (key, time.time())
+        ).fetchone()
+        return row[0] if row else 0
+
+    def get_expiry(self, key):
+        now = time.time()
+        row = self._execute(
+            'SELECT expires_at FROM ratelimit_counters WHERE key = ? AND expires_at > ?', (key, now)
+        ).fetchone()
+        return row[0] if row else now
+
+    def check(self):
+        try:
+            self._execute('SELECT 1').fetchone()
+            return True
+        except sqlite3.Error:
+            return False
+
+    def reset(self):
+        return self._execute('DELETE FROM ratelimit_counters').rowcount
+
+    def clear(self, key):
+        self._execute('DELETE FROM ratelimit_counters WHERE key = ?', (key,))
+
+    def _window(self, key, expiry, now):
+        previous_key, current_key = self.sliding_window_keys(key, expiry, now)
+        counts = dict(self._execute(
+            'SELECT key, count FROM ratelimit_counters WHERE key IN (?, ?) AND expires_at > ?',
+            (previous_key, current_key, now)
+        ).fetchall())
+        previous_count = counts.get(previous_key, 0)
+        previous_ttl = (1 - (((now - expiry) / expiry) % 1)) * expiry if previous_count else 0.0
+        current_ttl = (1 - ((now / expiry) % 1)) * expiry + expiry
+        return current_key, previous_count, previous_ttl, counts.get(current_key, 0), current_ttl
+
+    def acquire_sliding_window_entry(self, key, limit, expiry, amount=1):
+        if amount > limit:
+            return False
+        connection = self._connection()
+        connection.execute('BEGIN IMMEDIATE')
+        try:
+            now = time.time()
+            current_key, previous_count, previous_ttl, current_count, _ = self._window(key, expiry, now)
+            acquired = floor(previous_count * previous_ttl / expiry + current_count) + amount <= limit
+            if acquired:
+                # Kept for two windows: it is the previous window for the next one
+                self._incr(current_key, 2 * expiry, amount, now)
+            connection.execute('COMMIT')
+        except BaseException:
+            connection.execute('ROLLBACK')
+            raise
+        if acquired:
+            self._maybe_purge(now)
+        return acquired
+
+    def get_sliding_window(self, key, expiry):
+        return self._window(key, expiry, time.time())[1:]
+
+    def clear_sliding_window(self, key, expiry):
+        previous_key, current_key = self.sliding_window_keys(key, expiry, time.time())
+        self._execute('DELETE FROM ratelimit_counters WHERE key IN (?, ?)', (previous_key, current_key))
+
+
+class RespError(Exception):
+    """Error reply or protocol failure from a Redis-protocol server."""
+
+
+class RespConnection:
+    """Minimal pipelining client for the Redis serialization protocol."""
+
+    def __init__(self, host, port, timeout):
+        self.sock = socket.create_connection((host, port), timeout=timeout)
+        self.sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        self.reader = self.sock.makefile('rb')
+
+    @staticmethod
+    def _encode(command):
+        parts = [b'*%d\r\n' % len(command)]
+        for arg in command:
+            arg = arg if isinstance(arg, bytes) else str(arg).encode()
+            parts.append(b'$%d\r\n%s\r\n' % (len(arg), arg))
+        return b''.join(parts)
+
+    def _read(self):
+        line = self.reader.readline()
+        if not line.endswith(b'\r\n'):
+            raise RespError("Connection closed")
+        kind, value = line[:1], line[1:-2]
+        if kind == b'+':
+            return value.decode()
+        if kind == b'-':
+            # Returned, not raised, so the rest of a pipeline is still read
+            return RespError(value.decode())
+        if kind == b':':
+            return int(value)
+        if kind == b'$':
+            if value == b'-1':
+                return None
+            data = self.reader.read(int(value) + 2)
+            return data[:-2]
+        if kind == b'*':
+            return None if value == b'-1' else [self._read() for _ in range(int(value))]
+        raise RespError(f"Unexpected reply: {line!r}")
+
+    def pipeline(self, *commands):
+        """Send commands in one write and read every reply."""
+        self.sock.sendall(b''.join(self._encode(command) for command in commands))
+        replies = [self._read() for _ in commands]
+        for reply in replies:
+            if isinstance(reply, RespError):
+                raise reply
+        return replies
+
+    def close(self):
+        self.sock.close()
+
+
+class RespStorage(Storage, SlidingWindowCounterSupport, TimestampedSlidingWindow):
+    """Counters on a Redis-protocol server (``resp://[:password@]host:port[/db]``).
+
+    Uses only plain commands (SET NX PX, INCRBY, DECRBY, GET, PTTL, DEL,
+    SCAN), never Lua scripts, so Redis, Valkey, KeyDB or any local
+    stand-in speaking the protocol can serve it. Each hit is one
+    pipelined round trip; a sliding window hit that would exceed the
+    limit is rolled back with a second one.
+
+    Supports the fixed-window and sliding-window-counter strategies.
+    """
+
+    STORAGE_SCHEME = ['resp']
+
+    PREFIX = 'LIMITS:'
+
+    def __init__(self, uri, wrap_exceptions=False, timeout=2.0, **options):
+        parsed = urlparse(uri)
+        self.host = parsed.hostname or 'localhost'
+        self.port = parsed.port or 6379
+        self.password = parsed.password
+        self.database = parsed.path.strip('/') or None
+        self.timeout = float(timeout)
+        self._local = threading.local()
+        super().__init__(uri, wrap_exceptions=wrap_exceptions, **options)
+
+    @property
+    def base_exceptions(self):
+        return (RespError, OSError)
+
+    def _pipeline(self, *commands):
+        connection = getattr(self._local, 'connection', None)
+        if connection is None or self._local.pid != os.getpid():
+            connection = RespConnection(self.host, self.port, self.timeout)
+            setup = []
+            if self.password:
+                setup.append(('AUTH', self.password))
+            if self.database:
+                setup.append(('SELECT', self.database))
+            if setup:
+                connection.pipeline(*setup)
+            self._local.connection = connection
+            self._local.pid = os.getpid()
+        try:
+            return connection.pipeline(*commands)
+        except (RespError, OSError):
+            # Drop the connection; a pipeline cut short leaves it unusable
+            self._local.connection = None
+            connection.close()
+            raise
+
+    def _key(self, key):
+        return self.PREFIX + key
+
+    def incr(self, key, expiry, amount=1):
+        key = self._key(key)
+        _, count = self._pipeline(
+            ('SET', key, 0, 'PX', int(expiry * 1000), 'NX'),
+            ('INCRBY', key, amount),
+        )
+        return count
+
+    def get(self, key):
+        value, = self._pipeline(('GET', self._key(key)))
+        return int(value or 0)
+
+    def get_expiry(self, key):
+        ttl, = self._pipeline(('PTTL', self._key(key)))
+        return time.time() + max(ttl, 0) / 1000
+
+    def check(self):
+        try:
+            return self._pipeline(('PING',)) == ['PONG']
+        except (RespError, OSError):
+            return False
+
+    def reset(self):
+        deleted, cursor = 0, '0'
+        while True:
+            (cursor, keys), = self._pipeline(('SCAN', cursor, 'MATCH', self.PREFIX + '*', 'COUNT', 1000))
+            cursor = cursor.decode() if isinstance(cursor, bytes) else cursor
+            if keys:
+                deleted += self._pipeline(('DEL', *keys))[0]
+            if cursor == '0':
+                return deleted
+
+    def clear(self, key):
+        self._pipeline(('DEL', self._key(key)))
+
+    def _sliding_window(self, previous_count, current_count, expiry, now):
+        previous_count, current_count = int(previous_count or 0), int(current_count or 0)
+        previous_ttl = (1 - (((now - expiry) / expiry) % 1)) * expiry if previous_count else 0.0
+        current_ttl = (1 - ((now / expiry) % 1)) * expiry + expiry
+        return previous_count, previous_ttl, current_count, current_ttl
+
+    def acquire_sliding_window_entry(self, key, limit, expiry, amount=1):
+        if amount > limit:
+            return False
+        now = time.time()
+        previous_key, current_key = map(self._key, self.sliding_window_keys(key, expiry, now))
+        _, current_count, previous_count = self._pipeline(
+            ('SET', current_key, 0, 'PX', int(2 * expiry * 1000), 'NX'),
+            ('INCRBY', current_key, amount),
+            ('GET', previous_key),
+        )
+        previous_count, previous_ttl, _, _ = self._sliding_window(previous_count, 0, expiry, now)
+        if floor(previous_count * previous_ttl / expiry + current_count) > limit:
+            self._pipeline(('DECRBY', current_key, amount))
+            return False
+        return True
+
+    def get_sliding_window(self, key, expiry):
+        now = time.time()
+        previous_key, current_key = map(self._key, self.sliding_window_keys(key, expiry, now))
+        previous_count, current_count = self._pipeline(('GET', previous_key), ('GET', current_key))
+        return self._sliding_window(previous_count, current_count, expiry, now)
+
+    def clear_sliding_window(self, key, expiry):
+        keys = map(self._key, self.sliding_window_keys(key, expiry, time.time()))
+        self._pipeline(('DEL', *keys))
@@ -0,0 +1,446 @@
+"""Related posts engine using sparse tag, category and TF-IDF vectors."""
+import heapq
+import math
+import re
+import threading
+import time
+from array import array
+from collections import Counter
+from app.services.background import BackgroundRebuild
+
+
+TAG_RE = re.compile(r'<[^>]+>')
+TOKEN_RE = re.compile(r'[a-z0-9]{3,}')
+
+STOPWORDS = frozenset("""
+    about above after again against all also and any are because been before
+    being below between both but can could did does doing down during each
+    few for from further had has have having her here hers herself him himself
+    his how into its itself just more most myself nor not now off once only
+    other our ours ourselves out over own same she should some such than that
+    the their theirs them themselves then there these they this those through
+    too under until very was were what when where which while who whom why
+    will with would you your yours yourself yourselves
+""".split())
+
+
+def tokenize(text):
+    """Split HTML or plain text into lowercase index terms.
+
+    Args:
+        text: Raw text, possibly containing HTML markup
+
+    Returns:
+        list: Terms of at least three characters, stopwords removed
+    """
+    if not text:
+        return []
+    text = TAG_RE.sub(' ', text).lower()
+    return [token for token in TOKEN_RE.findall(text) if token not in STOPWORDS]
+
+
+class RelatedPostsEngine(BackgroundRebuild):
+    """Precomputed "related posts" lookups over published posts.
+
+    Each post is a sparse row vector over three feature blocks: tag ids,
+    category ids and TF-IDF weighted terms from title, excerpt and content.
+    Blocks are L2-normalised separately, scaled by ``RELATED_WEIGHTS`` and
+    the row is normalised again, so cosine similarity is a dot product.
+
+    Rows (CSR-style) and columns (CSC-style) are stored as ``array``
+    pairs of indices and weights. Candidates come from the columns of a
+    post's selective features and are rescored exactly against full rows.
+
+    The index is rebuilt from the database on a background job, at first
+    use and every ``RELATED_REBUILD_INTERVAL`` seconds or after
+    ``invalidate()``; lookups keep using the previous index until the new
+    one is swapped in, and changes made meanwhile are replayed onto it.
+    Every post's top-k list is then precomputed in the background (a post
+    not reached yet is scored on lookup) and patched incrementally when a
+    post is created, updated or removed.
+    """
+
+    # Attributes replaced as a whole when a rebuilt index is swapped in
+    _STATE = ('_built_at', '_features', '_df', '_cols', '_rows', '_terms',
+              '_slugs', '_post_slugs', '_neighbours', '_referenced_by')
+
+    def __init__(self, app=None):
+        self.k = 10
+        self.max_terms = 16
+        self.max_postings = 2000
+        self.weights = {'tags': 1.0, 'categories': 0.5, 'text': 1.0}
+        self.rebuild_interval = 3600
+        self.precompute_on_build = True
+        self._lock = threading.RLock()
+        self._init_rebuild()
+        self._reset()
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        """Configure the engine from the application config."""
+        self.k = app.config.get('RELATED_POSTS_K', 10)
+        self.max_terms = app.config.get('RELATED_MAX_TERMS', 16)
+        self.max_postings = app.config.get('RELATED_MAX_POSTINGS', 2000)
+        self.weights = dict(self.weights, **app.config.get('RELATED_WEIGHTS', {}))
+        self.rebuild_interval = app.config.get('RELATED_REBUILD_INTERVAL', 3600)
+        self.precompute_on_build = app.config.get('RELATED_PRECOMPUTE', True)
+        with self._lock:
+            self._reset()
+            self._scheduled_at = 0.0
+        app.extensions['related_posts'] = self
+
+    def _reset(self):
+        self._built_at = None
+        self._features = {}  # feature key -> column index
+        self._df = []  # column index -> document frequency
+        self._cols = []  # column index -> (array of post ids, array of weights)
+        self._rows = {}  # post id -> (array of column indexes, array of weights)
+        self._terms = {}  # post id -> array of every term column (for document frequencies)
+        self._slugs = {}  # slug -> post id
+        self._post_slugs = {}  # post id -> slug
+        self._neighbours = {}  # post id -> [(score, post id)], best first
+        self._referenced_by = {}  # post id -> set of post ids listing it
+
+    def __len__(self):
+        return len(self._rows)
+
+    # Vectorisation
+
+    def _column(self, key):
+        index = self._features.get(key)
+        if index is None:
+            index = len(self._df)
+            self._features[key] = index
+            self._df.append(0)
+            self._cols.append((array('i'), array('f')))
+        return index
+
+    def _term_columns(self, doc):
+        counts = Counter(tokenize(doc.get('excerpt')))
+        counts.update(tokenize(doc.get('content')))
+        for term in tokenize(doc.get('title')):
+            # Title words describe the post better than body text
+            counts[term] += 3
+        columns = {}
+        for term, count in counts.items():
+            column = self._column('w:' + term)
+            columns[column] = count
+            self._df[column] += 1
+        self._terms[doc['id']] = array('i', columns)
+        return columns
+
+    def _vectorize(self, doc, term_columns, n_docs):
+        blocks = []
+
+        for prefix, ids, weight in (
+            ('t', doc.get('tag_ids', ()), self.weights['tags']),
+            ('c', doc.get('category_ids', ()), self.weights['categories']),
+        ):
+            if ids and weight:
+                value = weight / math.sqrt(len(ids))
+                blocks.append({self._column(f'{prefix}:{i}'): value for i in set(ids)})
+
+        if term_columns and self.weights['text']:
+            df = self._df
+            log = math.log
+            scored = {
+                column: (1.0 + log(count)) * (log((n_docs + 1) / (df[column] + 1)) + 1.0)
+                for column, count in term_columns.items()
+            }
+            top = heapq.nlargest(self.max_terms, scored.items(), key=lambda item: item[1])
+            norm = math.sqrt(sum(w * w for _, w in top)) or 1.0
+            blocks.append({c: self.weights['text'] * w / norm for c, w in top})
+
+        vector = {}
+        for block in blocks:
+            vector.update(block)
+        norm = math.sqrt(sum(w * w for w in vector.values())) or 1.0
+        columns = sorted(vector)
+        return array('i', columns), array('f', (vector[c] / norm for c in columns))
+
+    def _add_row(self, post_id, row):
+        self._rows[post_id] = row
+        for column, weight in zip(*row):
+            ids, weights = self._cols[column]
+            ids.append(post_id)
+            weights.append(weight)
+
+    def _drop_row(self, post_id):
+        row = self._rows.pop(post_id, None)
+        if row is None:
+            return
+        for column in row[0]:
+            ids, weights = self._cols[column]
+            position = ids.index(post_id)
+            del ids[position]
+            del weights[position]
+
+    # Building
+
+    def build(self, documents):
+        """Rebuild the index from scratch and swap it in.
+
+        Lookups keep using the current index while the new one is built.
+
+        Args:
+            documents: Iterable of dicts with ``id``, ``slug``, ``title``,
+                ``excerpt``, ``content``, ``tag_ids`` and ``category_ids``
+        """
+        fresh = RelatedPostsEngine()
+        fresh.k, fresh.max_terms, fresh.max_postings = self.k, self.max_terms, self.max_postings
+        fresh.weights = self.weights
+        fresh._load(documents)
+        self._swap(fresh)
+
+    def _replay(self, change, value):
+        if change == 'update':
+            self._update(value)
+        else:
+            self._remove(value)
+
+    def _load(self, documents):
+        parsed = []
+        for doc in documents:
+            terms = self._term_columns(doc)
+            self._slugs[doc['slug']] = doc['id']
+            self._post_slugs[doc['id']] = doc['slug']
+            # Only term counts are needed from here on, not the text
+            parsed.append(({
+                'id': doc['id'],
+                'tag_ids': doc.get('tag_ids', ()),
+                'category_ids': doc.get('category_ids', ()),
+            }, terms))
+
+        # Document frequencies must be complete before any row is weighted
+        for doc, terms in parsed:
+            self._add_row(doc['id'], self._vectorize(doc, terms, len(parsed)))
+        self._built_at = time.time()
+
+    def build_from_db(self):
+        """Rebuild the index from published posts in the database."""
+        self.build(self._documents())
+
+    def _documents(self, post_ids=None):
+        """Document dicts for published posts (all, or those in ``post_ids``)."""
+        from app import db
+        from app.models.post import Post
+        from app.models.tag import post_tags
+        from app.models.category import post_categories
+
+        published = db.select(Post.id).where(Post.status == 'published')
+        if post_ids is not None:
+            published = published.where(Post.id.in_(post_ids))
+        tag_ids = {}
+        for post_id, tag_id in db.session.execute(
+            db.select(post_tags.c.post_id, post_tags.c.tag_id).where(post_tags.c.post_id.in_(published))
+        ):
+            tag_ids.setdefault(post_id, []).append(tag_id)
+        category_ids = {}
+        for post_id, category_id in db.session.execute(
+            db.select(post_categories.c.post_id, post_categories.c.category_id)
+            .where(post_categories.c.post_id.in_(published))
+        ):
+            category_ids.setdefault(post_id, []).append(category_id)
+
+        rows = db.session.execute(
+            db.select(Post.id, Post.slug, Post.title, Post.excerpt, Post.content)
+            .where(Post.id.in_(published))
+            .execution_options(yield_per=1000)
+        )
+        for row in rows:
+            yield {
+                'id': row.id, 'slug': row.slug, 'title': row.title,
+                'excerpt': row.excerpt, 'content': row.content,
+                'tag_ids': tag_ids.get(row.id, ()),
+                'category_ids': category_ids.get(row.id, ()),
+            }
+
+    def _rebuilt(self):
+        if self.precompute_on_build:
+            self.precompute()
+
+    # Incremental updates
+
+    def update(self, doc):
+        """Index or re-index a single post.
+
+        Args:
+            doc: Document dict (see ``build``)
+        """
+        with self._lock:
+            self._log_change('update', doc)
+            if self._built_at is not None:
+                self._update(doc)
+
+    def _update(self, doc):
+        post_id = doc['id']
+        listing = self._referenced_by.get(post_id, set()).copy()
+        self._remove(post_id, relist=False)
+
+        terms = self._term_columns(doc)
+        self._add_row(post_id, self._vectorize(doc, terms, len(self._rows) + 1))
+        self._slugs[doc['slug']] = post_id
+        self._post_slugs[post_id] = doc['slug']
+
+        scored = self._compute(post_id)
+        # Similarity is symmetric: offer the post to precomputed neighbour lists
+        for score, other in scored:
+            listed = self._neighbours.get(other)
+            if listed is None or other in listing:
+                continue
+            if len(listed) < self.k or score > listed[-1][0]:
+                listed.append((score, post_id))
+                listed.sort(reverse=True)
+                if len(listed) > self.k:
+                    _, evicted = listed.pop()
+                    self._referenced_by.get(evicted, set()).discard(other)
+                self._referenced_by.setdefault(post_id, set()).add(other)
+        # Lists that had the post before the change are rescored
+        for other in listing:
+            if other in self._rows:
+                self._compute(other)
+
+    def update_post(self, post):
+        """Index a ``Post`` model instance, or drop it if unpublished."""
+        if post.status != 'published':
+            self.remove(post.id)
+            return
+        self.update({
+            'id': post.id,
+            'slug': post.slug,
+            'title': post.title,
+            'excerpt': post.excerpt,
+            'content': post.content,
+            'tag_ids': [tag.id for tag in post.tags],
+            'category_ids': [category.id for category in post.categories],
+        })
+
+    def update_posts(self, post_ids):
+        """Re-index posts by id after their tags or categories changed in bulk.
+
+        Loads the posts and their links with three queries, rather than
+        two per post as ``update_post`` does.
+        """
+        for doc in self._documents(post_ids):
+            self.update(doc)
+
+    def remove(self, post_id):
+        """Remove a post from the index and from precomputed neighbour lists."""
+        with self._lock:
+            self._log_change('remove', post_id)
+            self._remove(post_id)
+
+    def _remove(self, post_id, relist=True):
+        if post_id not in self._rows:
+            return
+        self._drop_row(post_id)
+        for column in self._terms.pop(post_id, ()):
+            self._df[column] -= 1
+        self._slugs.pop(self._post_slugs.pop(post_id, None), None)
+
+        for _, neighbour in self._neighbours.pop(post_id, ()):
+            self._referenced_by.get(neighbour, set()).discard(post_id)
+        listing = self._referenced_by.pop(post_id, ())
+        for other in listing:
+            self._neighbours.pop(other, None)
+        if relist:
+            # Lists that mentioned the post are rescored without it
+            for other in listing:
+                if other in self._rows:
+                    self._compute(other)
+
+    # Lookups
+
+    def _score_candidates(self, post_id, shortlist=200):
+        columns, weights = self._rows[post_id]
+
+        partial = {}
+        selective = [(c, w) for c, w in zip(columns, weights) if len(self._cols[c][0]) <= self.max_postings]
+        if not selective and len(columns):
+            # Only common features: fall back to the narrowest column
+            narrowest = min(range(len(columns)), key=lambda i: len(self._cols[columns[i]][0]))
+            selective = [(columns[narrowest], weights[narrowest])]
+        for column, weight in selective:
+            ids, col_weights = self._cols[column]
+            for other, other_weight in zip(ids, col_weights):
+                partial[other] = partial.get(other, 0.0) + weight * other_weight
+        partial.pop(post_id, None)
+
+        # Rescore the best partial matches against full rows
+        query = dict(zip(columns, weights))
+        results = []
+        for other in heapq.nlargest(shortlist, partial, key=partial.get):
+            other_columns, other_weights = self._rows[other]
+            score = sum(query.get(c, 0.0) * w for c, w in zip(other_columns, other_weights))
+            results.append((score, other))
+        results.sort(reverse=True)
+        return results
+
+    def neighbours(self, post_id, limit=None):
+        """Get the posts most similar to ``post_id``.
+
+        Args:
+            post_id: Post ID
+            limit: Maximum number of results (default and cap: RELATED_POSTS_K)
+
+        Returns:
+            list: (post_id, score) tuples, most similar first
+        """
+        limit = min(limit or self.k, self.k)
+        with self._lock:
+            if post_id not in self._rows:
+                return []
+            listed = self._neighbours.get(post_id)
+            if listed is None:
+                # Not precomputed yet
+                self._compute(post_id)
+                listed = self._neighbours[post_id]
+            return [(other, score) for score, other in listed[:limit]]
+
+    def _compute(self, post_id):
+        """Score and store a post's top-k list; returns every scored candidate."""
+        for _, other in self._neighbours.get(post_id, ()):
+            self._referenced_by.get(other, set()).discard(post_id)
+        scored = self._score_candidates(post_id)
+        listed = [(score, other) for score, other in scored if score > 0][:self.k]
+        self._neighbours[post_id] = listed
+        for _, other in listed:
+            self._referenced_by.setdefault(other, set()).add(post_id)
+        return scored
+
+    def related_by_slug(self, slug, limit=None):
+        """Get related posts for a published post slug.
+
+        Returns:
+            list: (post_id, score) tuples, or None if the slug is not indexed
+        """
+        self._ensure_built()
+        post_id = self._slugs.get(slug)
+        if post_id is None:
+            return None
+        return self.neighbours(post_id, limit)
+
+    def precompute(self, post_ids=None, deadline=None):
+        """Fill neighbour lists ahead of lookups.
+
+        The lock is taken per post, so lookups interleave with a long run.
+
+        Args:
+            post_ids: Posts to fill (default: every indexed post)
+            deadline: ``time.perf_counter()`` value to stop at, if any
+
+        Returns:
+            bool: True if every list was filled, False if the deadline passed
+                or a rebuild replaced the index
+        """
+        rows = self._rows
+        for post_id in list(rows) if post_ids is None else post_ids:
+            if self._rows is not rows or (deadline is not None and time.perf_counter() >= deadline):
+                return False
+            if post_id not in self._neighbours:
+                self.neighbours(post_id)
+        return True
+
+
+related_posts = RelatedPostsEngine()
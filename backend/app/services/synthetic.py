@@ -0,0 +1,391 @@
+"""Reproducible synthetic datasets bulk-loaded for production-scale testing."""
+import csv
+import io
+import itertools
+import random
+import time
+from datetime import datetime, timezone
+
+from werkzeug.security import generate_password_hash
+
+from app import db
+
+
+WORDS = (
+    'python flask react database index query cache latency design testing '
+    'deploy docker cloud security api schema migration frontend backend '
+    'performance async queue worker stream search ranking image video '
+    'editor markdown release review debug profile metrics logging'
+).split()
+
+USER_AGENTS = (
+    'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 Chrome/126.0 Safari/537.36',
+    'Mozilla/5.0 (Macintosh; Intel Mac OS X 14_5) AppleWebKit/605.1.15 Version/17.5 Safari/605.1.15',
+    'Mozilla/5.0 (X11; Linux x86_64; rv:127.0) Gecko/20100101 Firefox/127.0',
+    'Mozilla/5.0 (iPhone; CPU iPhone OS 17_5 like Mac OS X) AppleWebKit/605.1.15 Mobile/15E148',
+    'Mozilla/5.0 (Linux; Android 14; Pixel 8) AppleWebKit/537.36 Chrome/126.0 Mobile Safari/537.36',
+    'Mozilla/5.0 (compatible; Googlebot/2.1; +http://www.google.com/bot.html)',
+)
+
+# Share of a post's tags drawn from its topic rather than the whole vocabulary
+TOPIC_TAG_SHARE = 0.8
+
+# Distinct visitor addresses page views are drawn from
+IP_POOL_SIZE = 50000
+
+# Tables in load order (parents before children)
+TABLES = ('users', 'categories', 'tags', 'posts', 'post_categories', 'post_tags', 'page_views')
+
+
+# Day number -> 'YYYY-MM-DD ' prefix; formatting only the time of day is
+# several times faster than a datetime round trip per row
+_day_prefixes = {}
+
+
+def sql_timestamp(seconds):
+    """Epoch seconds as the naive UTC text both dialects store for DateTime."""
+    day, micros = divmod(int(seconds * 1000000), 86400000000)
+    prefix = _day_prefixes.get(day)
+    if prefix is None:
+        prefix = _day_prefixes[day] = datetime.fromtimestamp(day * 86400, timezone.utc).strftime('%Y-%m-%d ')
+    second, micros = divmod(micros, 1000000)
+    minute, second = divmod(second, 60)
+    hour, minute = divmod(minute, 60)
+    return f'{prefix}{hour:02d}:{minute:02d}:{second:02d}.{micros:06d}'
+
+
+def _zipf_weights(n, skew):
+    """Cumulative weights where rank r is picked in proportion to 1 / r**skew."""
+    return list(itertools.accumulate(1.0 / rank ** skew for rank in range(1, n + 1)))
+
+
+class BulkLoader:
+    """Write row tuples straight to the DBAPI connection, bypassing the ORM.
+
+    PostgreSQL loads each batch with ``COPY ... FROM STDIN`` (CSV);
+    other databases use ``executemany`` on one prepared INSERT. Secondary
+    indexes of the loaded tables are dropped first and rebuilt from their
+    catalog definitions at the end, which is much faster than maintaining
+    them row by row.
+    """
+
+    def __init__(self, connection, dialect, batch_size=50000):
+        self.connection = connection
+        self.dialect = dialect
+        self.batch_size = batch_size
+        self._deferred = []
+
+    def _index_definitions(self, table):
+        cursor = self.connection.cursor()
+        if self.dialect == 'postgresql':
+            # Indexes backing primary key and unique constraints stay
+            cursor.execute(
+                "SELECT indexname, indexdef FROM pg_indexes "
+                "WHERE schemaname = current_schema() AND tablename = %s AND indexname NOT IN "
+                "(SELECT conname FROM pg_constraint WHERE conrelid = %s::regclass)",
+                (table, table)
+            )
+        else:
+            # Automatic indexes for constraints have no SQL and stay
+            cursor.execute(
+                "SELECT name, sql FROM sqlite_master WHERE type = 'index' AND tbl_name = ? AND sql IS NOT NULL",
+                (table,)
+            )
+        return cursor.fetchall()
+
+    def defer_indexes(self, tables):
+        """Drop the secondary indexes of ``tables``, remembering their DDL."""
+        cursor = self.connection.cursor()
+        for table in tables:
+            for name, definition in self._index_definitions(table):
+                cursor.execute(f'DROP INDEX "{name}"')
+                self._deferred.append((name, definition))
+        self.connection.commit()
+
+    def rebuild_indexes(self):
+        """Recreate the indexes dropped by ``defer_indexes``.
+
+        Rolls back first: after a failed load the transaction holds a
+        partial batch, and on PostgreSQL it is aborted, so every
+        ``CREATE INDEX`` in it would fail. An index is only forgotten once
+        it is recreated, so a failed rebuild can be retried.
+
+        Returns:
+            int: Number of indexes rebuilt
+        """
+        self.connection.rollback()
+        cursor = self.connection.cursor()
+        rebuilt = 0
+        while self._deferred:
+            name, definition = self._deferred[0]
+            cursor.execute(definition)
+            self._deferred.pop(0)
+            rebuilt += 1
+        self.connection.commit()
+        return rebuilt
+
+    def load(self, table, columns, rows):
+        """Insert an iterable of tuples in batches and commit.
+
+        Returns:
+            int: Rows loaded
+        """
+        cursor = self.connection.cursor()
+        column_list = ', '.join(columns)
+        if self.dialect == 'postgresql':
+            copy = f'COPY {table} ({column_list}) FROM STDIN WITH (FORMAT csv)'
+        else:
+            insert = f"INSERT INTO {table} ({column_list}) VALUES ({', '.join('?' * len(columns))})"
+
+        count = 0
+        rows = iter(rows)
+        while True:
+            batch = list(itertools.islice(rows, self.batch_size))
+            if not batch:
+                break
+            if self.dialect == 'postgresql':
+                # None becomes an empty unquoted field, which COPY reads as NULL
+                buffer = io.StringIO()
+                csv.writer(buffer).writerows(batch)
+                buffer.seek(0)
+                cursor.copy_expert(copy, buffer)
+            else:
+                cursor.executemany(insert, batch)
+            count += len(batch)
+        self.connection.commit()
+        return count
+
+    def execute(self, statement):
+        cursor = self.connection.cursor()
+        cursor.execute(statement)
+        self.connection.commit()
+
+
+class SyntheticDataset:
+    """Generator for a blog with realistic skew.
+
+    - Posts belong to topics (one per category). A post's tags mostly come
+      from its topic's vocabulary, so tags co-occur the way real ones do.
+    - Authors, topics, tags within a topic and post popularity all follow
+      Zipf distributions with exponent ``skew``; popularity ranks are
+      shuffled so they are not correlated with ids.
+    - Page views hit published posts only, after their publication date.
+
+    The same ``seed`` always generates the same rows.
+    """
+
+    def __init__(self, posts=10000, tags=500, categories=20, authors=50, views=1000000,
+                 published_ratio=0.9, skew=1.0, days=365, seed=42):
+        self.n_posts = posts
+        self.n_tags = tags
+        self.n_categories = max(categories, 1)
+        self.n_authors = max(authors, 1)
+        self.n_views = views
+        self.published_ratio = published_ratio
+        self.skew = skew
+        self.days = days
+        self.seed = seed
+        self.now = time.time()
+        self._published = []  # (post id, published at epoch seconds)
+
+    def users(self):
+        password_hash = generate_password_hash('password123', method='pbkdf2:sha256')
+        now = sql_timestamp(self.now)
+        columns = ('id', 'username', 'email', 'password_hash', 'role', 'display_name',
+                   'is_active', 'created_at', 'updated_at')
+        rows = (
+            (i, f'author{i}', f'author{i}@example.com', password_hash, 'admin' if i == 1 else 'author',
+             f'Author {i}', True, now, now)
+            for i in range(1, self.n_authors + 1)
+        )
+        return columns, rows
+
+    def categories(self):
+        now = sql_timestamp(self.now)
+        return ('id', 'name', 'slug', 'created_at'), (
+            (i, f'Category {i}', f'category-{i}', now) for i in range(1, self.n_categories + 1)
+        )
+
+    def tags(self):
+        now = sql_timestamp(self.now)
+        return ('id', 'name', 'slug', 'created_at'), (
+            (i, f'{WORDS[i % len(WORDS)]} {i}', f'{WORDS[i % len(WORDS)]}-{i}', now)
+            for i in range(1, self.n_tags + 1)
+        )
+
+    def _topics(self, rng):
+        """Partition tag ids into one vocabulary per topic (category)."""
+        vocabularies = [[] for _ in range(self.n_categories)]
+        for tag_id in range(1, self.n_tags + 1):
+            vocabularies[rng.randrange(self.n_categories)].append(tag_id)
+        return [vocabulary or [rng.randint(1, max(self.n_tags, 1))] for vocabulary in vocabularies]
+
+    def posts(self):
+        """Posts, plus their category and tag links.
+
+        The three share one random stream: the link lists fill up as the
+        post rows are consumed, so load the posts first.
+
+        Returns:
+            tuple: (post columns, post row generator, category link list,
+            tag link list)
+        """
+        rng = random.Random(self.seed)
+        vocabularies = self._topics(rng)
+        vocabulary_weights = [_zipf_weights(len(vocabulary), self.skew) for vocabulary in vocabularies]
+        topic_weights = _zipf_weights(self.n_categories, self.skew)
+        author_weights = _zipf_weights(self.n_authors, self.skew)
+        tag_weights = _zipf_weights(self.n_tags, self.skew) if self.n_tags else None
+        authors = range(1, self.n_authors + 1)
+        topics = range(self.n_categories)
+        span = self.days * 24 * 3600
+        post_categories, post_tags = [], []
+        self._published = []
+
+        def rows():
+            for post_id in range(1, self.n_posts + 1):
+                topic = rng.choices(topics, cum_weights=topic_weights)[0]
+                created = self.now - rng.random() * span
+                published = rng.random() < self.published_ratio
+                created_text = sql_timestamp(created)
+                title = ' '.join(rng.choices(WORDS, k=rng.randint(3, 8))).capitalize()
+                yield (
+                    post_id, title, f'post-{post_id}',
+                    '<p>' + ' '.join(rng.choices(WORDS, k=rng.randint(100, 400))) + '</p>',
+                    ' '.join(rng.choices(WORDS, k=20)),
+                    rng.choices(authors, cum_weights=author_weights)[0],
+                    'published' if published else 'draft',
+                    created_text if published else None, created_text, created_text, 0,
+                )
+                if published:
+                    self._published.append((post_id, created))
+
+                categories = {topic + 1}
+                if rng.random() < 0.2:
+                    categories.add(rng.randint(1, self.n_categories))
+                post_categories.extend((post_id, category_id) for category_id in categories)
+
+                if tag_weights:
+                    tags = set()
+                    for _ in range(rng.randint(1, 6)):
+                        if rng.random() < TOPIC_TAG_SHARE:
+                            tags.add(rng.choices(vocabularies[topic], cum_weights=vocabulary_weights[topic])[0])
+                        else:
+                            tags.add(rng.choices(range(1, self.n_tags + 1), cum_weights=tag_weights)[0])
+                    post_tags.extend((post_id, tag_id) for tag_id in tags)
+
+        columns = ('id', 'title', 'slug', 'content', 'excerpt', 'author_id', 'status',
+                   'published_at', 'created_at', 'updated_at', 'view_count')
+        return columns, rows(), post_categories, post_tags
+
+    def page_views(self):
+        """Page views of published posts; call after ``posts()``."""
+        columns = ('post_id', 'user_id', 'ip_address', 'user_agent', 'viewed_at')
+        if not self._published or not self.n_views:
+            return columns, iter(())
+
+        rng = random.Random(self.seed + 1)
+        ranked = list(self._published)
+        rng.shuffle(ranked)
+        weights = _zipf_weights(len(ranked), self.skew)
+        ips = [f'{rng.randint(1, 223)}.{rng.randint(0, 255)}.{rng.randint(0, 255)}.{rng.randint(1, 254)}'
+               for _ in range(IP_POOL_SIZE)]
+
+        def rows():
+            # Indexing with random() is several times cheaper than choice()
+            # and randint(), which matters at tens of millions of rows
+            now, n_authors, n_agents = self.now, self.n_authors, len(USER_AGENTS)
+            random_ = rng.random
+            chunk = 100000
+            for start in range(0, self.n_views, chunk):
+                for post_id, published in rng.choices(ranked, cum_weights=weights,
+                                                      k=min(chunk, self.n_views - start)):
+                    yield (
+                        post_id,
+                        int(random_() * n_authors) + 1 if random_() < 0.1 else None,
+                        ips[int(random_() * IP_POOL_SIZE)],
+                        USER_AGENTS[int(random_() * n_agents)],
+                        sql_timestamp(published + random_() * (now - published)),
+                    )
+
+        return columns, rows()
+
+
+def seed_database(dataset, batch_size=50000, progress=None):
+    """Bulk-load ``dataset`` into an empty database.
+
+    Explicit ids are written, so the tables must be empty. Secondary
+    indexes are rebuilt and ``posts.view_count`` is set from the loaded
+    views at the end; on PostgreSQL id sequences are advanced and the
+    tables analyzed.
+
+    Args:
+        dataset: SyntheticDataset to load
+        batch_size: Rows per COPY or executemany call
+        progress: Optional ``progress(step, count, seconds)`` callback
+
+    Returns:
+        dict: Rows loaded per table
+
+    Raises:
+        ValueError: If the database already has users or posts
+    """
+    dialect = db.engine.dialect.name
+    existing = db.session.execute(db.text(
+        'SELECT (SELECT count(*) FROM users) + (SELECT count(*) FROM posts)'
+    )).scalar()
+    db.session.rollback()
+    if existing:
+        raise ValueError('the database already has users or posts; seed an empty database')
+
+    report = progress or (lambda step, count, seconds: None)
+    counts = {}
+    connection = db.engine.raw_connection()
+    try:
+        loader = BulkLoader(connection, dialect, batch_size)
+        if dialect == 'sqlite':
+            loader.execute('PRAGMA synchronous = OFF')
+        loader.defer_indexes(TABLES)
+        try:
+            for name in ('users', 'categories', 'tags'):
+                started = time.perf_counter()
+                columns, rows = getattr(dataset, name)()
+                counts[name] = loader.load(name, columns, rows)
+                report(name, counts[name], time.perf_counter() - started)
+
+            started = time.perf_counter()
+            columns, posts, post_categories, post_tags = dataset.posts()
+            counts['posts'] = loader.load('posts', columns, posts)
+            counts['post_categories'] = loader.load('post_categories', ('post_id', 'category_id'), post_categories)
+            counts['post_tags'] = loader.load('post_tags', ('post_id', 'tag_id'), post_tags)
+            del posts, post_categories, post_tags
+            report('posts', counts['posts'], time.perf_counter() - started)
+
+            started = time.perf_counter()
+            columns, rows = dataset.page_views()
+            counts['page_views'] = loader.load('page_views', columns, rows)
+            report('page_views', counts['page_views'], time.perf_counter() - started)
+        finally:
+            started = time.perf_counter()
+            rebuilt = loader.rebuild_indexes()
+            report('indexes', rebuilt, time.perf_counter() - started)
+
+        started = time.perf_counter()
+        loader.execute(
+            'UPDATE posts SET view_count = counted.views '
+            'FROM (SELECT post_id, count(*) AS views FROM page_views GROUP BY post_id) AS counted '
+            'WHERE posts.id = counted.post_id'
+        )
+        if dialect == 'postgresql':
+            for table in ('users', 'categories', 'tags', 'posts', 'page_views'):
+                loader.execute(
+                    f"SELECT setval(pg_get_serial_sequence('{table}', 'id'), "
+                    f"(SELECT coalesce(max(id), 0) + 1 FROM {table}), false)"
+                )
+            loader.execute('ANALYZE')
+        else:
+            loader.execute('PRAGMA synchronous = FULL')
+        report('finalize', 0, time.perf_counter() - started)
+    finally:
+        connection.close()
+    return counts
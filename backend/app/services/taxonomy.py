@@ -0,0 +1,77 @@
+"""Set-based merges of near-duplicate tags and categories."""
+from app import db
+from app.models.category import Category, post_categories
+from app.models.tag import Tag, post_tags
+from app.services.autocomplete import tag_index, category_index
+from app.services.related import related_posts
+
+
+# model -> (association table, link column, autocomplete index)
+TERMS = {
+    Tag: (post_tags, 'tag_id', tag_index),
+    Category: (post_categories, 'category_id', category_index),
+}
+
+# Posts re-indexed for related posts during the request; merges touching
+# more rebuild the index in the background instead
+MAX_REINDEXED_POSTS = 200
+
+
+def merge_terms(model, target, source_ids):
+    """Fold tags or categories into ``target`` and delete them.
+
+    Each post linked to a source gets one link to the target, written with
+    a single ``INSERT ... SELECT`` that skips posts already linked to the
+    target; the source links and rows are then removed with two DELETEs.
+    Nothing is loaded into the session and the caller commits, so the
+    whole merge is one transaction.
+
+    Args:
+        model: ``Tag`` or ``Category``
+        target: Term kept
+        source_ids: Ids of terms merged into ``target``
+
+    Returns:
+        dict: {merged: source ids deleted, linked: posts newly linked to
+        the target, unlinked: source links removed, posts: ids of the posts
+        whose links changed, or None if more than MAX_REINDEXED_POSTS}
+    """
+    table, column, _ = TERMS[model]
+    source_ids = sorted(set(source_ids) - {target.id})
+
+    posts = db.session.execute(
+        db.select(table.c.post_id).where(table.c[column].in_(source_ids)).distinct().limit(MAX_REINDEXED_POSTS + 1)
+    ).scalars().all()
+
+    already = table.alias('already')
+    linked = db.session.execute(
+        table.insert().from_select(
+            ['post_id', column],
+            db.select(table.c.post_id, db.literal(target.id))
+            .where(table.c[column].in_(source_ids))
+            .where(~db.exists().where(already.c.post_id == table.c.post_id,
+                                      already.c[column] == target.id))
+            .distinct()
+        )
+    ).rowcount
+    unlinked = db.session.execute(table.delete().where(table.c[column].in_(source_ids))).rowcount
+    db.session.execute(db.delete(model).where(model.id.in_(source_ids)))
+
+    return {
+        'merged': source_ids,
+        'linked': linked,
+        'unlinked': unlinked,
+        'posts': posts if len(posts) <= MAX_REINDEXED_POSTS else None,
+    }
+
+
+def apply_merge(model, target, result):
+    """Bring in-process indexes up to date after ``merge_terms`` commits."""
+    _, _, index = TERMS[model]
+    for source_id in result['merged']:
+        index.remove(source_id)
+    index.adjust_counts([target.id], result['linked'])
+    if result['posts'] is None:
+        related_posts.invalidate()
+    elif result['posts']:
+        related_posts.update_posts(result['posts'])
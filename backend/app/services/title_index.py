@@ -0,0 +1,211 @@
+"""Typo-tolerant post title suggestions backed by trigram indexes."""
+import heapq
+import math
+import re
+import threading
+import time
+from collections import Counter
+from app import db
+from app.models.post import Post
+from app.services.background import BackgroundRebuild
+
+
+WORD_RE = re.compile(r'\w+')
+
+
+def trigrams(text):
+    """Get the trigram set of a string, following pg_trgm's rules.
+
+    Each word is lowercased and padded with two spaces in front and one
+    behind, so short words and word starts still produce trigrams.
+
+    Args:
+        text: Title or query
+
+    Returns:
+        set: Three-character strings
+    """
+    grams = set()
+    for word in WORD_RE.findall((text or '').lower()):
+        padded = f'  {word} '
+        grams.update(padded[i:i + 3] for i in range(len(padded) - 2))
+    return grams
+
+
+class TrigramIndex(BackgroundRebuild):
+    """In-process n-gram inverted index over published post titles.
+
+    Used when the database is not PostgreSQL (SQLite in development and
+    tests). Posting lists map each trigram to the ids of titles containing
+    it; a query counts shared trigrams per candidate.
+
+    Candidates are ranked like pg_trgm's ``word_similarity()``: the share
+    of the query's trigrams found in the title, so a half-typed query
+    matches a long title. Whole-title similarity breaks ties.
+
+    Built from the database on a background job and rebuilt every
+    ``TITLE_SUGGEST_REBUILD_INTERVAL`` seconds; between rebuilds
+    ``update_post`` and ``remove`` keep it current.
+    """
+
+    _STATE = ('_built_at', '_postings', '_titles')
+
+    def __init__(self, max_candidates=500, rebuild_interval=300):
+        self.max_candidates = max_candidates
+        self.rebuild_interval = rebuild_interval
+        self._lock = threading.RLock()
+        self._init_rebuild()
+        self._reset()
+
+    def init_app(self, app):
+        """Configure the index from the application config."""
+        self.max_candidates = app.config.get('TITLE_SUGGEST_MAX_CANDIDATES', 500)
+        self.rebuild_interval = app.config.get('TITLE_SUGGEST_REBUILD_INTERVAL', 300)
+        with self._lock:
+            self._reset()
+            self._scheduled_at = 0.0
+
+    def _reset(self):
+        self._built_at = None
+        self._postings = {}  # trigram -> set of post ids
+        self._titles = {}  # post id -> (title, slug, trigram count)
+
+    def __len__(self):
+        return len(self._titles)
+
+    def _add(self, post_id, title, slug):
+        grams = trigrams(title)
+        self._titles[post_id] = (title, slug, len(grams))
+        for gram in grams:
+            self._postings.setdefault(gram, set()).add(post_id)
+
+    def _discard(self, post_id):
+        entry = self._titles.pop(post_id, None)
+        if entry is None:
+            return
+        for gram in trigrams(entry[0]):
+            ids = self._postings.get(gram)
+            if ids is not None:
+                ids.discard(post_id)
+                if not ids:
+                    del self._postings[gram]
+
+    def build(self, rows):
+        """Rebuild the index and swap it in.
+
+        Args:
+            rows: Iterable of (id, title, slug) tuples
+        """
+        fresh = TrigramIndex(self.max_candidates)
+        for post_id, title, slug in rows:
+            fresh._add(post_id, title, slug)
+        fresh._built_at = time.time()
+        self._swap(fresh)
+
+    def build_from_db(self):
+        """Rebuild the index from published posts."""
+        self.build(db.session.execute(
+            db.select(Post.id, Post.title, Post.slug)
+            .where(Post.status == 'published')
+            .execution_options(yield_per=5000)
+        ))
+
+    def _replay(self, change, post_id, *args):
+        self._discard(post_id)
+        if change == 'add':
+            self._add(post_id, *args)
+
+    def update_post(self, post):
+        """Index a ``Post`` model instance, or drop it if unpublished."""
+        with self._lock:
+            if post.status == 'published':
+                self._log_change('add', post.id, post.title, post.slug)
+            else:
+                self._log_change('remove', post.id)
+            if self._built_at is None:
+                return
+            self._discard(post.id)
+            if post.status == 'published':
+                self._add(post.id, post.title, post.slug)
+
+    def remove(self, post_id):
+        """Remove a post from the index."""
+        with self._lock:
+            self._log_change('remove', post_id)
+            self._discard(post_id)
+
+    def suggest(self, query, limit=10, threshold=0.6):
+        """Get titles matching ``query``.
+
+        Args:
+            query: Text typed so far
+            limit: Maximum number of results
+            threshold: Minimum word similarity (pg_trgm's default is 0.6)
+
+        Returns:
+            list: (post_id, title, slug, score) tuples, best first
+        """
+        self._ensure_built()
+        grams = trigrams(query)
+        if not grams:
+            return []
+        n_query = len(grams)
+        min_shared = max(math.ceil(threshold * n_query), 1)
+
+        with self._lock:
+            lists = sorted((self._postings.get(gram, ()) for gram in grams), key=len)
+
+            # A title sharing min_shared trigrams must appear in at least one
+            # of the shortest n - min_shared + 1 lists, so only those generate
+            # candidates; the long, common lists are only probed
+            cut = n_query - min_shared + 1
+            shared = Counter()
+            for ids in lists[:cut]:
+                shared.update(ids)
+            for ids in lists[cut:]:
+                shared.update(shared.keys() & ids)
+
+            best = heapq.nlargest(
+                self.max_candidates,
+                [(count, post_id) for post_id, count in shared.items() if count >= min_shared]
+            )
+            results = []
+            for count, post_id in best:
+                title, slug, n_title = self._titles[post_id]
+                whole = count / (n_query + n_title - count)
+                results.append((count / n_query, whole, post_id, title, slug))
+
+        results.sort(key=lambda r: (-r[0], -r[1], r[3]))
+        return [(post_id, title, slug, score) for score, _, post_id, title, slug in results[:limit]]
+
+
+def suggest_titles(query, limit=10, threshold=0.6):
+    """Suggest published post titles for a partial, possibly misspelled query.
+
+    Uses pg_trgm's ``<%`` operator (served by the GIN trigram index on
+    ``posts.title``) on PostgreSQL and the in-process ``TrigramIndex``
+    everywhere else. On PostgreSQL the operator also applies
+    ``pg_trgm.word_similarity_threshold``, so thresholds below it have no
+    effect there.
+
+    Returns:
+        list: (post_id, title, slug, score) tuples, best first
+    """
+    if db.engine.dialect.name == 'postgresql':
+        score = db.func.word_similarity(query, Post.title)
+        rows = db.session.execute(
+            db.select(Post.id, Post.title, Post.slug, score.label('score'))
+            .where(
+                Post.status == 'published',
+                db.literal(query).op('<%')(Post.title),
+                score >= threshold
+            )
+            .order_by(score.desc(), db.func.similarity(query, Post.title).desc(), Post.title)
+            .limit(limit)
+        )
+        return [(row.id, row.title, row.slug, row.score) for row in rows]
+
+    return title_index.suggest(query, limit, threshold)
+
+
+title_index = TrigramIndex()
@@ -0,0 +1,380 @@
+"""Sampled request tracing with W3C trace context and batched JSONL export."""
+import atexit
+import json
+import os
+import queue
+import random
+import re
+import threading
+import time
+from contextvars import ContextVar
+from functools import wraps
+from flask import request
+from sqlalchemy import event
+from app.services.profiling import redacted_path
+
+
+# Innermost open span of the current request or job (None: not traced)
+_current_span = ContextVar('tracing_current_span', default=None)
+
+_TRACEPARENT = re.compile(r'^00-([0-9a-f]{32})-([0-9a-f]{16})-([0-9a-f]{2})$')
+
+# Longest SQL statement text kept on a span
+MAX_STATEMENT_LENGTH = 1000
+
+
+def parse_traceparent(header):
+    """Parse a W3C ``traceparent`` header.
+
+    Returns:
+        tuple: (trace id, parent span id, sampled flag), or None if the
+        header is missing or malformed
+    """
+    match = _TRACEPARENT.match((header or '').strip().lower())
+    if not match or match.group(1) == '0' * 32 or match.group(2) == '0' * 16:
+        return None
+    trace_id, parent_id, flags = match.groups()
+    return trace_id, parent_id, bool(int(flags, 16) & 1)
+
+
+class Span:
+    """One timed operation in a trace.
+
+    Use as a context manager: it becomes the parent of spans opened inside
+    it and is exported when it ends. An exception leaving the block marks
+    it as an error.
+    """
+
+    __slots__ = ('tracer', 'name', 'trace_id', 'span_id', 'parent_id', 'attributes',
+                 'start', 'end', 'error', '_started', '_token')
+
+    def __init__(self, tracer, name, trace_id, parent_id=None, attributes=None):
+        self.tracer = tracer
+        self.name = name
+        self.trace_id = trace_id
+        self.span_id = os.urandom(8).hex()
+        self.parent_id = parent_id
+        self.attributes = attributes or {}
+        self.start = time.time_ns()
+        self.end = None
+        self.error = None
+        self._started = time.perf_counter_ns()
+        self._token = None
+
+    @property
+    def traceparent(self):
+        return f'00-{self.trace_id}-{self.span_id}-01'
+
+    def set_attribute(self, key, value):
+        self.attributes[key] = value
+
+    def finish(self, error=None):
+        if self.end is not None:
+            return
+        self.end = self.start + time.perf_counter_ns() - self._started
+        if error is not None:
+            self.error = f'{type(error).__name__}: {error}'
+        self.tracer.export(self)
+
+    def __enter__(self):
+        self._token = _current_span.set(self)
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        _current_span.reset(self._token)
+        self.finish(exc)
+        return False
+
+    def to_dict(self):
+        return {
+            'trace_id': self.trace_id,
+            'span_id': self.span_id,
+            'parent_id': self.parent_id,
+            'name': self.name,
+            'start_unix_nano': self.start,
+            'duration_ms': round((self.end - self.start) / 1e6, 3),
+            'status': 'error' if self.error else 'ok',
+            'error': self.error,
+            'attributes': self.attributes,
+        }
+
+
+class _NoopSpan:
+    """Stands in for a span outside sampled traces, at next to no cost."""
+
+    traceparent = None
+
+    def set_attribute(self, key, value):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+
+NOOP_SPAN = _NoopSpan()
+
+
+class BatchExporter:
+    """Buffer finished spans and write them out in batches on a thread.
+
+    Spans go to a bounded queue; when it is full new spans are dropped
+    (and counted) rather than slowing requests down. A daemon thread,
+    started on first use in each process, writes the queue out every
+    ``interval`` seconds, or sooner once ``batch_size`` spans are waiting:
+    as JSON lines appended to ``path``, or POSTed as
+    ``application/x-ndjson`` to ``url`` (a collector or a stand-in).
+    """
+
+    def __init__(self, path=None, url=None, batch_size=512, interval=5.0, max_queue=10000):
+        self.path = path
+        self.url = url
+        self.batch_size = batch_size
+        self.interval = interval
+        self.dropped = 0
+        self._queue = queue.Queue(max_queue)
+        self._wake = threading.Event()
+        self._pid = None
+        self._lock = threading.Lock()
+        self._write_lock = threading.Lock()
+
+    def export(self, span):
+        if self._pid != os.getpid():
+            self._start()
+        try:
+            self._queue.put_nowait(span)
+        except queue.Full:
+            self.dropped += 1
+            return
+        if self._queue.qsize() >= self.batch_size:
+            self._wake.set()
+
+    def _start(self):
+        with self._lock:
+            if self._pid == os.getpid():
+                return
+            # After a fork the parent's thread and queued spans are not ours
+            self._queue = queue.Queue(self._queue.maxsize)
+            self._pid = os.getpid()
+            threading.Thread(target=self._run, name='trace-exporter', daemon=True).start()
+        atexit.register(self.flush)
+
+    def _run(self):
+        while True:
+            self._wake.wait(self.interval)
+            self._wake.clear()
+            self.flush()
+
+    def _write(self, batch):
+        payload = ''.join(json.dumps(span.to_dict(), default=str) + '\n' for span in batch)
+        try:
+            if self.url:
+                # Imported lazily like the ImageKit client
+                import requests
+                requests.post(self.url, data=payload.encode(), timeout=5,
+                              headers={'Content-Type': 'application/x-ndjson'})
+            else:
+                with open(self.path, 'a', encoding='utf-8') as f:
+                    f.write(payload)
+        except Exception:
+            # Tracing must never take the app down; the batch is lost
+            self.dropped += len(batch)
+
+    def flush(self):
+        """Write out every queued span, ``batch_size`` at a time."""
+        with self._write_lock:
+            while True:
+                batch = []
+                try:
+                    while len(batch) < self.batch_size:
+                        batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    pass
+                if not batch:
+                    return
+                self._write(batch)
+
+
+class Tracer:
+    """Per-request tracing for Flask and SQLAlchemy.
+
+    A trace starts with each request, sampled at TRACING_SAMPLE_RATE. When
+    a ``traceparent`` header is sent the request joins the caller's trace;
+    the caller's sampling decision is only kept with TRACING_TRUST_INCOMING
+    (every caller is an upstream service or a proxy that sets the header),
+    so clients cannot force tracing overhead onto the server. Sampled
+    requests get a root span, a span per SQL statement and JWT check, and
+    whatever code wraps in ``tracer.span(...)`` or ``@tracer.traced(...)``;
+    the response carries a ``traceresponse`` header naming the trace.
+
+    Outside sampled requests ``span()`` returns a shared no-op span, so
+    instrumented code costs a context variable lookup.
+    """
+
+    def __init__(self):
+        self.enabled = False
+        self.sample_rate = 0.0
+        self.trust_incoming = False
+        self.exporter = None
+        self._engines = set()
+        self._jwt_patched = False
+
+    def init_app(self, app, engine):
+        """Install request hooks and SQL listeners if TRACING_ENABLED.
+
+        Args:
+            app: Flask application
+            engine: SQLAlchemy engine to trace
+        """
+        self.enabled = app.config.get('TRACING_ENABLED', False)
+        if not self.enabled:
+            return
+        self.sample_rate = app.config.get('TRACING_SAMPLE_RATE', 0.01)
+        self.trust_incoming = app.config.get('TRACING_TRUST_INCOMING', False)
+        self.exporter = BatchExporter(
+            path=app.config.get('TRACING_EXPORT_PATH', 'traces.jsonl'),
+            url=app.config.get('TRACING_COLLECTOR_URL'),
+            batch_size=app.config.get('TRACING_BATCH_SIZE', 512),
+            interval=app.config.get('TRACING_FLUSH_INTERVAL', 5),
+            max_queue=app.config.get('TRACING_QUEUE_SIZE', 10000),
+        )
+
+        app.before_request_funcs.setdefault(None, []).insert(0, self._start_request)
+        app.after_request(self._finish_response)
+        app.teardown_request(self._end_request)
+        if engine not in self._engines:
+            self._engines.add(engine)
+            event.listen(engine, 'before_cursor_execute', self._before_cursor_execute)
+            event.listen(engine, 'after_cursor_execute', self._after_cursor_execute)
+            event.listen(engine, 'handle_error', self._handle_error)
+        self._trace_jwt_checks()
+
+    # Spans
+
+    def current_span(self):
+        """Get the innermost open span, or None outside sampled traces."""
+        return _current_span.get()
+
+    def span(self, name, parent=None, **attributes):
+        """Open a child span of ``parent`` (default: the current span).
+
+        Returns:
+            Span: Context manager; the no-op span when not traced
+        """
+        parent = parent or _current_span.get()
+        if parent is None or not isinstance(parent, Span):
+            return NOOP_SPAN
+        return Span(self, name, parent.trace_id, parent.span_id, attributes)
+
+    def traced(self, name):
+        """Decorator running the function inside ``span(name)``."""
+        def decorator(fn):
+            @wraps(fn)
+            def wrapper(*args, **kwargs):
+                if _current_span.get() is None:
+                    return fn(*args, **kwargs)
+                with self.span(name):
+                    return fn(*args, **kwargs)
+            return wrapper
+        return decorator
+
+    def inject(self, headers):
+        """Add the current span's ``traceparent`` to outgoing HTTP headers.
+
+        Returns:
+            dict: ``headers``, for chaining
+        """
+        span = _current_span.get()
+        if span is not None:
+            headers['traceparent'] = span.traceparent
+        return headers
+
+    def export(self, span):
+        if self.exporter is not None:
+            self.exporter.export(span)
+
+    # Requests
+
+    def _start_request(self):
+        incoming = parse_traceparent(request.headers.get('traceparent'))
+        trace_id, parent_id, sampled = incoming or (None, None, False)
+        if not (incoming and self.trust_incoming):
+            # An untrusted caller's trace is joined, but sampled here
+            sampled = random.random() < self.sample_rate
+        if not sampled:
+            return
+
+        rule = request.url_rule.rule if request.url_rule else 'unmatched'
+        span = Span(self, f'{request.method} {rule}', trace_id or os.urandom(16).hex(), parent_id, {
+            'http.method': request.method,
+            'http.route': rule,
+            # Without a profiling token sent as ?_profile=
+            'http.target': redacted_path(),
+            'endpoint': request.endpoint,
+        })
+        _current_span.set(span)
+
+    def _finish_response(self, response):
+        span = _current_span.get()
+        if span is not None:
+            span.set_attribute('http.status_code', response.status_code)
+            response.headers['traceresponse'] = span.traceparent
+        return response
+
+    def _end_request(self, exc):
+        span = _current_span.get()
+        if span is None:
+            return
+        _current_span.set(None)
+        span.finish(exc)
+
+    # SQL
+
+    def _before_cursor_execute(self, conn, cursor, statement, parameters, context, executemany):
+        parent = _current_span.get()
+        if parent is None:
+            return
+        span = Span(self, 'db.query', parent.trace_id, parent.span_id, {
+            'db.system': conn.dialect.name,
+            'db.statement': statement[:MAX_STATEMENT_LENGTH],
+        })
+        if executemany:
+            span.set_attribute('db.executemany', True)
+        conn.info.setdefault('tracing_spans', []).append(span)
+
+    def _after_cursor_execute(self, conn, cursor, statement, parameters, context, executemany):
+        spans = conn.info.get('tracing_spans')
+        if spans:
+            span = spans.pop()
+            if cursor.rowcount is not None and cursor.rowcount >= 0:
+                span.set_attribute('db.rowcount', cursor.rowcount)
+            span.finish()
+
+    def _handle_error(self, context):
+        spans = context.connection.info.get('tracing_spans') if context.connection is not None else None
+        if spans:
+            spans.pop().finish(context.original_exception)
+
+    # JWT verification
+
+    def _trace_jwt_checks(self):
+        # jwt_required() looks verify_jwt_in_request up in its module at
+        # call time, so wrapping it there times every protected view
+        if self._jwt_patched:
+            return
+        from flask_jwt_extended import view_decorators
+
+        verify = view_decorators.verify_jwt_in_request
+
+        @wraps(verify)
+        def traced_verify(*args, **kwargs):
+            with self.span('jwt.verify'):
+                return verify(*args, **kwargs)
+
+        view_decorators.verify_jwt_in_request = traced_verify
+        self._jwt_patched = True
+
+
+tracer = Tracer()
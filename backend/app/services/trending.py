@@ -0,0 +1,323 @@
+"""Trending posts service with time-decayed view scores."""
+import math
+import threading
+import time
+from bisect import bisect_left, insort
+from datetime import datetime
+from flask import current_app
+from app import db
+
+
+WINDOW_UNITS = {'h': 3600, 'd': 86400}
+
+# Rebase stored weights before exp() can overflow a float
+MAX_EXPONENT = 500.0
+
+
+def parse_window(window):
+    """Parse a window string such as ``24h`` or ``7d`` into seconds.
+
+    Args:
+        window: Window string (number followed by ``h`` or ``d``)
+
+    Returns:
+        int: Window length in seconds
+
+    Raises:
+        ValueError: If the window string is malformed
+    """
+    if not window or window[-1] not in WINDOW_UNITS or not window[:-1].isdigit():
+        raise ValueError(f"Invalid window: {window!r}")
+
+    seconds = int(window[:-1]) * WINDOW_UNITS[window[-1]]
+    if seconds <= 0:
+        raise ValueError(f"Invalid window: {window!r}")
+    return seconds
+
+
+class DecayedRanking:
+    """Exponentially decayed scores for one window, kept in rank order.
+
+    A view at time ``t`` contributes ``exp(-(now - t) / tau)`` to a post's
+    score. Weights are stored relative to a fixed reference time so that
+    ageing never changes the relative order of posts; only new views move
+    a post, which keeps the ranked list valid without periodic re-sorting.
+    """
+
+    def __init__(self, tau):
+        self.tau = float(tau)
+        self.reference = time.time()
+        self._weights = {}
+        self._ranked = []  # sorted (-weight, post_id)
+
+    def __len__(self):
+        return len(self._weights)
+
+    def _factor(self, now):
+        return math.exp((now - self.reference) / self.tau)
+
+    def _rebase(self, now):
+        scale = math.exp(-(now - self.reference) / self.tau)
+        self._weights = {pid: w * scale for pid, w in self._weights.items()}
+        self._ranked = [(neg * scale, pid) for neg, pid in self._ranked]
+        self.reference = now
+
+    def _set(self, post_id, weight):
+        old = self._weights.get(post_id)
+        if old is not None:
+            index = bisect_left(self._ranked, (-old, post_id))
+            del self._ranked[index]
+        if weight is None:
+            self._weights.pop(post_id, None)
+            return
+        self._weights[post_id] = weight
+        insort(self._ranked, (-weight, post_id))
+
+    def add(self, post_id, amount=1.0, at=None):
+        """Add a decayed contribution for a post.
+
+        Args:
+            post_id: Post ID
+            amount: Score at time ``at`` (1.0 for a single view)
+            at: Unix timestamp of the event (default: now)
+        """
+        at = time.time() if at is None else at
+        if (at - self.reference) / self.tau > MAX_EXPONENT:
+            self._rebase(at)
+        weight = amount * self._factor(at)
+        self._set(post_id, self._weights.get(post_id, 0.0) + weight)
+
+    def remove(self, post_id):
+        """Drop a post from the ranking."""
+        if post_id in self._weights:
+            self._set(post_id, None)
+
+    def score(self, post_id, now=None):
+        """Get a post's decayed score at ``now``."""
+        now = time.time() if now is None else now
+        return self._weights.get(post_id, 0.0) / self._factor(now)
+
+    def top(self, limit, now=None):
+        """Get the highest scoring posts.
+
+        Args:
+            limit: Maximum number of entries
+            now: Unix timestamp to decay scores to (default: now)
+
+        Returns:
+            list: (post_id, score) tuples, highest score first
+        """
+        now = time.time() if now is None else now
+        factor = self._factor(now)
+        return [(pid, -neg / factor) for neg, pid in self._ranked[:limit]]
+
+    def scores(self, now=None):
+        """Get every post's decayed score at ``now``."""
+        now = time.time() if now is None else now
+        factor = self._factor(now)
+        return {pid: w / factor for pid, w in self._weights.items()}
+
+    def prune(self, min_score, now=None):
+        """Forget posts whose decayed score fell below ``min_score``.
+
+        Returns:
+            int: Number of posts removed
+        """
+        now = time.time() if now is None else now
+        cutoff = min_score * self._factor(now)
+        index = bisect_left(self._ranked, (-cutoff, -1))
+        stale = self._ranked[index:]
+        del self._ranked[index:]
+        for _, pid in stale:
+            del self._weights[pid]
+        return len(stale)
+
+
+def epoch_expression(column):
+    """SQL expression for a naive UTC datetime column as Unix seconds."""
+    if db.engine.dialect.name == 'postgresql':
+        return db.extract('epoch', column)
+    return (db.func.julianday(column) - 2440587.5) * 86400.0
+
+
+class TrendingService:
+    """In-memory trending rankings, merged through the database.
+
+    One ``DecayedRanking`` is kept per configured window. Rankings are
+    loaded from the ``trending_scores`` table on first use. Views are
+    also collected per window as a delta since the last snapshot; every
+    ``TRENDING_SNAPSHOT_INTERVAL`` seconds a background job adds the
+    deltas to the stored scores (decaying those first, in one upsert, so
+    snapshots from several worker processes add up rather than overwrite
+    each other) and reloads the rankings from the merged table.
+    """
+
+    def __init__(self, app=None):
+        self.windows = {}
+        self.snapshot_interval = 300
+        self.min_score = 0.01
+        self._pending = {}
+        self._lock = threading.Lock()
+        self._loaded = False
+        self._last_snapshot = time.time()
+        self._snapshot_running = False
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        """Configure windows from the application config."""
+        self.windows = {
+            name: DecayedRanking(parse_window(name))
+            for name in app.config.get('TRENDING_WINDOWS', ['24h'])
+        }
+        self._pending = self._empty_rankings()
+        self.snapshot_interval = app.config.get('TRENDING_SNAPSHOT_INTERVAL', 300)
+        self.min_score = app.config.get('TRENDING_MIN_SCORE', 0.01)
+        self._loaded = False
+        app.extensions['trending'] = self
+
+    def _empty_rankings(self):
+        return {name: DecayedRanking(ranking.tau) for name, ranking in self.windows.items()}
+
+    def _ensure_loaded(self):
+        if self._loaded:
+            return
+        with self._lock:
+            if not self._loaded:
+                rankings = self._load_snapshot()
+                if rankings is not None:
+                    self.windows = rankings
+                self._loaded = True
+
+    def _load_snapshot(self):
+        """Read stored scores into fresh rankings, or None if they can't be read."""
+        from app.models.analytics import TrendingScore
+
+        now = time.time()
+        utcnow = datetime.utcnow()
+        try:
+            rows = TrendingScore.query.filter(TrendingScore.window.in_(list(self.windows))).all()
+        except Exception:
+            db.session.rollback()
+            current_app.logger.warning("Could not load trending snapshot", exc_info=True)
+            return None
+
+        rankings = self._empty_rankings()
+        for row in rows:
+            ranking = rankings[row.window]
+            age = max((utcnow - row.updated_at).total_seconds(), 0.0)
+            ranking.add(row.post_id, row.score * math.exp(-age / ranking.tau), at=now)
+        return rankings
+
+    def record_view(self, post_id, at=None):
+        """Record a view for a post in every window.
+
+        Args:
+            post_id: Post ID
+            at: Unix timestamp of the view (default: now)
+        """
+        self._ensure_loaded()
+        with self._lock:
+            for name, ranking in self.windows.items():
+                ranking.add(post_id, at=at)
+                self._pending[name].add(post_id, at=at)
+            due = not self._snapshot_running and time.time() - self._last_snapshot >= self.snapshot_interval
+            if due:
+                self._snapshot_running = True
+
+        if due:
+            from app.services.background import background
+            background.submit(self.snapshot)
+
+    def forget(self, post_id):
+        """Remove a post from every window (e.g. after deletion)."""
+        with self._lock:
+            for name, ranking in self.windows.items():
+                ranking.remove(post_id)
+                self._pending[name].remove(post_id)
+
+    def top(self, window, limit=10):
+        """Get the top posts for a window.
+
+        Args:
+            window: Window name (must be configured in TRENDING_WINDOWS)
+            limit: Maximum number of posts
+
+        Returns:
+            list: (post_id, score) tuples, highest score first
+
+        Raises:
+            KeyError: If the window is not configured
+        """
+        self._ensure_loaded()
+        ranking = self.windows[window]
+        with self._lock:
+            return ranking.top(limit)
+
+    def snapshot(self):
+        """Merge views since the last snapshot into ``trending_scores``.
+
+        Each stored score is decayed to now and this process's delta added
+        in a single upsert; scores that have decayed below
+        ``TRENDING_MIN_SCORE`` are deleted. The in-memory rankings are then
+        reloaded from the table, picking up other workers' views. If the
+        merge fails the deltas are kept for the next snapshot.
+        """
+        from app.models.analytics import TrendingScore
+
+        now = time.time()
+        with self._lock:
+            self._last_snapshot = now
+            pending, self._pending = self._pending, self._empty_rankings()
+
+        table = TrendingScore.__table__
+        updated_at = datetime.utcfromtimestamp(now)
+        try:
+            with db.engine.begin() as conn:
+                for name, ranking in pending.items():
+                    rows = [
+                        {'window': name, 'post_id': pid, 'score': score, 'updated_at': updated_at}
+                        for pid, score in ranking.scores(now).items()
+                    ]
+                    # Stored score decayed from its updated_at to now
+                    decayed = table.c.score * db.func.exp((epoch_expression(table.c.updated_at) - now) / ranking.tau)
+                    if rows:
+                        insert = _dialect_insert(conn)(table)
+                        conn.execute(insert.on_conflict_do_update(
+                            index_elements=[table.c.window, table.c.post_id],
+                            set_={'score': decayed + insert.excluded.score, 'updated_at': insert.excluded.updated_at},
+                        ), rows)
+                    conn.execute(table.delete().where(table.c.window == name, decayed < self.min_score))
+        except Exception:
+            # Keep the views for the next snapshot
+            with self._lock:
+                for name, ranking in pending.items():
+                    for pid, score in ranking.scores(now).items():
+                        self._pending[name].add(pid, score, at=now)
+                self._snapshot_running = False
+            current_app.logger.warning("Trending snapshot failed", exc_info=True)
+            return
+
+        rankings = self._load_snapshot()
+        with self._lock:
+            if rankings is not None:
+                # Views recorded while the merge ran are not in the table yet
+                for name, ranking in self._pending.items():
+                    for pid, score in ranking.scores().items():
+                        rankings[name].add(pid, score)
+                for ranking in rankings.values():
+                    ranking.prune(self.min_score)
+                self.windows = rankings
+                self._loaded = True
+            self._snapshot_running = False
+
+
+def _dialect_insert(conn):
+    if conn.dialect.name == 'postgresql':
+        from sqlalchemy.dialects.postgresql import insert
+    else:
+        from sqlalchemy.dialects.sqlite import insert
+    return insert
+
+
+trending = TrendingService()
@@ -0,0 +1,239 @@
+"""Cache warm-up run by each worker before it takes traffic."""
+import time
+from flask import request
+from app import db, limiter
+
+
+# WSGI environ key marking warm-up requests (not settable from outside)
+WARMUP_ENVIRON_KEY = 'blogger2.warmup'
+
+
+class WarmUp:
+    """Preload hot data into a fresh worker's caches and connection pool.
+
+    Runs a fixed list of steps, hottest first: fill the connection pool,
+    start the related posts and suggestion index builds on the background
+    pool, then serve the first WARMUP_LIST_PAGES pages of the post list,
+    the tag and category lists and the trending lists through the test
+    client, load the WARMUP_TOP_POSTS most viewed posts and their related
+    posts, and serve suggestions. Going through the real routes also warms
+    lazy imports, SQLAlchemy's compiled statement cache and the database's
+    own buffers.
+
+    Warm-up ends after WARMUP_BUDGET seconds: steps check the deadline
+    between requests, posts and connections, and wait for the index builds
+    only until then. Builds still running carry on in the background once
+    the worker takes traffic, so a large index never holds up the boot
+    (or runs into gunicorn's worker timeout). A failing step is logged
+    and never stops the worker from booting. Warm-up requests are exempt
+    from rate limits; posts are loaded directly rather than through
+    ``GET /api/posts/<slug>``, which would record page views.
+    """
+
+    def __init__(self):
+        self.enabled = False
+        self.budget = 10.0
+        self.list_pages = 3
+        self.top_posts = 20
+        self.pool_connections = 5
+        self.report = None
+        self._limits_exempted = False
+
+    def init_app(self, app):
+        """Configure warm-up from the application config.
+
+        Args:
+            app: Flask application
+        """
+        self.enabled = app.config.get('WARMUP_ENABLED', True)
+        self.budget = app.config.get('WARMUP_BUDGET', 10.0)
+        self.list_pages = app.config.get('WARMUP_LIST_PAGES', 3)
+        self.top_posts = app.config.get('WARMUP_TOP_POSTS', 20)
+        self.pool_connections = app.config.get('WARMUP_POOL_CONNECTIONS', 5)
+        app.extensions['warmup'] = self
+        if not self._limits_exempted:
+            limiter.request_filter(lambda: request.environ.get(WARMUP_ENVIRON_KEY, False))
+            self._limits_exempted = True
+
+    def run(self, app, budget=None):
+        """Warm the caches of ``app`` in this process.
+
+        Args:
+            app: Flask application
+            budget: Seconds to spend (default: WARMUP_BUDGET)
+
+        Returns:
+            dict: Time spent and budget (ms), each step's status ('ok',
+            'partial', 'skipped' or 'failed'), time and requests served,
+            and the size of each cache afterwards
+        """
+        budget = self.budget if budget is None else budget
+        started = time.perf_counter()
+        deadline = started + budget
+        client = app.test_client()
+        client.environ_base.update({WARMUP_ENVIRON_KEY: True, 'HTTP_USER_AGENT': 'blogger2-warmup'})
+
+        steps = []
+        for name, step in self._steps():
+            entry = {'name': name, 'status': 'skipped', 'ms': 0.0, 'requests': 0}
+            steps.append(entry)
+            if time.perf_counter() >= deadline:
+                continue
+            step_started = time.perf_counter()
+            try:
+                with app.app_context():
+                    entry.update({'status': 'ok', **step(app, client, deadline)})
+            except Exception:
+                entry['status'] = 'failed'
+                app.logger.exception("Warm-up step %s failed", name)
+            entry['ms'] = round((time.perf_counter() - step_started) * 1000, 1)
+
+        with app.app_context():
+            caches = self._cache_sizes()
+        self.report = {
+            'elapsed_ms': round((time.perf_counter() - started) * 1000, 1),
+            'budget_ms': round(budget * 1000, 1),
+            'steps': steps,
+            'caches': caches,
+        }
+        return self.report
+
+    def summary(self, report=None):
+        """One-line summary of a warm-up report (default: the last run)."""
+        report = report or self.report
+        steps = ', '.join(f"{step['name']} {step['status']} {step['ms']:.0f} ms" for step in report['steps'])
+        caches = ', '.join(f'{name}={size}' for name, size in report['caches'].items())
+        return f"Warm-up took {report['elapsed_ms']:.0f} ms of {report['budget_ms']:.0f} ms: {steps}; caches: {caches}"
+
+    def _steps(self):
+        return [
+            ('pool', self._fill_pool),
+            ('indexes', self._schedule_indexes),
+            ('posts', lambda app, client, deadline: self._get(client, deadline, [
+                f'/api/posts?page={page}' for page in range(1, self.list_pages + 1)
+            ])),
+            ('taxonomy', lambda app, client, deadline: self._get(client, deadline, [
+                '/api/tags', '/api/categories',
+            ])),
+            ('popular', self._popular),
+            ('top_posts', self._load_top_posts),
+            ('suggest', self._suggest),
+        ]
+
+    def _get(self, client, deadline, paths):
+        errors = 0
+        for served, path in enumerate(paths):
+            if time.perf_counter() >= deadline:
+                return {'status': 'partial', 'requests': served, 'errors': errors}
+            if client.get(path).status_code >= 400:
+                errors += 1
+        return {'requests': len(paths), 'errors': errors}
+
+    @staticmethod
+    def _wait(indexes, deadline):
+        """Wait for index builds until ``deadline``; returns the names still building."""
+        return [
+            name for name, index in indexes.items()
+            if not index.wait_ready(max(deadline - time.perf_counter(), 0))
+        ]
+
+    @staticmethod
+    def _indexes():
+        from app.services.related import related_posts
+        from app.services.autocomplete import tag_index, category_index
+        from app.services.title_index import title_index
+
+        indexes = {'related_posts': related_posts, 'tag_index': tag_index, 'category_index': category_index}
+        # PostgreSQL serves title suggestions from its trigram index
+        if db.engine.dialect.name != 'postgresql':
+            indexes['title_index'] = title_index
+        return indexes
+
+    # Steps
+
+    def _fill_pool(self, app, client, deadline):
+        # Check out connections side by side so the pool keeps that many open
+        pool = db.engine.pool
+        size = min(self.pool_connections, pool.size()) if hasattr(pool, 'size') else 1
+        connections = []
+        try:
+            for _ in range(size):
+                if time.perf_counter() >= deadline:
+                    return {'status': 'partial', 'connections': len(connections)}
+                connection = db.engine.connect()
+                connections.append(connection)
+                connection.exec_driver_sql('SELECT 1')
+        finally:
+            for connection in connections:
+                connection.close()
+        return {'connections': len(connections)}
+
+    def _schedule_indexes(self, app, client, deadline):
+        # Built on the background pool while the other steps run
+        scheduled = [name for name, index in self._indexes().items()
+                     if not index.ready and index.schedule_rebuild() is not None]
+        return {'scheduled': scheduled}
+
+    def _popular(self, app, client, deadline):
+        from app.services.trending import trending
+
+        return self._get(client, deadline, [f'/api/analytics/popular?window={window}' for window in trending.windows])
+
+    def _load_top_posts(self, app, client, deadline):
+        from app.models.post import Post
+        from app.services.related import related_posts
+
+        slugs = db.session.execute(
+            db.select(Post.slug)
+            .where(Post.status == 'published')
+            .order_by(Post.view_count.desc())
+            .limit(self.top_posts)
+        ).scalars().all()
+        loaded = []
+        for slug in slugs:
+            if time.perf_counter() >= deadline:
+                return {'status': 'partial', 'posts': len(loaded)}
+            # The query and serialization GET /api/posts/<slug> runs
+            post = Post.query.filter_by(slug=slug).first()
+            if post is not None:
+                post.to_dict(include_content=True)
+                loaded.append(post.id)
+
+        # Their related posts, once the index is in (no sooner: lookups on a
+        # cold index only index the post on its own)
+        if self._wait({'related_posts': related_posts}, deadline):
+            return {'status': 'partial', 'posts': len(loaded), 'pending': ['related_posts']}
+        if not related_posts.precompute(loaded, deadline):
+            return {'status': 'partial', 'posts': len(loaded)}
+        result = self._get(client, deadline, [f'/api/posts/{slug}/related' for slug in slugs])
+        result['posts'] = len(loaded)
+        return result
+
+    def _suggest(self, app, client, deadline):
+        indexes = self._indexes()
+        del indexes['related_posts']
+        pending = self._wait(indexes, deadline)
+        if pending:
+            return {'status': 'partial', 'pending': pending}
+        return self._get(client, deadline, [
+            '/api/tags/suggest?q=a', '/api/categories/suggest?q=a', '/api/posts/suggest?q=a',
+        ])
+
+    def _cache_sizes(self):
+        from app.services.trending import trending
+        from app.services.related import related_posts
+        from app.services.autocomplete import tag_index, category_index
+        from app.services.title_index import title_index
+
+        pool = db.engine.pool
+        return {
+            'pool_connections': pool.checkedin() if hasattr(pool, 'checkedin') else None,
+            'trending_posts': sum(len(ranking) for ranking in trending.windows.values()),
+            'related_posts': len(related_posts),
+            'tag_index': len(tag_index),
+            'category_index': len(category_index),
+            'title_index': len(title_index),
+        }
+
+
+warmup = WarmUp()
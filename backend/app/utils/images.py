@@ -0,0 +1,49 @@
+"""Responsive image URL sets for ImageKit-hosted images."""
+from functools import lru_cache
+from flask import current_app
+from app.services.imagekit import transform_url
+
+
+# Modern formats offered as <picture> sources, best first
+SOURCE_FORMATS = (('avif', 'image/avif'), ('webp', 'image/webp'))
+
+
+@lru_cache(maxsize=4096)
+def _build(url, widths, quality):
+    # Cached as tuples: callers get a fresh dict and may modify it
+    def srcset(**transforms):
+        return ', '.join(
+            f"{transform_url(url, {'w': width, 'q': quality, **transforms})} {width}w"
+            for width in widths
+        )
+
+    src = transform_url(url, {'w': widths[len(widths) // 2], 'q': quality})
+    return src, srcset(), tuple((mime, srcset(f=fmt)) for fmt, mime in SOURCE_FORMATS)
+
+
+def responsive_image(url, profile):
+    """Get srcset/sources for an image at the widths of a display profile.
+
+    URL sets are memoized per image and profile. Images not served from
+    ``IMAGEKIT_URL_ENDPOINT`` cannot be transformed and get None.
+
+    Args:
+        url: Image URL
+        profile: Key of ``IMAGE_PROFILES`` (e.g. 'thumbnail', 'hero')
+
+    Returns:
+        dict: {profile, src, srcset, sizes, sources} or None
+    """
+    endpoint = current_app.config.get('IMAGEKIT_URL_ENDPOINT')
+    if not url or not endpoint or not url.startswith(endpoint.rstrip('/') + '/'):
+        return None
+
+    spec = current_app.config['IMAGE_PROFILES'][profile]
+    src, srcset, sources = _build(url, tuple(spec['widths']), spec.get('quality', 80))
+    return {
+        'profile': profile,
+        'src': src,
+        'srcset': srcset,
+        'sizes': spec['sizes'],
+        'sources': [{'type': mime, 'srcset': urls} for mime, urls in sources],
+    }
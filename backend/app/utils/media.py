@@ -0,0 +1,119 @@
+"""Media file helpers."""
+import struct
+
+
+# (offset, magic bytes, MIME type), checked in order
+SIGNATURES = (
+    (0, b'\x89PNG\r\n\x1a\n', 'image/png'),
+    (0, b'\xff\xd8\xff', 'image/jpeg'),
+    (0, b'GIF87a', 'image/gif'),
+    (0, b'GIF89a', 'image/gif'),
+    (0, b'%PDF-', 'application/pdf'),
+    (0, b'\x1aE\xdf\xa3', 'video/webm'),
+    (0, b'OggS', 'audio/ogg'),
+    (0, b'ID3', 'audio/mpeg'),
+    (0, b'BM', 'image/bmp'),
+)
+
+
+def sniff_mime(head):
+    """Detect a file's MIME type from its first bytes.
+
+    Args:
+        head: Leading bytes of the file (a few dozen are enough)
+
+    Returns:
+        str: MIME type, or None if the format is not recognised
+    """
+    if head[:4] == b'RIFF' and head[8:12] == b'WEBP':
+        return 'image/webp'
+    if head[:4] == b'RIFF' and head[8:12] == b'WAVE':
+        return 'audio/wav'
+    if head[4:8] == b'ftyp':
+        brand = head[8:12]
+        if brand in (b'avif', b'avis'):
+            return 'image/avif'
+        if brand in (b'heic', b'heix', b'mif1'):
+            return 'image/heic'
+        if brand == b'qt  ':
+            return 'video/quicktime'
+        return 'video/mp4'
+    if head.lstrip()[:5] in (b'<svg ', b'<?xml'):
+        return 'image/svg+xml'
+
+    for offset, magic, mime in SIGNATURES:
+        if head[offset:offset + len(magic)] == magic:
+            return mime
+    return None
+
+
+# JPEG start-of-frame markers (SOF0-SOF15 minus DHT, JPG and DAC)
+JPEG_SOF_MARKERS = frozenset(range(0xC0, 0xD0)) - {0xC4, 0xC8, 0xCC}
+
+
+def _jpeg_dimensions(head):
+    i = 2
+    while i + 9 < len(head):
+        if head[i] != 0xFF:
+            return None
+        marker = head[i + 1]
+        if marker == 0xFF:
+            i += 1
+            continue
+        if marker in JPEG_SOF_MARKERS:
+            height, width = struct.unpack('>HH', head[i + 5:i + 9])
+            return width, height
+        if marker == 0x01 or 0xD0 <= marker <= 0xD9:
+            i += 2
+            continue
+        i += 2 + struct.unpack('>H', head[i + 2:i + 4])[0]
+    return None
+
+
+def _webp_dimensions(head):
+    chunk = head[12:16]
+    if chunk == b'VP8 ' and len(head) >= 30:
+        width, height = struct.unpack('<HH', head[26:30])
+        return width & 0x3FFF, height & 0x3FFF
+    if chunk == b'VP8L' and len(head) >= 25:
+        b0, b1, b2, b3 = head[21:25]
+        width = 1 + (((b1 & 0x3F) << 8) | b0)
+        height = 1 + (((b3 & 0x0F) << 10) | (b2 << 2) | ((b1 & 0xC0) >> 6))
+        return width, height
+    if chunk == b'VP8X' and len(head) >= 30:
+        return 1 + int.from_bytes(head[24:27], 'little'), 1 + int.from_bytes(head[27:30], 'little')
+    return None
+
+
+def image_dimensions(head, mime_type=None):
+    """Read an image's pixel size from its header, without decoding it.
+
+    Args:
+        head: Leading bytes of the file. JPEGs with large EXIF/ICC blocks
+            may need more than the first 64 KB.
+        mime_type: Detected MIME type; sniffed from ``head`` when omitted
+
+    Returns:
+        tuple: (width, height), or None if the header is not (fully) there
+    """
+    mime_type = mime_type or sniff_mime(head)
+    try:
+        if mime_type == 'image/png' and head[12:16] == b'IHDR':
+            return struct.unpack('>II', head[16:24])
+        if mime_type == 'image/gif':
+            return struct.unpack('<HH', head[6:10])
+        if mime_type == 'image/jpeg':
+            return _jpeg_dimensions(head)
+        if mime_type == 'image/webp':
+            return _webp_dimensions(head)
+        if mime_type == 'image/bmp':
+            width, height = struct.unpack('<ii', head[18:26])
+            return width, abs(height)
+        if mime_type in ('image/avif', 'image/heic'):
+            # Image spatial extents property of the primary item
+            offset = head.find(b'ispe')
+            if offset != -1:
+                return struct.unpack('>II', head[offset + 8:offset + 16])
+    except struct.error:
+        return None
+    return None
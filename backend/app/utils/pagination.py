@@ -0,0 +1,37 @@
+"""Keyset (cursor) pagination helpers."""
+import base64
+import json
+from datetime import datetime
+
+
+def encode_cursor(created_at, row_id):
+    """Encode the sort key of the last row on a page as an opaque cursor.
+
+    Args:
+        created_at: Row timestamp
+        row_id: Row primary key (tie-breaker)
+
+    Returns:
+        str: URL-safe cursor
+    """
+    raw = json.dumps([created_at.isoformat(), row_id], separators=(',', ':')).encode()
+    return base64.urlsafe_b64encode(raw).decode('ascii').rstrip('=')
+
+
+def decode_cursor(cursor):
+    """Decode a cursor made by ``encode_cursor``.
+
+    Returns:
+        tuple: (created_at, row_id), or None if the cursor is invalid
+    """
+    try:
+        raw = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4))
+        created_at, row_id = json.loads(raw)
+        return datetime.fromisoformat(created_at), int(row_id)
+    except (ValueError, TypeError):
+        return None
+
+
+def escape_like(value):
+    """Escape LIKE wildcards so ``value`` matches literally (escape char ``\\``)."""
+    return value.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_')
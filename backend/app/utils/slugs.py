@@ -0,0 +1,67 @@
+"""Unique post slug allocation."""
+from slugify import slugify
+from app import db
+from app.models.post import Post
+from app.utils.pagination import escape_like
+
+
+# Candidates probed per base slug: <slug>, <slug>-1 ... <slug>-(N-1)
+PROBE_CANDIDATES = 10
+
+# Base slugs looked up per query (keeps the bound parameter count low)
+LOOKUP_CHUNK = 200
+
+
+def _candidates(base):
+    return [base] + [f"{base}-{counter}" for counter in range(1, PROBE_CANDIDATES)]
+
+
+def allocate_slugs(items):
+    """Allocate unique slugs for several posts in a few queries.
+
+    Slugs follow the single-post rule: the slugified title, or the first
+    free ``<slug>-1``, ``<slug>-2``, ... The usual candidates are checked
+    with indexed ``IN`` lookups for the whole batch; only bases whose
+    first ``PROBE_CANDIDATES`` slugs are all taken fall back to a prefix
+    scan. Slugs handed out earlier in the same call count as taken, and a
+    post may keep its own current slug.
+
+    Args:
+        items: List of (title, post_id) tuples; post_id is None for new posts
+
+    Returns:
+        list: Slugs, in the order of ``items``
+    """
+    bases = [slugify(title) for title, _ in items]
+    unique_bases = sorted(set(bases))
+
+    taken = {}  # slug -> owning post id
+    for start in range(0, len(unique_bases), LOOKUP_CHUNK):
+        candidates = [slug for base in unique_bases[start:start + LOOKUP_CHUNK] for slug in _candidates(base)]
+        for post_id, slug in db.session.execute(db.select(Post.id, Post.slug).where(Post.slug.in_(candidates))):
+            taken[slug] = post_id
+
+    for base in unique_bases:
+        if all(slug in taken for slug in _candidates(base)):
+            rows = db.session.execute(
+                db.select(Post.id, Post.slug).where(Post.slug.like(f'{escape_like(base)}-%', escape='\\'))
+            )
+            for post_id, slug in rows:
+                taken[slug] = post_id
+
+    slugs = []
+    for base, (_, post_id) in zip(bases, items):
+        owner = post_id if post_id is not None else object()
+        slug = base
+        counter = 1
+        while slug in taken and taken[slug] != owner:
+            slug = f"{base}-{counter}"
+            counter += 1
+        taken[slug] = owner
+        slugs.append(slug)
+    return slugs
+
+
+def allocate_slug(title, post_id=None):
+    """Allocate a unique slug for one post (see ``allocate_slugs``)."""
+    return allocate_slugs([(title, post_id)])[0]
@@ -0,0 +1,17 @@
+"""Gunicorn settings: warm each worker's caches before it accepts requests."""
+import os
+
+# Seconds a worker may go without checking in before the arbiter kills it.
+# Warm-up runs in post_worker_init, before the first check-in, so this must
+# leave room for WARMUP_BUDGET plus the request or query running when it
+# expires; index builds still going after that continue in the background
+timeout = int(os.environ.get('GUNICORN_TIMEOUT', 60))
+
+
+def post_worker_init(worker):
+    # Runs in the worker once the app is loaded, before it starts accepting
+    from app.services.warmup import warmup
+
+    if warmup.enabled:
+        warmup.run(worker.wsgi)
+        worker.log.info("%s", warmup.summary())
@@ -1,20 +1,90 @@
 #!/usr/bin/env python3
-"""Script to run database migrations."""
+"""Script to run database migrations.
 
+Checks the database's Alembic revision against the migration scripts
+first and exits when they match, without importing the app or Alembic;
+pass --force to always run the upgrade.
+"""
+
+import glob
 import os
+import re
+import sys
 from dotenv import load_dotenv
 
 # Load environment variables
 load_dotenv()
 
-from app import create_app
-from flask_migrate import upgrade
+VERSIONS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'migrations', 'versions')
+
+_REVISION = re.compile(r"^revision\s*=\s*['\"](\w+)['\"]", re.MULTILINE)
+_DOWN_REVISION = re.compile(r"^down_revision\s*=\s*(.+)$", re.MULTILINE)
+
+
+def script_heads():
+    """Get the head revisions of the migration scripts.
+
+    Reads the ``revision``/``down_revision`` lines of each script rather
+    than loading Alembic's script directory.
+
+    Returns:
+        set: Revisions no other script builds on
+    """
+    revisions, parents = set(), set()
+    for path in glob.glob(os.path.join(VERSIONS_DIR, '*.py')):
+        with open(path, encoding='utf-8') as f:
+            source = f.read()
+        revision = _REVISION.search(source)
+        if revision is None:
+            continue
+        revisions.add(revision.group(1))
+        down_revision = _DOWN_REVISION.search(source)
+        if down_revision:
+            # A single id, None, or a tuple of ids for merge revisions
+            parents.update(re.findall(r"['\"](\w+)['\"]", down_revision.group(1)))
+    return revisions - parents
+
+
+def database_revisions():
+    """Get the revisions stamped in the database, or None if it can't tell."""
+    from sqlalchemy import create_engine, text
+
+    # Same URL as Config.SQLALCHEMY_DATABASE_URI
+    url = os.environ.get('DATABASE_URL', 'postgresql://localhost:5432/blogger2')
+    if url.startswith('postgres://'):
+        url = url.replace('postgres://', 'postgresql://', 1)
+    engine = create_engine(url)
+    try:
+        with engine.connect() as conn:
+            return set(conn.execute(text('SELECT version_num FROM alembic_version')).scalars())
+    except Exception:
+        # No alembic_version table yet, or the database is unreachable:
+        # the full upgrade creates it or reports the error properly
+        return None
+    finally:
+        engine.dispose()
+
+
+def main(force=False):
+    if not force:
+        heads = script_heads()
+        if heads and database_revisions() == heads:
+            print(f"Database is up to date ({', '.join(sorted(heads))}), no migrations to run.")
+            return
+
+    from app import create_app, init_migrations
+    from flask_migrate import upgrade
+
+    # Create the application
+    app = create_app()
+    init_migrations(app)
+
+    # Run migrations within app context
+    with app.app_context():
+        upgrade()
 
-# Create the application
-app = create_app()
+    print("Database migrations completed successfully!")
 
-# Run migrations within app context
-with app.app_context():
-    upgrade()
 
-print("Database migrations completed successfully!")
+if __name__ == '__main__':
+    main(force='--force' in sys.argv[1:])
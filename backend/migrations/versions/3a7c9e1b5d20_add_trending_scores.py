@@ -0,0 +1,31 @@
+"""Add trending_scores snapshot table
+
+Revision ID: 3a7c9e1b5d20
+Revises: f04116565dd1
+Create Date: 2026-10-19 09:12:44.318201
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '3a7c9e1b5d20'
+down_revision = 'f04116565dd1'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('trending_scores',
+    sa.Column('window', sa.String(length=10), nullable=False),
+    sa.Column('post_id', sa.Integer(), nullable=False),
+    sa.Column('score', sa.Float(), nullable=False),
+    sa.Column('updated_at', sa.DateTime(), nullable=False),
+    sa.ForeignKeyConstraint(['post_id'], ['posts.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('window', 'post_id')
+    )
+
+
+def downgrade():
+    op.drop_table('trending_scores')
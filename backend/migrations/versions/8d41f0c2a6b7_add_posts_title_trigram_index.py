@@ -0,0 +1,37 @@
+"""Add pg_trgm GIN index on posts.title
+
+Revision ID: 8d41f0c2a6b7
+Revises: 3a7c9e1b5d20
+Create Date: 2026-10-19 11:02:17.904512
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '8d41f0c2a6b7'
+down_revision = '3a7c9e1b5d20'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Trigram indexes are PostgreSQL-only; other databases use the
+    # in-process index in app.services.title_index
+    if op.get_bind().dialect.name != 'postgresql':
+        return
+
+    op.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+    op.create_index(
+        'ix_posts_title_trgm', 'posts', ['title'],
+        postgresql_using='gin',
+        postgresql_ops={'title': 'gin_trgm_ops'}
+    )
+
+
+def downgrade():
+    if op.get_bind().dialect.name != 'postgresql':
+        return
+
+    op.drop_index('ix_posts_title_trgm', table_name='posts')
@@ -0,0 +1,30 @@
+"""Add media processing columns
+
+Revision ID: b51e7d93c4a8
+Revises: 8d41f0c2a6b7
+Create Date: 2026-10-19 14:03:27.551904
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'b51e7d93c4a8'
+down_revision = '8d41f0c2a6b7'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('media', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('variants', sa.JSON(), nullable=True))
+        batch_op.add_column(sa.Column('placeholder', sa.Text(), nullable=True))
+        batch_op.add_column(sa.Column('processed_at', sa.DateTime(), nullable=True))
+
+
+def downgrade():
+    with op.batch_alter_table('media', schema=None) as batch_op:
+        batch_op.drop_column('processed_at')
+        batch_op.drop_column('placeholder')
+        batch_op.drop_column('variants')
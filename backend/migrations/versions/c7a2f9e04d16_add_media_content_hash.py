@@ -0,0 +1,29 @@
+"""Add media content_hash for upload deduplication
+
+Revision ID: c7a2f9e04d16
+Revises: b51e7d93c4a8
+Create Date: 2026-10-19 16:41:08.204417
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'c7a2f9e04d16'
+down_revision = 'b51e7d93c4a8'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('media', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('content_hash', sa.String(length=64), nullable=True))
+        # Per uploader: one user's uploads never reveal or reuse another's files
+        batch_op.create_index('ix_media_uploaded_by_content_hash', ['uploaded_by', 'content_hash'], unique=True)
+
+
+def downgrade():
+    with op.batch_alter_table('media', schema=None) as batch_op:
+        batch_op.drop_index('ix_media_uploaded_by_content_hash')
+        batch_op.drop_column('content_hash')
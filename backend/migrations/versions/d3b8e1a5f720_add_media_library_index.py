@@ -0,0 +1,29 @@
+"""Add composite media index for keyset-paginated library listing
+
+Revision ID: d3b8e1a5f720
+Revises: c7a2f9e04d16
+Create Date: 2026-10-19 18:20:51.730962
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'd3b8e1a5f720'
+down_revision = 'c7a2f9e04d16'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('media', schema=None) as batch_op:
+        batch_op.create_index('ix_media_uploaded_by_created_at_id', ['uploaded_by', 'created_at', 'id'], unique=False)
+        # Covered by the composite index's leading column
+        batch_op.drop_index(batch_op.f('ix_media_uploaded_by'))
+
+
+def downgrade():
+    with op.batch_alter_table('media', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_media_uploaded_by'), ['uploaded_by'], unique=False)
+        batch_op.drop_index('ix_media_uploaded_by_created_at_id')
@@ -0,0 +1,26 @@
+"""Add posts purge_requested_at to resume interrupted purges
+
+Revision ID: e5f2c8a1b9d3
+Revises: d3b8e1a5f720
+Create Date: 2026-10-19 21:12:37.418265
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'e5f2c8a1b9d3'
+down_revision = 'd3b8e1a5f720'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('posts', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('purge_requested_at', sa.DateTime(), nullable=True))
+
+
+def downgrade():
+    with op.batch_alter_table('posts', schema=None) as batch_op:
+        batch_op.drop_column('purge_requested_at')
@@ -0,0 +1,63 @@
+"""Benchmark tag autocomplete lookups on the in-process prefix index.
+
+Usage:
+    python -m tests.benchmarks.bench_autocomplete --tags 100000
+"""
+import argparse
+import random
+import string
+import time
+
+from slugify import slugify
+
+from app.services.autocomplete import PrefixIndex
+
+
+def synthetic_tags(n_tags, seed=42):
+    """Generate (id, name, slug, post count) rows with Zipfian counts."""
+    rng = random.Random(seed)
+    seen = set()
+    for tag_id in range(1, n_tags + 1):
+        name = ''.join(rng.choices(string.ascii_lowercase, k=rng.randint(4, 12)))
+        while name in seen:
+            name += rng.choice(string.ascii_lowercase)
+        seen.add(name)
+        yield tag_id, name.title(), slugify(name), int(10000 / tag_id)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--tags', type=int, default=100000)
+    parser.add_argument('--queries', type=int, default=20000)
+    args = parser.parse_args()
+
+    rows = list(synthetic_tags(args.tags))
+    # No database behind the index, so it must never go stale
+    index = PrefixIndex(None, None, None, rebuild_interval=float('inf'))
+
+    started = time.perf_counter()
+    index.build(rows)
+    print(f"tags:   {args.tags}")
+    print(f"build:  {time.perf_counter() - started:.2f} s")
+
+    rng = random.Random(1)
+    for length in (1, 2, 3, 5):
+        queries = [rng.choice(rows)[1][:length] for _ in range(args.queries)]
+        timings = []
+        for query in queries:
+            started = time.perf_counter()
+            index.suggest(query, 10)
+            timings.append(time.perf_counter() - started)
+        timings.sort()
+        p50 = timings[len(timings) // 2] * 1e6
+        p99 = timings[int(len(timings) * 0.99)] * 1e6
+        print(f"prefix length {length}: p50 {p50:.0f} us, p99 {p99:.0f} us")
+
+    started = time.perf_counter()
+    for tag_id, name, slug, count in rows[:1000]:
+        index.add(tag_id, name + ' x', slug + '-x', count)
+    print(f"update: {(time.perf_counter() - started) / 1000 * 1000:.2f} ms/tag")
+
+
+if __name__ == '__main__':
+    main()
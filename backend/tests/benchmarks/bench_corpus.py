@@ -0,0 +1,82 @@
+"""Benchmark a corpus round trip through NDJSON export and import.
+
+Seeds a file-backed SQLite database, exports it with ``export_posts``,
+imports the file into a second database and reports the time and peak
+RSS of each phase.
+
+Usage:
+    python -m tests.benchmarks.bench_corpus --posts 1000000
+"""
+import argparse
+import os
+import resource
+import tempfile
+import time
+import warnings
+
+os.environ.setdefault('SECRET_KEY', 'benchmark')
+os.environ.setdefault('JWT_SECRET_KEY', 'benchmark')
+
+from app import create_app, db  # noqa: E402
+from app.config import config, TestingConfig  # noqa: E402
+from app.models.post import Post  # noqa: E402
+from app.services.corpus import export_posts, import_posts  # noqa: E402
+from tests.benchmarks.seed import seed_corpus  # noqa: E402
+
+
+def peak_rss_mb():
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def make_app(name, path):
+    class BenchmarkConfig(TestingConfig):
+        SQLALCHEMY_DATABASE_URI = f'sqlite:///{path}'
+
+    config[name] = BenchmarkConfig
+    return create_app(name)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--posts', type=int, default=1000000)
+    parser.add_argument('--batch-size', type=int, default=1000)
+    args = parser.parse_args()
+
+    warnings.filterwarnings('ignore')
+    with tempfile.TemporaryDirectory() as tmp:
+        source = make_app('bench-source', os.path.join(tmp, 'source.db'))
+        target = make_app('bench-target', os.path.join(tmp, 'target.db'))
+        dump = os.path.join(tmp, 'posts.ndjson')
+
+        with source.app_context():
+            db.create_all()
+            started = time.perf_counter()
+            seed_corpus(n_posts=args.posts, n_tags=max(args.posts // 50, 10))
+            print(f"seeded {args.posts} posts in {time.perf_counter() - started:.1f} s, "
+                  f"peak RSS {peak_rss_mb():.0f} MB")
+            db.session.remove()
+
+            started = time.perf_counter()
+            with open(dump, 'w', encoding='utf-8') as output:
+                for line in export_posts(args.batch_size):
+                    output.write(line)
+            elapsed = time.perf_counter() - started
+            size = os.path.getsize(dump) / 1024 / 1024
+            print(f"export: {elapsed:.1f} s ({args.posts / elapsed:.0f} posts/s, {size:.0f} MB), "
+                  f"peak RSS {peak_rss_mb():.0f} MB")
+
+        with target.app_context():
+            db.create_all()
+            seed_corpus(n_posts=0, n_tags=0, n_categories=0)
+            started = time.perf_counter()
+            with open(dump, encoding='utf-8') as lines:
+                result = import_posts(lines, batch_size=args.batch_size)
+            elapsed = time.perf_counter() - started
+            assert result['imported'] == args.posts, result
+            assert Post.query.count() == args.posts
+            print(f"import: {elapsed:.1f} s ({args.posts / elapsed:.0f} posts/s), "
+                  f"peak RSS {peak_rss_mb():.0f} MB")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,59 @@
+"""Benchmark the overhead of facet counts on list_posts.
+
+Usage:
+    python -m tests.benchmarks.bench_facets --posts 50000
+"""
+import argparse
+import os
+import time
+import warnings
+
+os.environ.setdefault('SECRET_KEY', 'benchmark')
+os.environ.setdefault('JWT_SECRET_KEY', 'benchmark')
+
+from app import create_app, db, limiter  # noqa: E402
+from tests.benchmarks.seed import seed_corpus  # noqa: E402
+
+
+def measure(client, url, repeat):
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        response = client.get(url)
+        timings.append(time.perf_counter() - started)
+        assert response.status_code == 200, response.data
+    timings.sort()
+    return timings[len(timings) // 2] * 1000, timings[int(len(timings) * 0.95)] * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--posts', type=int, default=50000)
+    parser.add_argument('--repeat', type=int, default=30)
+    args = parser.parse_args()
+
+    warnings.filterwarnings('ignore')
+    app = create_app('testing')
+    limiter.enabled = False
+    with app.app_context():
+        db.create_all()
+        started = time.perf_counter()
+        seed_corpus(n_posts=args.posts, n_tags=max(args.posts // 50, 10))
+        print(f"seeded {args.posts} posts in {time.perf_counter() - started:.1f} s")
+
+        client = app.test_client()
+        for label, params in (
+            ('all', ''),
+            ('tag', 'tag=python-1'),
+            ('category', 'category=category-3'),
+            ('search', 'search=cache'),
+        ):
+            plain = measure(client, f'/api/posts?{params}', args.repeat)
+            faceted = measure(client, f'/api/posts?{params}&facets=1', args.repeat)
+            print(f"{label:9} plain p50 {plain[0]:7.1f} ms  p95 {plain[1]:7.1f} ms | "
+                  f"facets p50 {faceted[0]:7.1f} ms  p95 {faceted[1]:7.1f} ms | "
+                  f"overhead {faceted[0] - plain[0]:+.1f} ms")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,90 @@
+"""Benchmark keyset-paginated media library listing at depth.
+
+Compares GET /api/media (cursor pagination) with the equivalent
+LIMIT/OFFSET query at increasing depths of the largest library.
+
+Usage:
+    python -m tests.benchmarks.bench_media_listing --media 1000000
+"""
+import argparse
+import os
+import time
+import warnings
+
+os.environ.setdefault('SECRET_KEY', 'benchmark')
+os.environ.setdefault('JWT_SECRET_KEY', 'benchmark')
+
+from flask_jwt_extended import create_access_token  # noqa: E402
+
+from app import create_app, db, limiter  # noqa: E402
+from app.models.media import Media  # noqa: E402
+from app.utils.pagination import encode_cursor  # noqa: E402
+from tests.benchmarks.seed import seed_corpus, seed_media  # noqa: E402
+
+
+def timed(fn, repeat):
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - started)
+    timings.sort()
+    return timings[len(timings) // 2] * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--media', type=int, default=1000000)
+    parser.add_argument('--repeat', type=int, default=20)
+    args = parser.parse_args()
+
+    warnings.filterwarnings('ignore')
+    app = create_app('testing')
+    limiter.enabled = False
+    with app.app_context():
+        db.create_all()
+        started = time.perf_counter()
+        seed_corpus(n_posts=0, n_tags=0, n_categories=0, n_authors=10)
+        seed_media(args.media, n_uploaders=10)
+        db.session.execute(db.text('ANALYZE'))
+        print(f"seeded {args.media} media rows in {time.perf_counter() - started:.1f} s")
+
+        library = Media.query.filter_by(uploaded_by=1).count()
+        print(f"user 1 library: {library} items")
+        token = create_access_token(identity='1')
+        client = app.test_client()
+        headers = {'Authorization': f'Bearer {token}'}
+
+        def offset_page(depth):
+            return lambda: db.session.execute(
+                db.select(Media.id, Media.filename, Media.imagekit_url, Media.created_at)
+                .where(Media.uploaded_by == 1)
+                .order_by(Media.created_at.desc(), Media.id.desc())
+                .offset(depth).limit(50)
+            ).all()
+
+        for depth in (0, 1000, 10000, 100000, library - 50):
+            if depth > library - 50:
+                continue
+            cursor = ''
+            if depth:
+                row = offset_page(depth - 1)()[0]
+                cursor = encode_cursor(row.created_at, row.id)
+
+            def keyset():
+                response = client.get(f'/api/media?limit=50&cursor={cursor}', headers=headers)
+                assert response.status_code == 200, response.data
+                assert len(response.json['media']) == 50
+
+            print(f"depth {depth:7}: keyset p50 {timed(keyset, args.repeat):6.2f} ms | "
+                  f"offset p50 {timed(offset_page(depth), args.repeat):7.2f} ms")
+
+        def filtered():
+            response = client.get('/api/media?limit=50&type=image/&q=cache', headers=headers)
+            assert response.status_code == 200, response.data
+
+        print(f"type+prefix filter page 1: p50 {timed(filtered, args.repeat):6.2f} ms")
+
+
+if __name__ == '__main__':
+    main()
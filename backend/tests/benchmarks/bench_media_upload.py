@@ -0,0 +1,135 @@
+"""Benchmark memory use of streaming media uploads.
+
+Runs the app on a real WSGI server with a local stand-in for ImageKit's
+upload API, streams a large file through POST /api/media and reports how
+much the process' peak RSS grew.
+
+Usage:
+    python -m tests.benchmarks.bench_media_upload --size-mb 512
+"""
+import argparse
+import json
+import os
+import resource
+import threading
+import time
+import warnings
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+os.environ.setdefault('SECRET_KEY', 'benchmark')
+os.environ.setdefault('JWT_SECRET_KEY', 'benchmark')
+
+import requests  # noqa: E402
+from flask_jwt_extended import create_access_token  # noqa: E402
+from werkzeug.serving import make_server  # noqa: E402
+
+from app import create_app, db, limiter  # noqa: E402
+from tests.benchmarks.seed import seed_corpus  # noqa: E402
+
+
+CHUNK = 64 * 1024
+
+
+class ImageKitStandIn(BaseHTTPRequestHandler):
+    """Accepts a chunked multipart upload, discards it and returns a fake file."""
+
+    protocol_version = 'HTTP/1.1'
+    received = 0
+
+    def do_POST(self):
+        total = 0
+        if self.headers.get('Transfer-Encoding') == 'chunked':
+            while True:
+                size = int(self.rfile.readline().split(b';')[0], 16)
+                if size == 0:
+                    self.rfile.readline()
+                    break
+                while size:
+                    total += len(self.rfile.read(min(size, CHUNK)))
+                    size -= min(size, CHUNK)
+                self.rfile.readline()
+        else:
+            remaining = int(self.headers.get('Content-Length', 0))
+            while remaining:
+                data = self.rfile.read(min(remaining, CHUNK))
+                total += len(data)
+                remaining -= len(data)
+        ImageKitStandIn.received = total
+
+        body = json.dumps({
+            'fileId': f'bench-{time.time_ns()}',
+            'url': 'https://ik.imagekit.io/bench/file.bin',
+            'name': 'file.bin',
+            'size': total,
+        }).encode()
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def peak_rss_mb():
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def file_chunks(size):
+    chunk = b'\x89PNG\r\n\x1a\n' + os.urandom(CHUNK - 8)
+    sent = 0
+    while sent < size:
+        piece = chunk[:min(CHUNK, size - sent)]
+        sent += len(piece)
+        yield piece
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--size-mb', type=int, default=512)
+    args = parser.parse_args()
+
+    warnings.filterwarnings('ignore')
+    standin = ThreadingHTTPServer(('127.0.0.1', 0), ImageKitStandIn)
+    threading.Thread(target=standin.serve_forever, daemon=True).start()
+
+    app = create_app('testing')
+    app.config.update(
+        IMAGEKIT_PRIVATE_KEY='bench',
+        IMAGEKIT_UPLOAD_URL=f'http://127.0.0.1:{standin.server_port}/upload',
+        MEDIA_MAX_UPLOAD_SIZE=None,
+    )
+    limiter.enabled = False
+    with app.app_context():
+        db.create_all()
+        seed_corpus(n_posts=0, n_tags=0, n_categories=0, n_authors=1)
+        token = create_access_token(identity='1')
+
+    server = make_server('127.0.0.1', 0, app, threaded=True)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+
+    size = args.size_mb * 1024 * 1024
+    baseline = peak_rss_mb()
+    started = time.perf_counter()
+    response = requests.post(
+        f'http://127.0.0.1:{server.server_port}/api/media?filename=bench.png',
+        data=file_chunks(size),
+        headers={'Authorization': f'Bearer {token}', 'Content-Type': 'image/png'},
+    )
+    elapsed = time.perf_counter() - started
+    assert response.status_code == 201, response.text
+    assert ImageKitStandIn.received > size, ImageKitStandIn.received
+
+    media = response.json()['media']
+    print(f"uploaded {media['file_size'] / 1024 / 1024:.0f} MB as {media['file_type']} "
+          f"in {elapsed:.1f} s ({media['file_size'] / 1024 / 1024 / elapsed:.0f} MB/s)")
+    print(f"peak RSS {baseline:.0f} MB -> {peak_rss_mb():.0f} MB "
+          f"(+{peak_rss_mb() - baseline:.0f} MB)")
+
+    server.shutdown()
+    standin.shutdown()
+
+
+if __name__ == '__main__':
+    main()
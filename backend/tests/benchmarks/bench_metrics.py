@@ -0,0 +1,68 @@
+"""Benchmark the per-request overhead of metrics collection.
+
+Serves the same requests from an app with METRICS_ENABLED off and one
+with it on, alternating rounds so both see the same conditions.
+
+Usage:
+    python -m tests.benchmarks.bench_metrics --requests 500
+"""
+import argparse
+import os
+import time
+import warnings
+
+os.environ.setdefault('SECRET_KEY', 'benchmark')
+os.environ.setdefault('JWT_SECRET_KEY', 'benchmark')
+
+from app import create_app, db, limiter  # noqa: E402
+from app.config import config, TestingConfig  # noqa: E402
+from tests.benchmarks.seed import seed_corpus  # noqa: E402
+
+
+def make_app(enabled):
+    class BenchmarkConfig(TestingConfig):
+        METRICS_ENABLED = enabled
+
+    name = f'benchmark-metrics-{enabled}'
+    config[name] = BenchmarkConfig
+    app = create_app(name)
+    with app.app_context():
+        db.create_all()
+        seed_corpus(n_posts=2000)
+    return app
+
+
+def run(client, path, n):
+    started = time.perf_counter()
+    for _ in range(n):
+        response = client.get(path)
+        assert response.status_code == 200, response.data
+    return (time.perf_counter() - started) / n * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--requests', type=int, default=500)
+    parser.add_argument('--rounds', type=int, default=20)
+    args = parser.parse_args()
+
+    warnings.filterwarnings('ignore')
+    clients = {enabled: make_app(enabled).test_client() for enabled in (False, True)}
+    limiter.enabled = False
+
+    for path, n in (('/api/health', args.requests), ('/api/posts?per_page=10', args.requests // 10)):
+        best = {}
+        for _ in range(args.rounds):
+            for enabled, client in clients.items():
+                elapsed = run(client, path, n)
+                best[enabled] = min(best.get(enabled, elapsed), elapsed)
+        print(f"{path:24} off {best[False]:8.1f} us | on {best[True]:8.1f} us | "
+              f"overhead {best[True] - best[False]:6.1f} us/request")
+
+    started = time.perf_counter()
+    body = clients[True].get('/api/metrics').data
+    print(f"scrape: {len(body)} bytes in {(time.perf_counter() - started) * 1000:.1f} ms")
+
+
+if __name__ == '__main__':
+    main()
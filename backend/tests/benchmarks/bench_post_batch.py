@@ -0,0 +1,104 @@
+"""Benchmark batch post writes against the single-item endpoints.
+
+Usage:
+    python -m tests.benchmarks.bench_post_batch --items 500
+"""
+import argparse
+import os
+import time
+import warnings
+
+os.environ.setdefault('SECRET_KEY', 'benchmark')
+os.environ.setdefault('JWT_SECRET_KEY', 'benchmark')
+
+from flask_jwt_extended import create_access_token  # noqa: E402
+
+from app import create_app, db, limiter  # noqa: E402
+from tests.benchmarks.seed import seed_corpus, WORDS  # noqa: E402
+
+
+def post_data(i, status='draft'):
+    return {
+        'title': f'{WORDS[i % len(WORDS)]} campaign {i % 50}',
+        'content': '<p>' + ' '.join(WORDS) + '</p>',
+        'category_ids': [1 + i % 5],
+        'tag_ids': [1 + i % 40, 1 + (i * 7) % 40],
+        'status': status,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--items', type=int, default=500)
+    parser.add_argument('--posts', type=int, default=20000, help='existing posts')
+    args = parser.parse_args()
+
+    warnings.filterwarnings('ignore')
+    app = create_app('testing')
+    limiter.enabled = False
+    with app.app_context():
+        db.create_all()
+        seed_corpus(n_posts=args.posts, n_tags=200, n_categories=10)
+        token = create_access_token(identity='1')
+    client = app.test_client()
+    headers = {'Authorization': f'Bearer {token}'}
+    n = args.items
+
+    def report(label, single, batch):
+        print(f"{label:8} single {n / single:8.0f} items/s ({single:6.2f} s) | "
+              f"batch {n / batch:8.0f} items/s ({batch:6.2f} s) | {single / batch:5.1f}x")
+
+    # Create
+    started = time.perf_counter()
+    single_ids = []
+    for i in range(n):
+        response = client.post('/api/posts', json=post_data(i), headers=headers)
+        assert response.status_code == 201, response.data
+        single_ids.append(response.json['post']['id'])
+    single = time.perf_counter() - started
+
+    started = time.perf_counter()
+    response = client.post('/api/posts/batch', headers=headers, json={
+        'operations': [{'op': 'create', 'data': post_data(i)} for i in range(n)]
+    })
+    batch = time.perf_counter() - started
+    assert response.status_code == 200 and response.json['committed'], response.data
+    batch_ids = [result['post']['id'] for result in response.json['results']]
+    report('create', single, batch)
+
+    # Update (retitle, so slugs are reallocated)
+    def update_data(i):
+        return {'title': f'Updated {WORDS[i % len(WORDS)]} {i % 30}', 'excerpt': f'Revision {i}'}
+
+    started = time.perf_counter()
+    for i, post_id in enumerate(single_ids):
+        response = client.put(f'/api/posts/{post_id}', json=update_data(i), headers=headers)
+        assert response.status_code == 200, response.data
+    single = time.perf_counter() - started
+
+    started = time.perf_counter()
+    response = client.post('/api/posts/batch', headers=headers, json={
+        'operations': [{'op': 'update', 'id': post_id, 'data': update_data(i)} for i, post_id in enumerate(batch_ids)]
+    })
+    batch = time.perf_counter() - started
+    assert response.json['committed'], response.data
+    report('update', single, batch)
+
+    # Publish
+    started = time.perf_counter()
+    for post_id in single_ids:
+        response = client.post(f'/api/posts/{post_id}/publish', headers=headers)
+        assert response.status_code == 200, response.data
+    single = time.perf_counter() - started
+
+    started = time.perf_counter()
+    response = client.post('/api/posts/batch', headers=headers, json={
+        'operations': [{'op': 'publish', 'id': post_id} for post_id in batch_ids]
+    })
+    batch = time.perf_counter() - started
+    assert response.json['committed'], response.data
+    report('publish', single, batch)
+
+
+if __name__ == '__main__':
+    main()
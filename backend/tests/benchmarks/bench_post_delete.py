@@ -0,0 +1,95 @@
+"""Benchmark deleting a post with a very large page view history.
+
+Compares three ways of deleting a post with ``--views`` page views:
+
+- the old ORM cascade, which loads and deletes views one by one. This is
+  measured on ``--legacy-views`` rows and extrapolated, because it takes
+  minutes at full size.
+- a passive delete, which is a single DELETE with ON DELETE CASCADE.
+- DELETE /api/posts/<id>, which answers 202 and purges in background
+  batches.
+
+Usage:
+    python -m tests.benchmarks.bench_post_delete --views 1000000
+"""
+import argparse
+import os
+import tempfile
+import time
+import warnings
+
+os.environ.setdefault('SECRET_KEY', 'benchmark')
+os.environ.setdefault('JWT_SECRET_KEY', 'benchmark')
+
+from flask_jwt_extended import create_access_token  # noqa: E402
+
+from app import create_app, db, limiter  # noqa: E402
+from app.config import config, TestingConfig  # noqa: E402
+from app.models.analytics import PageView  # noqa: E402
+from app.models.post import Post  # noqa: E402
+from app.services.background import background  # noqa: E402
+from tests.benchmarks.seed import seed_corpus, seed_page_views  # noqa: E402
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--views', type=int, default=1000000)
+    parser.add_argument('--legacy-views', type=int, default=20000)
+    args = parser.parse_args()
+
+    warnings.filterwarnings('ignore')
+    with tempfile.TemporaryDirectory() as tmp:
+        class BenchmarkConfig(TestingConfig):
+            SQLALCHEMY_DATABASE_URI = f"sqlite:///{os.path.join(tmp, 'bench.db')}"
+            BACKGROUND_WORKERS = 2
+
+        config['benchmark'] = BenchmarkConfig
+        app = create_app('benchmark')
+        limiter.enabled = False
+
+        with app.app_context():
+            db.create_all()
+            seed_corpus(n_posts=3, n_tags=10, n_categories=3, n_authors=10)
+            started = time.perf_counter()
+            seed_page_views(1, args.views)
+            seed_page_views(2, args.views)
+            seed_page_views(3, args.legacy_views)
+            print(f"seeded {2 * args.views + args.legacy_views} page views "
+                  f"in {time.perf_counter() - started:.1f} s")
+            token = create_access_token(identity='1')
+
+            # Old behaviour: ORM loads every view and deletes it by primary key
+            started = time.perf_counter()
+            post = db.session.get(Post, 3)
+            for view in post.views.all():
+                db.session.delete(view)
+            db.session.delete(post)
+            db.session.commit()
+            legacy = time.perf_counter() - started
+            print(f"ORM cascade, {args.legacy_views} views: {legacy:.2f} s "
+                  f"(~{legacy / args.legacy_views * args.views:.0f} s at {args.views})")
+
+            # Passive delete in one statement
+            started = time.perf_counter()
+            db.session.delete(db.session.get(Post, 2))
+            db.session.commit()
+            print(f"passive delete, {args.views} views: {time.perf_counter() - started:.2f} s")
+            db.session.remove()
+
+        client = app.test_client()
+        started = time.perf_counter()
+        response = client.delete('/api/posts/1', headers={'Authorization': f'Bearer {token}'})
+        responded = time.perf_counter() - started
+        assert response.status_code == 202, response.data
+        background.shutdown(wait=True)
+        purged = time.perf_counter() - started
+
+        with app.app_context():
+            assert PageView.query.count() == 0
+            assert db.session.get(Post, 1) is None
+        print(f"DELETE /api/posts/1, {args.views} views: responded {responded * 1000:.0f} ms, "
+              f"purged in {purged:.2f} s")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,82 @@
+"""Count the statements and association rows written when editing a post's tags.
+
+Usage:
+    python -m tests.benchmarks.bench_post_tags --tags 200 --edits 200
+"""
+import argparse
+import os
+import time
+import warnings
+
+os.environ.setdefault('SECRET_KEY', 'benchmark')
+os.environ.setdefault('JWT_SECRET_KEY', 'benchmark')
+
+from flask_jwt_extended import create_access_token  # noqa: E402
+from sqlalchemy import event  # noqa: E402
+
+from app import create_app, db, limiter  # noqa: E402
+from tests.benchmarks.seed import seed_corpus  # noqa: E402
+
+
+class WriteCounter:
+    """Count INSERT/DELETE statements and rows against the association tables."""
+
+    TABLES = ('post_tags', 'post_categories')
+
+    def __init__(self):
+        self.statements = 0
+        self.rows = 0
+
+    def __call__(self, conn, cursor, statement, parameters, context, executemany):
+        verb = statement.lstrip().split(None, 1)[0].upper()
+        if verb in ('INSERT', 'DELETE') and any(table in statement for table in self.TABLES):
+            self.statements += 1
+            self.rows += cursor.rowcount if cursor.rowcount > 0 else 0
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--tags', type=int, default=200, help='tags on the edited post')
+    parser.add_argument('--edits', type=int, default=200)
+    args = parser.parse_args()
+
+    warnings.filterwarnings('ignore')
+    app = create_app('testing')
+    limiter.enabled = False
+    with app.app_context():
+        db.create_all()
+        seed_corpus(n_posts=1000, n_tags=args.tags + 10, n_categories=10)
+        token = create_access_token(identity='1')
+        counter = WriteCounter()
+        event.listen(db.engine, 'after_cursor_execute', counter)
+    client = app.test_client()
+    headers = {'Authorization': f'Bearer {token}'}
+
+    tag_ids = list(range(1, args.tags + 1))
+    response = client.post('/api/posts', headers=headers, json={
+        'title': 'Many tags', 'content': '<p>Body</p>', 'tag_ids': tag_ids
+    })
+    assert response.status_code == 201, response.data
+    post_id = response.json['post']['id']
+
+    # Each edit swaps one tag: the rest of the set is unchanged
+    counter.statements = counter.rows = 0
+    started = time.perf_counter()
+    for i in range(args.edits):
+        swapped = tag_ids[:-1] + [args.tags + 1 + i % 10]
+        response = client.put(f'/api/posts/{post_id}', headers=headers, json={'tag_ids': swapped})
+        assert response.status_code == 200, response.data
+    elapsed = time.perf_counter() - started
+    print(f"{args.edits} one-tag edits of a {args.tags}-tag post: {elapsed / args.edits * 1000:.2f} ms/edit, "
+          f"{counter.statements / args.edits:.1f} write statements and "
+          f"{counter.rows / args.edits:.1f} association rows per edit")
+
+    counter.statements = counter.rows = 0
+    names = [f'fresh tag {i}' for i in range(50)]
+    response = client.put(f'/api/posts/{post_id}', headers=headers, json={'tag_names': names})
+    assert response.status_code == 200, response.data
+    print(f"50 new tag names: {counter.statements} write statements, {counter.rows} association rows")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,163 @@
+"""Benchmark rate-limit storages: per-check overhead and cross-worker accuracy.
+
+Times a sliding-window-counter hit (what Flask-Limiter does per request)
+against memory://, the SQLite WAL storage and the Redis-protocol storage
+(served by a local stand-in), then has several processes hit one limit
+at once to show which storages enforce it across workers.
+
+Usage:
+    python -m tests.benchmarks.bench_ratelimit --checks 20000 --workers 4
+"""
+import argparse
+import multiprocessing
+import os
+import socketserver
+import tempfile
+import threading
+import time
+import warnings
+
+from limits import parse
+from limits.storage import storage_from_string
+from limits.strategies import SlidingWindowCounterRateLimiter
+
+from app.services import ratelimit  # noqa: F401 (registers sqlite:// and resp://)
+
+
+class RespStandIn(socketserver.ThreadingTCPServer):
+    """In-memory server for the subset of the Redis protocol RespStorage uses."""
+
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(self):
+        super().__init__(('127.0.0.1', 0), RespHandler)
+        self.data = {}  # key -> (value, expires at or None)
+        self.lock = threading.Lock()
+
+    def live(self, key):
+        value = self.data.get(key)
+        if value and value[1] is not None and value[1] <= time.time():
+            del self.data[key]
+            return None
+        return value
+
+
+class RespHandler(socketserver.StreamRequestHandler):
+
+    disable_nagle_algorithm = True
+
+    def read_command(self):
+        line = self.rfile.readline()
+        if not line:
+            return None
+        args = []
+        for _ in range(int(line[1:])):
+            size = int(self.rfile.readline()[1:])
+            args.append(self.rfile.read(size + 2)[:-2].decode())
+        return args
+
+    def handle(self):
+        server = self.server
+        while (command := self.read_command()) is not None:
+            name, args = command[0].upper(), command[1:]
+            with server.lock:
+                if name in ('PING',):
+                    reply = b'+PONG\r\n'
+                elif name in ('AUTH', 'SELECT'):
+                    reply = b'+OK\r\n'
+                elif name == 'SET':
+                    key, value = args[0], args[1]
+                    ttl = int(args[args.index('PX') + 1]) / 1000 if 'PX' in args else None
+                    if 'NX' in args and server.live(key):
+                        reply = b'$-1\r\n'
+                    else:
+                        server.data[key] = (value, time.time() + ttl if ttl else None)
+                        reply = b'+OK\r\n'
+                elif name in ('INCRBY', 'DECRBY'):
+                    current = server.live(args[0]) or ('0', None)
+                    delta = int(args[1]) if name == 'INCRBY' else -int(args[1])
+                    value = int(current[0]) + delta
+                    server.data[args[0]] = (str(value), current[1])
+                    reply = b':%d\r\n' % value
+                elif name == 'GET':
+                    current = server.live(args[0])
+                    reply = b'$-1\r\n' if current is None else b'$%d\r\n%s\r\n' % (len(current[0]), current[0].encode())
+                elif name == 'PTTL':
+                    current = server.live(args[0])
+                    if current is None:
+                        reply = b':-2\r\n'
+                    else:
+                        reply = b':%d\r\n' % (int((current[1] - time.time()) * 1000) if current[1] else -1)
+                elif name == 'DEL':
+                    reply = b':%d\r\n' % sum(server.data.pop(key, None) is not None for key in args)
+                elif name == 'SCAN':
+                    prefix = args[args.index('MATCH') + 1].rstrip('*')
+                    keys = [key.encode() for key in server.data if key.startswith(prefix)]
+                    reply = b'*2\r\n$1\r\n0\r\n*%d\r\n' % len(keys) + b''.join(
+                        b'$%d\r\n%s\r\n' % (len(key), key) for key in keys
+                    )
+                else:
+                    reply = b'-ERR unknown command\r\n'
+            self.wfile.write(reply)
+            self.wfile.flush()
+
+
+def time_checks(uri, checks):
+    limiter = SlidingWindowCounterRateLimiter(storage_from_string(uri))
+    item = parse('1000000 per hour')
+    started = time.perf_counter()
+    for i in range(checks):
+        limiter.hit(item, f'client-{i % 100}')
+    return (time.perf_counter() - started) / checks * 1e6
+
+
+def hammer(uri, limit, attempts, barrier, results):
+    limiter = SlidingWindowCounterRateLimiter(storage_from_string(uri))
+    item = parse(f'{limit} per hour')
+    barrier.wait()
+    results.put(sum(limiter.hit(item, 'login', 'shared-client') for _ in range(attempts)))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--checks', type=int, default=20000)
+    parser.add_argument('--workers', type=int, default=4)
+    parser.add_argument('--limit', type=int, default=200)
+    args = parser.parse_args()
+
+    warnings.filterwarnings('ignore')
+    stand_in = RespStandIn()
+    threading.Thread(target=stand_in.serve_forever, daemon=True).start()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        uris = {
+            'memory': 'memory://',
+            'sqlite (WAL)': f"sqlite:///{os.path.join(tmp, 'ratelimit.db')}",
+            'resp stand-in': f'resp://127.0.0.1:{stand_in.server_address[1]}',
+        }
+        for label, uri in uris.items():
+            print(f"{label:14} {time_checks(uri, args.checks):7.1f} us per check")
+
+        # fork shares memory:// state at fork time only; each worker then counts alone
+        context = multiprocessing.get_context('fork')
+        for label, uri in uris.items():
+            storage_from_string(uri).reset()
+            barrier = context.Barrier(args.workers)
+            results = context.Queue()
+            processes = [
+                context.Process(target=hammer, args=(uri, args.limit, args.limit, barrier, results))
+                for _ in range(args.workers)
+            ]
+            for process in processes:
+                process.start()
+            allowed = sum(results.get() for _ in processes)
+            for process in processes:
+                process.join()
+            print(f"{label:14} {args.workers} workers allowed {allowed} hits against a limit of {args.limit}")
+
+    stand_in.shutdown()
+
+
+if __name__ == '__main__':
+    main()
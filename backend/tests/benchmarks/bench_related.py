@@ -0,0 +1,72 @@
+"""Benchmark the related posts engine build and lookups.
+
+Usage:
+    python -m tests.benchmarks.bench_related --posts 100000
+"""
+import argparse
+import itertools
+import random
+import resource
+import time
+
+from app.services.related import RelatedPostsEngine
+
+
+def synthetic_documents(n_posts, n_tags=5000, n_categories=50, vocabulary=30000, seed=42):
+    """Generate posts with Zipf-distributed words, tags and categories."""
+    rng = random.Random(seed)
+    words = [f'word{i}' for i in range(vocabulary)]
+    word_weights = list(itertools.accumulate(1.0 / (rank + 1) for rank in range(vocabulary)))
+    tag_weights = list(itertools.accumulate(1.0 / (rank + 1) for rank in range(n_tags)))
+
+    for post_id in range(1, n_posts + 1):
+        yield {
+            'id': post_id,
+            'slug': f'post-{post_id}',
+            'title': ' '.join(rng.choices(words, cum_weights=word_weights, k=6)),
+            'excerpt': ' '.join(rng.choices(words, cum_weights=word_weights, k=25)),
+            'content': ' '.join(rng.choices(words, cum_weights=word_weights, k=150)),
+            'tag_ids': rng.choices(range(1, n_tags + 1), cum_weights=tag_weights, k=rng.randint(1, 6)),
+            'category_ids': [rng.randint(1, n_categories)],
+        }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--posts', type=int, default=100000)
+    parser.add_argument('--lookups', type=int, default=1000)
+    args = parser.parse_args()
+
+    documents = list(synthetic_documents(args.posts))
+    engine = RelatedPostsEngine()
+
+    started = time.perf_counter()
+    engine.build(documents)
+    build_seconds = time.perf_counter() - started
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+    rng = random.Random(1)
+    sample = rng.sample(range(1, args.posts + 1), min(args.lookups, args.posts))
+    started = time.perf_counter()
+    engine.precompute(sample)
+    cold = (time.perf_counter() - started) / len(sample)
+
+    started = time.perf_counter()
+    for post_id in sample:
+        engine.neighbours(post_id)
+    warm = (time.perf_counter() - started) / len(sample)
+
+    started = time.perf_counter()
+    for doc in documents[:100]:
+        engine.update(doc)
+    update = (time.perf_counter() - started) / 100
+
+    print(f"posts:            {args.posts}")
+    print(f"build:            {build_seconds:.2f} s (peak RSS {peak / 2**20:.0f} MiB)")
+    print(f"precompute:       {cold * 1000:.2f} ms/post (~{cold * args.posts:.0f} s for all, in the background)")
+    print(f"lookup:           {warm * 1e6:.1f} us/post")
+    print(f"incremental:      {update * 1000:.2f} ms/post")
+
+
+if __name__ == '__main__':
+    main()
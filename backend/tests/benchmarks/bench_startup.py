@@ -0,0 +1,126 @@
+"""Benchmark cold start: import time per module, first served request and migrate.py.
+
+Each measurement runs in a fresh interpreter against a throwaway SQLite
+database:
+
+- import time of ``create_app()`` from ``python -X importtime``, summed
+  per top-level package (and per ``app.*`` module);
+- time from spawning a server process to its first answered
+  ``/api/health`` request;
+- ``migrate.py`` on an up-to-date database, with the alembic_version
+  fast path and with ``--force`` (the full app + Alembic upgrade).
+
+Usage:
+    python -m tests.benchmarks.bench_startup --runs 5
+"""
+import argparse
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import urllib.request
+from collections import defaultdict
+
+BACKEND = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+SERVE = """
+import sys
+from werkzeug.serving import make_server
+from run import app
+make_server('127.0.0.1', int(sys.argv[1]), app).serve_forever()
+"""
+
+
+def environment(database_url):
+    env = dict(os.environ, DATABASE_URL=database_url, FLASK_ENV='production')
+    env.setdefault('SECRET_KEY', 'benchmark')
+    env.setdefault('JWT_SECRET_KEY', 'benchmark')
+    return env
+
+
+def import_times(env):
+    """Cumulative import time in ms per top-level package and per app module."""
+    result = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', 'from app import create_app; create_app()'],
+        cwd=BACKEND, env=env, capture_output=True, text=True, check=True,
+    )
+    totals = defaultdict(int)
+    for line in result.stderr.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        self_us, _, name = line[len('import time:'):].split('|')
+        module = name.strip()
+        # Self times, so nested imports are not counted twice
+        package = module if module.startswith('app.') else module.split('.')[0]
+        totals[package] += int(self_us)
+    return {package: us / 1000 for package, us in totals.items()}
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def first_request(env, timeout=30):
+    """Seconds from spawning a server process to its first 200 on /api/health."""
+    port = free_port()
+    url = f'http://127.0.0.1:{port}/api/health'
+    started = time.perf_counter()
+    server = subprocess.Popen([sys.executable, '-c', SERVE, str(port)], cwd=BACKEND, env=env,
+                              stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    try:
+        while time.perf_counter() - started < timeout:
+            try:
+                with urllib.request.urlopen(url, timeout=1) as response:
+                    if response.status == 200:
+                        return time.perf_counter() - started
+            except OSError:
+                if server.poll() is not None:
+                    raise RuntimeError('server exited before serving a request')
+                time.sleep(0.005)
+        raise RuntimeError('server did not answer in time')
+    finally:
+        server.terminate()
+        server.wait()
+
+
+def run_migrate(env, *args):
+    started = time.perf_counter()
+    subprocess.run([sys.executable, 'migrate.py', *args], cwd=BACKEND, env=env,
+                   stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, check=True)
+    return time.perf_counter() - started
+
+
+def report(label, samples):
+    samples = [sample * 1000 for sample in samples]
+    print(f"{label:<28} median {statistics.median(samples):7.1f} ms, min {min(samples):7.1f} ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--runs', type=int, default=5)
+    parser.add_argument('--top', type=int, default=15, help='Packages listed in the import profile')
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        env = environment(f"sqlite:///{os.path.join(tmp, 'startup.db')}")
+        run_migrate(env, '--force')
+
+        runs = [import_times(env) for _ in range(args.runs)]
+        medians = {package: statistics.median(run.get(package, 0) for run in runs) for package in runs[0]}
+        print(f"import time of create_app(): {sum(medians.values()):.1f} ms (median of {args.runs})")
+        for package, ms in sorted(medians.items(), key=lambda item: -item[1])[:args.top]:
+            print(f"  {package:<36} {ms:7.1f} ms")
+        print()
+
+        report('first request', [first_request(env) for _ in range(args.runs)])
+        report('migrate.py (up to date)', [run_migrate(env) for _ in range(args.runs)])
+        report('migrate.py --force', [run_migrate(env, '--force') for _ in range(args.runs)])
+
+
+if __name__ == '__main__':
+    main()
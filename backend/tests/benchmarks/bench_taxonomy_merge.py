@@ -0,0 +1,98 @@
+"""Benchmark merging a heavily used tag into another.
+
+Compares POST /api/tags/<id>/merge against re-tagging posts one by one
+through PUT /api/posts/<id> (measured on ``--legacy-posts`` posts and
+extrapolated).
+
+Usage:
+    python -m tests.benchmarks.bench_taxonomy_merge --linked 100000
+"""
+import argparse
+import os
+import tempfile
+import time
+import warnings
+
+os.environ.setdefault('SECRET_KEY', 'benchmark')
+os.environ.setdefault('JWT_SECRET_KEY', 'benchmark')
+
+from flask_jwt_extended import create_access_token  # noqa: E402
+
+from app import create_app, db, limiter  # noqa: E402
+from app.config import config, TestingConfig  # noqa: E402
+from app.models.tag import post_tags  # noqa: E402
+from app.services.background import background  # noqa: E402
+from app.services.synthetic import sql_timestamp  # noqa: E402
+from tests.benchmarks.seed import seed_corpus, bulk_load  # noqa: E402
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--linked', type=int, default=100000, help='posts tagged with the source tag')
+    parser.add_argument('--legacy-posts', type=int, default=300)
+    args = parser.parse_args()
+
+    warnings.filterwarnings('ignore')
+    with tempfile.TemporaryDirectory() as tmp:
+        class BenchmarkConfig(TestingConfig):
+            SQLALCHEMY_DATABASE_URI = f"sqlite:///{os.path.join(tmp, 'bench.db')}"
+            # Large merges rebuild the related posts index off the request, as in production
+            BACKGROUND_WORKERS = 1
+
+        config['benchmark'] = BenchmarkConfig
+        app = create_app('benchmark')
+        limiter.enabled = False
+
+        n_posts = args.linked + args.legacy_posts
+        source, target, legacy_source = 1001, 1002, 1003
+        with app.app_context():
+            db.create_all()
+            seed_corpus(n_posts=n_posts, n_tags=1000, n_categories=10)
+            bulk_load('tags', ('id', 'name', 'slug', 'created_at'), (
+                (tag_id, f'merge {tag_id}', f'merge-{tag_id}', sql_timestamp(time.time()))
+                for tag_id in (source, target, legacy_source)
+            ))
+            # Source tag on the first --linked posts, a third of which already
+            # carry the target; the legacy source tag on the remaining posts
+            bulk_load('post_tags', ('post_id', 'tag_id'), (
+                (i, tag_id)
+                for i in range(1, args.linked + 1)
+                for tag_id in ((source, target) if i % 3 == 0 else (source,))
+            ))
+            bulk_load('post_tags', ('post_id', 'tag_id'), (
+                (i, legacy_source) for i in range(args.linked + 1, n_posts + 1)
+            ))
+            token = create_access_token(identity='1')
+            legacy_links = {
+                post_id: set() for post_id in range(args.linked + 1, n_posts + 1)
+            }
+            for post_id, tag_id in db.session.execute(
+                db.select(post_tags.c.post_id, post_tags.c.tag_id).where(post_tags.c.post_id > args.linked)
+            ):
+                legacy_links[post_id].add(tag_id)
+
+        client = app.test_client()
+        headers = {'Authorization': f'Bearer {token}'}
+
+        started = time.perf_counter()
+        for post_id, tag_ids in legacy_links.items():
+            response = client.put(f'/api/posts/{post_id}', headers=headers,
+                                  json={'tag_ids': sorted(tag_ids - {legacy_source} | {target})})
+            assert response.status_code == 200, response.data
+        legacy = time.perf_counter() - started
+        print(f"re-tag one by one, {args.legacy_posts} posts: {legacy:.2f} s "
+              f"(~{legacy / args.legacy_posts * args.linked:.0f} s at {args.linked})")
+
+        started = time.perf_counter()
+        response = client.post(f'/api/tags/{target}/merge', headers=headers, json={'source_ids': [source]})
+        elapsed = time.perf_counter() - started
+        assert response.status_code == 200, response.data
+        print(f"merge endpoint, {args.linked} posts: {elapsed:.2f} s, "
+              f"{response.json['posts_relinked']} posts relinked, "
+              f"target now on {response.json['tag']['post_count']} posts")
+        # Let the related posts rebuild finish before the database goes away
+        background.shutdown(wait=True)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,79 @@
+"""Benchmark typo-tolerant title suggestions on the in-process trigram index.
+
+Usage:
+    python -m tests.benchmarks.bench_title_suggest --posts 300000
+"""
+import argparse
+import itertools
+import random
+import resource
+import time
+
+from app.services.title_index import TrigramIndex
+
+
+def synthetic_titles(n_posts, vocabulary=20000, seed=42):
+    """Generate (id, title, slug) rows from a Zipfian word distribution."""
+    rng = random.Random(seed)
+    consonants, vowels = 'bcdfghjklmnprstvwyz', 'aeiou'
+    words = list({
+        ''.join(rng.choice(consonants) + rng.choice(vowels) for _ in range(rng.randint(2, 4)))
+        + rng.choice(('', 'n', 's', 'ng', 'r', 't'))
+        for _ in range(vocabulary)
+    })
+    cum_weights = list(itertools.accumulate(1.0 / (rank + 1) for rank in range(len(words))))
+    for post_id in range(1, n_posts + 1):
+        title = ' '.join(rng.choices(words, cum_weights=cum_weights, k=rng.randint(3, 9))).capitalize()
+        yield post_id, title, f'post-{post_id}'
+
+
+def typo(text, rng):
+    """Drop, swap or replace one character."""
+    if len(text) < 4:
+        return text
+    i = rng.randrange(1, len(text) - 1)
+    kind = rng.choice(('drop', 'swap', 'replace'))
+    if kind == 'drop':
+        return text[:i] + text[i + 1:]
+    if kind == 'swap':
+        return text[:i - 1] + text[i] + text[i - 1] + text[i + 1:]
+    return text[:i] + rng.choice('abcdefghijklmnopqrstuvwxyz') + text[i + 1:]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--posts', type=int, default=300000)
+    parser.add_argument('--queries', type=int, default=2000)
+    args = parser.parse_args()
+
+    rows = list(synthetic_titles(args.posts))
+    index = TrigramIndex(rebuild_interval=float('inf'))
+
+    started = time.perf_counter()
+    index.build(rows)
+    print(f"titles: {args.posts}")
+    print(f"build:  {time.perf_counter() - started:.2f} s "
+          f"(peak RSS {resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024:.0f} MiB)")
+
+    rng = random.Random(1)
+    for label, make_query in (
+        ('prefix', lambda title: title[:rng.randint(4, 12)]),
+        ('typo', lambda title: typo(' '.join(title.split()[:3]), rng)),
+    ):
+        timings = []
+        hits = 0
+        for _ in range(args.queries):
+            post_id, title, _ = rng.choice(rows)
+            query = make_query(title)
+            started = time.perf_counter()
+            results = index.suggest(query, 10)
+            timings.append(time.perf_counter() - started)
+            hits += any(result[0] == post_id for result in results)
+        timings.sort()
+        p50 = timings[len(timings) // 2] * 1000
+        p99 = timings[int(len(timings) * 0.99)] * 1000
+        print(f"{label:6}: p50 {p50:.2f} ms, p99 {p99:.2f} ms, target in top 10: {hits / args.queries:.0%}")
+
+
+if __name__ == '__main__':
+    main()
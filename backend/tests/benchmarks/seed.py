@@ -0,0 +1,103 @@
+"""Datasets for tests and benchmarks.
+
+Generated by ``SyntheticDataset`` and written with ``BulkLoader``, the
+same path ``flask seed`` uses, so seeding large datasets stays quick.
+"""
+import itertools
+import random
+import time
+
+from app import db
+from app.models.post import Post
+from app.services.synthetic import WORDS, BulkLoader, SyntheticDataset, seed_database, sql_timestamp
+
+
+def bulk_load(table, columns, rows):
+    """Load row tuples into ``table`` and commit.
+
+    Args:
+        table: Table name
+        columns: Column names, in row order
+        rows: Iterable of tuples
+
+    Returns:
+        int: Number of rows loaded
+    """
+    connection = db.engine.raw_connection()
+    try:
+        return BulkLoader(connection, db.engine.dialect.name).load(table, columns, rows)
+    finally:
+        connection.close()
+
+
+def seed_corpus(n_posts=1000, n_tags=200, n_categories=20, n_authors=10,
+                published_ratio=0.9, views=0, seed=42):
+    """Seed an empty database with users, categories, tags and posts.
+
+    See ``SyntheticDataset`` for how the data is skewed. User 1 is an
+    admin; every account's password is ``password123``.
+
+    Args:
+        n_posts: Number of posts
+        n_tags: Number of tags
+        n_categories: Number of categories (at least one)
+        n_authors: Number of author accounts (at least one)
+        published_ratio: Share of posts that are published
+        views: Page views spread over the published posts
+        seed: Random seed, so runs are reproducible
+
+    Returns:
+        dict: Row counts per table
+    """
+    dataset = SyntheticDataset(posts=n_posts, tags=n_tags, categories=n_categories, authors=n_authors,
+                               views=views, published_ratio=published_ratio, seed=seed)
+    return seed_database(dataset)
+
+
+MEDIA_TYPES = ('image/jpeg', 'image/png', 'image/webp', 'image/gif', 'video/mp4', 'application/pdf')
+
+
+def seed_media(n_media=100000, n_uploaders=10, seed=42):
+    """Seed ``media`` rows spread over existing users ``1..n_uploaders``.
+
+    Uploads are skewed towards low user ids (user 1 owns roughly a third),
+    so one library is much larger than the rest.
+
+    Returns:
+        int: Number of rows inserted
+    """
+    rng = random.Random(seed)
+    now = time.time()
+    weights = list(itertools.accumulate(1.0 / rank for rank in range(1, n_uploaders + 1)))
+
+    def rows():
+        for i in range(1, n_media + 1):
+            mime = rng.choice(MEDIA_TYPES)
+            name = f"{rng.choice(WORDS)}-{i}.{mime.split('/')[1]}"
+            yield (
+                i, name, f'file-{i}', f'https://ik.imagekit.io/bench/{name}', mime,
+                rng.randint(10000, 5000000), 1600, 900,
+                rng.choices(range(1, n_uploaders + 1), cum_weights=weights)[0],
+                sql_timestamp(now - rng.randint(0, 3 * 365 * 24 * 3600)),
+            )
+
+    return bulk_load('media', ('id', 'filename', 'imagekit_file_id', 'imagekit_url', 'file_type', 'file_size',
+                               'width', 'height', 'uploaded_by', 'created_at'), rows())
+
+
+def seed_page_views(post_id, n_views, n_users=10, seed=42):
+    """Seed ``n_views`` page views of one post, about half of them anonymous.
+
+    Returns:
+        int: Number of rows inserted
+    """
+    rng = random.Random(seed)
+    now = time.time()
+    bulk_load('page_views', ('post_id', 'user_id', 'ip_address', 'user_agent', 'viewed_at'), (
+        (post_id, rng.randint(1, n_users) if rng.random() < 0.5 else None,
+         f'10.0.{i % 256}.{i // 256 % 256}', 'Mozilla/5.0 (benchmark)', sql_timestamp(now - i))
+        for i in range(n_views)
+    ))
+    db.session.execute(db.update(Post).where(Post.id == post_id).values(view_count=Post.view_count + n_views))
+    db.session.commit()
+    return n_views
@@ -0,0 +1,320 @@
+"""Endpoint benchmark suite with JSON results and a regression gate.
+
+Seeds a synthetic dataset, drives the real app through the Flask test
+client or a local WSGI server, and reports p50/p95/p99 latency and
+throughput per scenario.
+
+Usage:
+    python -m tests.benchmarks.suite run --posts 5000 --views 100000 -o results.json
+    python -m tests.benchmarks.suite run --driver wsgi --concurrency 4 -o results.json
+    python -m tests.benchmarks.suite compare baseline.json results.json --threshold 0.15
+"""
+import argparse
+import json
+import os
+import platform
+import random
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import warnings
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+os.environ.setdefault('SECRET_KEY', 'benchmark')
+os.environ.setdefault('JWT_SECRET_KEY', 'benchmark')
+
+import sqlalchemy  # noqa: E402
+from flask_jwt_extended import create_access_token  # noqa: E402
+
+from app import create_app, db, limiter  # noqa: E402
+from app.config import TestingConfig  # noqa: E402
+from app.models.category import Category  # noqa: E402
+from app.models.post import Post  # noqa: E402
+from app.models.tag import Tag  # noqa: E402
+from tests.benchmarks.seed import seed_corpus, WORDS  # noqa: E402
+
+
+class Scenario:
+    """One benchmarked request shape.
+
+    ``make_request(rng)`` returns (method, path, json body or None); a
+    fresh value per call lets scenarios walk pages, slugs and search terms.
+    """
+
+    def __init__(self, name, make_request, auth=False, expected=200):
+        self.name = name
+        self.make_request = make_request
+        self.auth = auth
+        self.expected = expected
+
+
+def build_scenarios(app):
+    """Scenarios over the seeded data (slugs and ids read from the database)."""
+    with app.app_context():
+        published = db.session.execute(
+            db.select(Post.id, Post.slug).where(Post.status == 'published').order_by(Post.id).limit(1000)
+        ).all()
+        tag_slugs = db.session.scalars(db.select(Tag.slug).order_by(Tag.id).limit(50)).all()
+        category_slugs = db.session.scalars(db.select(Category.slug)).all()
+    pages = max(len(published) // 10, 1)
+
+    return [
+        Scenario('list_posts', lambda rng: ('GET', f'/api/posts?page={rng.randint(1, min(pages, 20))}', None)),
+        Scenario('list_posts_search', lambda rng: ('GET', f'/api/posts?search={rng.choice(WORDS)}', None)),
+        Scenario('list_posts_tag', lambda rng: ('GET', f'/api/posts?tag={rng.choice(tag_slugs)}', None)),
+        Scenario('list_posts_category',
+                 lambda rng: ('GET', f'/api/posts?category={rng.choice(category_slugs)}', None)),
+        Scenario('get_post', lambda rng: ('GET', f'/api/posts/{rng.choice(published).slug}', None)),
+        Scenario('list_tags', lambda rng: ('GET', '/api/tags', None)),
+        Scenario('list_categories', lambda rng: ('GET', '/api/categories', None)),
+        Scenario('login', lambda rng: ('POST', '/api/auth/login', {
+            'email': f'author{rng.randint(1, 3)}@example.com', 'password': 'password123'
+        })),
+        Scenario('autosave', lambda rng: ('POST', f'/api/posts/{rng.choice(published).id}/autosave', {
+            'title': 'Draft title', 'content': '<p>' + ' '.join(rng.choices(WORDS, k=200)) + '</p>'
+        }), auth=True),
+    ]
+
+
+class TestClientDriver:
+    """Requests through ``app.test_client()`` (no network, one at a time)."""
+
+    name = 'client'
+
+    def __init__(self, app):
+        self.client = app.test_client()
+
+    def request(self, method, path, body, headers):
+        return self.client.open(path, method=method, json=body, headers=headers).status_code
+
+    def close(self):
+        pass
+
+
+class WSGIServerDriver:
+    """Requests over HTTP to a threaded werkzeug server on localhost."""
+
+    name = 'wsgi'
+
+    def __init__(self, app):
+        import requests
+        from werkzeug.serving import make_server, WSGIRequestHandler
+
+        class QuietHandler(WSGIRequestHandler):
+            def log_request(self, *args, **kwargs):
+                pass
+
+        self.server = make_server('127.0.0.1', 0, app, threaded=True, request_handler=QuietHandler)
+        self.base_url = f'http://127.0.0.1:{self.server.server_port}'
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self.thread.start()
+        self._local = threading.local()
+        self._requests = requests
+
+    def request(self, method, path, body, headers):
+        session = getattr(self._local, 'session', None)
+        if session is None:
+            session = self._local.session = self._requests.Session()
+        return session.request(method, self.base_url + path, json=body, headers=headers).status_code
+
+    def close(self):
+        self.server.shutdown()
+
+
+def percentile(sorted_values, fraction):
+    """Nearest-rank percentile of an ascending list."""
+    if not sorted_values:
+        return None
+    rank = max(int(round(fraction * len(sorted_values) + 0.5)) - 1, 0)
+    return sorted_values[min(rank, len(sorted_values) - 1)]
+
+
+def run_scenario(driver, scenario, headers, requests_per_scenario, warmup, concurrency, seed):
+    """Time one scenario.
+
+    Returns:
+        dict: Latency percentiles (ms), mean, throughput (req/s) and errors
+    """
+    rng = random.Random(seed)
+    for _ in range(warmup):
+        method, path, body = scenario.make_request(rng)
+        driver.request(method, path, body, headers if scenario.auth else {})
+
+    calls = [scenario.make_request(rng) for _ in range(requests_per_scenario)]
+    errors = []
+
+    def timed(call):
+        method, path, body = call
+        started = time.perf_counter()
+        status = driver.request(method, path, body, headers if scenario.auth else {})
+        elapsed = time.perf_counter() - started
+        if status != scenario.expected:
+            errors.append(f'{method} {path}: {status}')
+        return elapsed
+
+    started = time.perf_counter()
+    if concurrency > 1:
+        with ThreadPoolExecutor(max_workers=concurrency) as pool:
+            latencies = list(pool.map(timed, calls))
+    else:
+        latencies = [timed(call) for call in calls]
+    wall = time.perf_counter() - started
+
+    latencies.sort()
+    return {
+        'requests': len(latencies),
+        'p50_ms': round(percentile(latencies, 0.50) * 1000, 3),
+        'p95_ms': round(percentile(latencies, 0.95) * 1000, 3),
+        'p99_ms': round(percentile(latencies, 0.99) * 1000, 3),
+        'mean_ms': round(sum(latencies) / len(latencies) * 1000, 3),
+        'throughput_rps': round(len(latencies) / wall, 1),
+        'errors': len(errors),
+        'error_samples': errors[:5],
+    }
+
+
+def _git_revision():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run(args):
+    warnings.filterwarnings('ignore')
+    with tempfile.TemporaryDirectory() as tmp:
+        class BenchmarkConfig(TestingConfig):
+            SQLALCHEMY_DATABASE_URI = (
+                'sqlite:///:memory:' if args.db == 'memory' else f"sqlite:///{os.path.join(tmp, 'bench.db')}"
+            )
+            QUERY_AUDIT_ENABLED = False
+
+        if args.database_url:
+            BenchmarkConfig.SQLALCHEMY_DATABASE_URI = args.database_url
+        app = create_app(BenchmarkConfig)
+        limiter.enabled = False
+
+        started = time.perf_counter()
+        with app.app_context():
+            db.create_all()
+            seed_corpus(n_posts=args.posts, n_tags=args.tags, n_categories=args.categories,
+                        n_authors=args.authors, views=args.views, seed=args.seed)
+            token = create_access_token(identity='1')
+        print(f"seeded {args.posts} posts, {args.views} page views in {time.perf_counter() - started:.1f} s",
+              file=sys.stderr)
+
+        driver = (WSGIServerDriver if args.driver == 'wsgi' else TestClientDriver)(app)
+        headers = {'Authorization': f'Bearer {token}'}
+        selected = set(args.scenario or ())
+        results = {}
+        try:
+            for scenario in build_scenarios(app):
+                if selected and scenario.name not in selected:
+                    continue
+                results[scenario.name] = result = run_scenario(
+                    driver, scenario, headers, args.requests, args.warmup, args.concurrency, args.seed
+                )
+                print(f"{scenario.name:22} p50 {result['p50_ms']:8.2f} ms  p95 {result['p95_ms']:8.2f} ms  "
+                      f"p99 {result['p99_ms']:8.2f} ms  {result['throughput_rps']:8.1f} req/s"
+                      + (f"  {result['errors']} errors" if result['errors'] else ''), file=sys.stderr)
+        finally:
+            driver.close()
+
+    report = {
+        'meta': {
+            'timestamp': datetime.utcnow().isoformat(),
+            'revision': _git_revision(),
+            'python': platform.python_version(),
+            'sqlalchemy': sqlalchemy.__version__,
+            'database': 'custom' if args.database_url else f'sqlite-{args.db}',
+            'driver': args.driver,
+            'concurrency': args.concurrency,
+            'dataset': {'posts': args.posts, 'tags': args.tags, 'categories': args.categories,
+                        'authors': args.authors, 'views': args.views, 'seed': args.seed},
+        },
+        'results': results,
+    }
+    text = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, 'w') as f:
+            f.write(text + '\n')
+    else:
+        print(text)
+    return 1 if any(result['errors'] for result in results.values()) else 0
+
+
+def compare(args):
+    """Exit non-zero if any scenario regressed by more than the threshold."""
+    with open(args.baseline) as f:
+        baseline = json.load(f)
+    with open(args.current) as f:
+        current = json.load(f)
+
+    if baseline['meta'].get('dataset') != current['meta'].get('dataset'):
+        print("warning: runs used different datasets", file=sys.stderr)
+
+    regressions = []
+    for name, before in baseline['results'].items():
+        after = current['results'].get(name)
+        if after is None:
+            print(f"{name:22} missing from current run")
+            continue
+        for metric in args.metric:
+            old, new = before[metric], after[metric]
+            if not old:
+                continue
+            # Throughput regresses downwards, latencies upwards
+            change = (old - new) / old if metric == 'throughput_rps' else (new - old) / old
+            flag = 'REGRESSION' if change > args.threshold else ''
+            if flag:
+                regressions.append((name, metric))
+            print(f"{name:22} {metric:15} {old:10.2f} -> {new:10.2f}  {change:+7.1%} {flag}")
+
+    if regressions:
+        print(f"{len(regressions)} regression(s) over {args.threshold:.0%}", file=sys.stderr)
+        return 1
+    return 0
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    run_parser = commands.add_parser('run', help='seed a dataset and benchmark the endpoints')
+    run_parser.add_argument('--posts', type=int, default=5000)
+    run_parser.add_argument('--tags', type=int, default=200)
+    run_parser.add_argument('--categories', type=int, default=20)
+    run_parser.add_argument('--authors', type=int, default=10)
+    run_parser.add_argument('--views', type=int, default=50000)
+    run_parser.add_argument('--requests', type=int, default=200, help='timed requests per scenario')
+    run_parser.add_argument('--warmup', type=int, default=20)
+    run_parser.add_argument('--driver', choices=('client', 'wsgi'), default='client')
+    run_parser.add_argument('--concurrency', type=int, default=1, help='parallel requests (wsgi driver)')
+    run_parser.add_argument('--db', choices=('file', 'memory'), default='file')
+    run_parser.add_argument('--database-url', help='benchmark against another (empty) database')
+    run_parser.add_argument('--scenario', action='append', help='run only these scenarios')
+    run_parser.add_argument('--seed', type=int, default=42)
+    run_parser.add_argument('-o', '--output', help='write JSON results here (default: stdout)')
+
+    compare_parser = commands.add_parser('compare', help='compare two result files')
+    compare_parser.add_argument('baseline')
+    compare_parser.add_argument('current')
+    compare_parser.add_argument('--threshold', type=float, default=0.15, help='allowed relative slowdown')
+    compare_parser.add_argument('--metric', action='append',
+                                choices=('p50_ms', 'p95_ms', 'p99_ms', 'mean_ms', 'throughput_rps'))
+
+    args = parser.parse_args()
+    if args.command == 'compare':
+        args.metric = args.metric or ['p95_ms', 'throughput_rps']
+        sys.exit(compare(args))
+    if args.concurrency > 1 and args.driver == 'client':
+        parser.error('--concurrency needs --driver wsgi')
+    sys.exit(run(args))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,154 @@
+"""Shared fixtures: app, client, auth headers and SQL query budgets."""
+import os
+from contextlib import contextmanager
+
+os.environ.setdefault('SECRET_KEY', 'test')
+os.environ.setdefault('JWT_SECRET_KEY', 'test')
+
+import pytest  # noqa: E402
+from flask_jwt_extended import create_access_token  # noqa: E402
+from sqlalchemy import event  # noqa: E402
+
+from app import create_app, db, limiter  # noqa: E402
+from app.config import TestingConfig  # noqa: E402
+from app.services.access_log import access_log  # noqa: E402
+from app.services.autocomplete import category_index, tag_index  # noqa: E402
+from app.services.background import background  # noqa: E402
+from app.services.media_upload import upload_slots  # noqa: E402
+from app.services.metrics import metrics  # noqa: E402
+from app.services.profiling import profiler  # noqa: E402
+from app.services.query_audit import query_audit  # noqa: E402
+from app.services.related import related_posts  # noqa: E402
+from app.services.title_index import title_index  # noqa: E402
+from app.services.tracing import tracer  # noqa: E402
+from app.services.trending import trending  # noqa: E402
+from app.services.warmup import warmup  # noqa: E402
+from tests.benchmarks.seed import seed_corpus  # noqa: E402
+
+
+# Module-level services that create_app configures for the app it builds
+SERVICES = (limiter, trending, related_posts, tag_index, category_index, title_index, upload_slots,
+            background, profiler, warmup, metrics, query_audit, tracer, access_log)
+
+
+def pytest_configure(config):
+    config.addinivalue_line(
+        'markers',
+        'max_queries(n): fail if any request made during the test runs more than n SQL statements'
+    )
+
+
+@pytest.fixture(scope='session')
+def app():
+    """Application on an in-memory database seeded with a small corpus."""
+    app = create_app('testing')
+    limiter.enabled = False
+    with app.app_context():
+        db.create_all()
+        seed_corpus(n_posts=60, n_tags=30, n_categories=6, n_authors=3)
+    yield app
+
+
+@pytest.fixture
+def make_app(app):
+    """Build apps with config overrides, each on its own in-memory database.
+
+    ``make_app(seed=None, **overrides)`` returns an app configured by a
+    ``TestingConfig`` subclass with ``overrides`` (passed to ``create_app``
+    directly, so the config registry is left alone), with the tables
+    created and ``seed_corpus(**seed)`` loaded if ``seed`` is given.
+
+    Creating an app re-configures the module-level services for it; at
+    teardown their background work is finished and their state restored
+    to the session ``app``'s.
+    """
+    saved = [(service, dict(vars(service))) for service in SERVICES]
+    access_handlers = list(access_log.logger.handlers)
+
+    def make(seed=None, **overrides):
+        made = create_app(type('OverriddenConfig', (TestingConfig,), overrides))
+        with made.app_context():
+            db.create_all()
+            if seed is not None:
+                seed_corpus(**seed)
+        return made
+
+    yield make
+
+    background.shutdown(wait=True)
+    access_log.flush()
+    if tracer.exporter is not None:
+        tracer.exporter.flush()
+    for service, state in saved:
+        vars(service).clear()
+        vars(service).update(state)
+    for handler in list(access_log.logger.handlers):
+        if handler not in access_handlers:
+            access_log.logger.removeHandler(handler)
+
+
+@pytest.fixture
+def auth_headers(app):
+    """Authorization headers for the seeded admin (user 1)."""
+    with app.app_context():
+        token = create_access_token(identity='1')
+    return {'Authorization': f'Bearer {token}'}
+
+
+def _format_statements(counts):
+    return '\n'.join(f'  {count:4}x {statement}' for statement, count in
+                     sorted(counts.items(), key=lambda item: -item[1]))
+
+
+@pytest.fixture
+def max_queries(app):
+    """Context manager asserting a block runs at most ``n`` SQL statements.
+
+    Usage::
+
+        with max_queries(3):
+            client.get('/api/tags')
+    """
+    @contextmanager
+    def budget(n):
+        statements = []
+
+        def count(conn, cursor, statement, parameters, context, executemany):
+            statements.append(statement)
+
+        with app.app_context():
+            engine = db.engine
+        event.listen(engine, 'before_cursor_execute', count)
+        try:
+            yield statements
+        finally:
+            event.remove(engine, 'before_cursor_execute', count)
+        assert len(statements) <= n, (
+            f"{len(statements)} SQL statements, budget {n}:\n" + '\n'.join(f'  {s}' for s in statements)
+        )
+
+    return budget
+
+
+@pytest.fixture(autouse=True)
+def _request_query_budget(request):
+    """Enforce ``@pytest.mark.max_queries(n)`` on every request in the test."""
+    marker = request.node.get_closest_marker('max_queries')
+    if marker is None:
+        yield
+        return
+
+    budget = marker.args[0]
+    over = []
+
+    def check(endpoint, counts):
+        total = sum(counts.values())
+        if total > budget:
+            over.append(f"{endpoint}: {total} SQL statements, budget {budget}\n{_format_statements(counts)}")
+
+    remove = query_audit.on_request_end(check)
+    try:
+        yield
+    finally:
+        remove()
+    assert not over, '\n'.join(over)
@@ -0,0 +1,70 @@
+"""Structured access log: sampling rules and record contents."""
+import json
+import os
+import time
+
+import pytest
+from flask_jwt_extended import create_access_token
+
+from app.services.access_log import access_log
+
+
+@pytest.fixture
+def logged_app(make_app, tmp_path):
+    return make_app(
+        seed={'n_posts': 5, 'n_tags': 5, 'n_categories': 2, 'n_authors': 2},
+        ACCESS_LOG_ENABLED=True,
+        ACCESS_LOG_PATH=str(tmp_path / 'access.log'),
+        ACCESS_LOG_ROUTE_SAMPLE_RATES={'posts.get_post': 0.0},
+    )
+
+
+def _records(app):
+    access_log.flush()
+    if not os.path.exists(app.config['ACCESS_LOG_PATH']):
+        return []
+    with open(app.config['ACCESS_LOG_PATH']) as f:
+        return [json.loads(line) for line in f]
+
+
+def test_request_is_logged_with_route_user_and_query_count(logged_app):
+    with logged_app.app_context():
+        token = create_access_token(identity='1')
+    response = logged_app.test_client().get('/api/media', headers={'Authorization': f'Bearer {token}'})
+
+    record, = _records(logged_app)
+    assert record['route'] == '/api/media' and record['endpoint'] == 'media.list_media'
+    assert record['status'] == 200 and record['bytes'] == len(response.data)
+    assert record['user_id'] == '1'
+    assert record['queries'] >= 2
+    assert record['reason'] == 'sampled' and record['sample_rate'] == 1.0
+
+
+def test_route_sampling_keeps_errors_and_slow_requests(logged_app, monkeypatch):
+    client = logged_app.test_client()
+    client.get('/api/posts/post-1')
+    assert _records(logged_app) == []
+
+    monkeypatch.setattr(access_log, 'error_status', 404)
+    client.get('/api/posts/missing')
+    monkeypatch.setattr(access_log, 'slow_seconds', 0)
+    client.get('/api/posts/post-1')
+    assert [record['reason'] for record in _records(logged_app)] == ['error', 'slow']
+
+
+def test_write_errors_are_counted_and_the_writer_keeps_running(logged_app, tmp_path, monkeypatch):
+    client = logged_app.test_client()
+    monkeypatch.setattr(access_log, 'failed', 0)
+    monkeypatch.setattr(access_log, 'interval', 0.01)
+    # A directory cannot be opened for appending
+    monkeypatch.setattr(access_log, '_path', str(tmp_path))
+    client.get('/api/posts')
+    deadline = time.monotonic() + 5
+    while not access_log.failed and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert access_log.failed == 1
+    assert access_log._writer.is_alive()
+
+    monkeypatch.setattr(access_log, '_path', logged_app.config['ACCESS_LOG_PATH'])
+    client.get('/api/categories')
+    assert [record['endpoint'] for record in _records(logged_app)] == ['categories.list_categories']
@@ -0,0 +1,23 @@
+"""Autocomplete: background rebuilds keep serving and replay concurrent writes."""
+from app.services.autocomplete import PrefixIndex
+
+
+ROWS = [(1, 'Python', 'python', 5), (2, 'Pytest', 'pytest', 2), (3, 'Rust', 'rust', 1)]
+
+
+def test_rebuild_keeps_serving_and_replays_changes():
+    index = PrefixIndex(None, None, None, rebuild_interval=float('inf'))
+    index.build(ROWS)
+
+    def rows():
+        # A lookup and writes made while the new index is being read
+        assert [entry['id'] for entry in index.suggest('py')] == [1, 2]
+        index.add(4, 'Pyramid', 'pyramid', 3)
+        index.remove(2)
+        yield from ROWS
+
+    # As build_from_db does while it reads the database
+    index._building = True
+    index.build(rows())
+    assert [entry['id'] for entry in index.suggest('py')] == [1, 4]
+    assert [entry['id'] for entry in index.suggest('pyr')] == [4]
@@ -0,0 +1,37 @@
+"""Corpus import: bad records are reported per line, not raised."""
+import json
+
+import pytest
+
+from app import db
+from app.models.post import Post
+from app.models.tag import Tag
+from app.services.corpus import import_posts
+
+
+@pytest.fixture
+def seeded_app(make_app):
+    return make_app(seed={'n_posts': 0, 'n_tags': 0, 'n_categories': 0, 'n_authors': 1})
+
+
+def _record(title, **fields):
+    return json.dumps({'title': title, 'content': 'Body', 'author': 'author1', **fields})
+
+
+def test_import_reports_invalid_records(seeded_app):
+    lines = [
+        _record('Good', tags=[{'name': 'Flask', 'slug': 'flask'}]),
+        _record('Bad count', view_count='many'),
+        _record('x' * 300),
+        'not json',
+        # Two slugs for one new name used to collapse into a KeyError
+        _record('Renamed', tags=[{'name': 'Python', 'slug': 'python'}, {'name': 'Python', 'slug': 'py'}]),
+    ]
+    with seeded_app.app_context():
+        result = import_posts(lines)
+
+        assert (result['imported'], result['skipped']) == (2, 3)
+        assert [error['line'] for error in result['errors']] == [2, 3, 4]
+        assert result['errors'][0]['error'] == 'view_count: Not a valid integer.'
+        assert db.session.scalar(db.select(db.func.count(Post.id))) == 2
+        assert sorted(db.session.execute(db.select(Tag.slug)).scalars()) == ['flask', 'python']
@@ -0,0 +1,82 @@
+"""Media uploads: allowed file types only, deduplicated per uploader."""
+import hashlib
+import uuid
+
+import pytest
+from flask_jwt_extended import create_access_token
+
+from app.routes import media as media_routes
+
+
+PNG = b'\x89PNG\r\n\x1a\n' + b'\x00' * 1024
+
+
+@pytest.fixture
+def imagekit(monkeypatch):
+    """Stand-in for ImageKit that reads the whole upload."""
+    uploads, deleted = [], []
+
+    def upload_stream(chunks, filename, content_type=None, folder=None):
+        uploads.append(b''.join(chunks))
+        return {'fileId': uuid.uuid4().hex, 'url': f'https://ik.imagekit.io/test/{filename}'}
+
+    monkeypatch.setattr(media_routes, 'upload_stream', upload_stream)
+    monkeypatch.setattr(media_routes, 'delete_file', deleted.append)
+    monkeypatch.setattr(media_routes, 'schedule_processing', lambda media, head: None)
+    return uploads, deleted
+
+
+def _upload(client, auth_headers, body, content_type, filename='file.png'):
+    return client.post(f'/api/media?filename={filename}', data=body,
+                       headers={**auth_headers, 'Content-Type': content_type})
+
+
+def test_upload_rejects_disallowed_types(client, auth_headers, imagekit):
+    uploads, _ = imagekit
+
+    # Declared type: rejected before anything is streamed
+    response = _upload(client, auth_headers, b'<html></html>', 'text/html', 'page.html')
+    assert response.status_code == 415
+    assert uploads == []
+
+    # Sniffed type: an HTML page declared as a PNG aborts the upload
+    response = _upload(client, auth_headers, b'<html>' + b' ' * 1024, 'image/png')
+    assert response.status_code == 415
+    assert response.get_json()['error'] == 'Unsupported file type: unrecognised'
+    assert uploads == []
+
+    response = _upload(client, auth_headers, PNG, 'application/octet-stream')
+    assert response.status_code == 201
+    assert response.get_json()['media']['file_type'] == 'image/png'
+
+
+def test_duplicates_are_per_uploader(app, client, auth_headers, imagekit):
+    uploads, _ = imagekit
+    png = PNG + b'per-uploader'
+    digest = hashlib.sha256(png).hexdigest()
+    with app.app_context():
+        other_headers = {'Authorization': f'Bearer {create_access_token(identity="2")}'}
+
+    assert _upload(client, auth_headers, png, 'image/png').status_code == 201
+    response = _upload(client, auth_headers, png, 'image/png')
+    assert response.status_code == 200 and response.get_json()['duplicate']
+
+    # Another user learns nothing about the first user's files
+    response = client.post('/api/media/check', json={'sha256': digest}, headers=other_headers)
+    assert response.get_json() == {'exists': False, 'media': None}
+    response = _upload(client, {**other_headers, 'X-Content-SHA256': digest}, png, 'image/png')
+    assert response.status_code == 201
+    assert response.get_json()['media']['uploaded_by'] == 2
+    assert len(uploads) == 3
+
+
+def test_media_is_visible_to_its_uploader_and_admins(app, client, auth_headers, imagekit):
+    with app.app_context():
+        uploader, other = ({'Authorization': f'Bearer {create_access_token(identity=identity)}'}
+                           for identity in ('2', '3'))
+
+    media_id = _upload(client, uploader, PNG + b'private', 'image/png').get_json()['media']['id']
+
+    assert client.get(f'/api/media/{media_id}', headers=uploader).status_code == 200
+    assert client.get(f'/api/media/{media_id}', headers=auth_headers).status_code == 200
+    assert client.get(f'/api/media/{media_id}', headers=other).status_code == 404
@@ -0,0 +1,55 @@
+"""Admin request profiling: signed tokens and stored folded stacks."""
+import pytest
+
+from app.services.profiling import profiler
+
+
+@pytest.fixture
+def profile_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(profiler, 'directory', str(tmp_path))
+    return tmp_path
+
+
+@pytest.mark.parametrize('mode', ['sample', 'trace'])
+def test_token_profiles_request(client, auth_headers, profile_dir, mode):
+    token = client.post('/api/admin/profiles/token', headers=auth_headers, json={'mode': mode}).json['token']
+
+    response = client.get(f'/api/posts?search=python&_profile={token}', headers=auth_headers)
+    assert response.status_code == 200
+    profile_id = response.headers['X-Profile-Id']
+
+    listed = client.get('/api/admin/profiles', headers=auth_headers).json['profiles']
+    assert listed[0]['id'] == profile_id
+    assert listed[0]['mode'] == mode and listed[0]['endpoint'] == 'posts.list_posts'
+    assert listed[0]['path'] == '/api/posts?search=python'
+
+    folded = client.get(f'/api/admin/profiles/{profile_id}', headers=auth_headers)
+    assert folded.status_code == 200
+    stack, weight = folded.data.decode().splitlines()[0].rsplit(' ', 1)
+    assert ';' in stack and int(weight) > 0
+
+
+def test_requests_without_valid_token_are_not_profiled(client, auth_headers, profile_dir):
+    assert 'X-Profile-Id' not in client.get('/api/posts').headers
+    assert 'X-Profile-Id' not in client.get('/api/posts', headers={'X-Profile-Token': 'forged'}).headers
+    assert not list(profile_dir.iterdir())
+
+
+def test_token_only_profiles_the_issuing_admin(client, app, auth_headers, profile_dir):
+    from flask_jwt_extended import create_access_token
+    token = client.post('/api/admin/profiles/token', headers=auth_headers, json={}).json['token']
+    with app.app_context():
+        other = {'Authorization': f"Bearer {create_access_token(identity='2')}"}
+
+    # A leaked token is no use without the admin's own JWT
+    assert 'X-Profile-Id' not in client.get(f'/api/posts?_profile={token}').headers
+    assert 'X-Profile-Id' not in client.get(f'/api/posts?_profile={token}', headers=other).headers
+    assert 'X-Profile-Id' in client.get(f'/api/posts?_profile={token}', headers=auth_headers).headers
+
+
+def test_profile_endpoints_are_admin_only(client, app, profile_dir):
+    from flask_jwt_extended import create_access_token
+    with app.app_context():
+        author = {'Authorization': f"Bearer {create_access_token(identity='2')}"}
+    assert client.post('/api/admin/profiles/token', headers=author, json={}).status_code == 403
+    assert client.get('/api/admin/profiles', headers=author).status_code == 403
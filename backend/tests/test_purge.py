@@ -0,0 +1,75 @@
+"""Post purges: recorded durably and finished after an interruption."""
+import pytest
+from flask_jwt_extended import create_access_token
+
+from app import db
+from app.models.analytics import PageView
+from app.models.post import Post
+from app.models.tag import post_tags
+from app.routes import posts as post_routes
+from app.services.autocomplete import tag_index
+
+
+@pytest.fixture
+def purge_app(make_app):
+    # Every delete goes through the background purge
+    return make_app(seed={'n_posts': 5, 'n_tags': 3, 'n_categories': 1, 'n_authors': 1},
+                    POST_PURGE_VIEW_THRESHOLD=0)
+
+
+def _tag_counts():
+    return {tag_id: count for tag_id, (_, _, count) in tag_index._entries.items()}
+
+
+def test_interrupted_purge_is_finished_by_cli(purge_app, monkeypatch):
+    with purge_app.app_context():
+        headers = {'Authorization': f'Bearer {create_access_token(identity="1")}'}
+        post = db.session.execute(db.select(Post).join(post_tags)).scalars().first()
+        post_id, tag_ids = post.id, [tag.id for tag in post.tags]
+        db.session.add_all(PageView(post_id=post_id) for _ in range(5))
+        db.session.commit()
+        tag_index.build_from_db()
+        counts = _tag_counts()
+
+    # The worker restarts before the background job runs
+    monkeypatch.setattr(post_routes.background, 'submit', lambda fn, *args: None)
+    client = purge_app.test_client()
+    assert client.delete(f'/api/posts/{post_id}', headers=headers).status_code == 202
+    assert client.delete(f'/api/posts/{post_id}', headers=headers).status_code == 404
+    with purge_app.app_context():
+        assert db.session.get(Post, post_id).purge_requested_at is not None
+        # Counts only change once the purge commits
+        assert _tag_counts() == counts
+
+        result = purge_app.test_cli_runner().invoke(args=['purge-posts'])
+        assert result.exit_code == 0, result.output
+        assert db.session.get(Post, post_id) is None
+        assert PageView.query.filter_by(post_id=post_id).count() == 0
+        assert all(_tag_counts()[tag_id] == counts[tag_id] - 1 for tag_id in tag_ids)
+
+
+def test_post_being_purged_is_gone_for_every_reader(purge_app, monkeypatch):
+    with purge_app.app_context():
+        headers = {'Authorization': f'Bearer {create_access_token(identity="1")}'}
+        post_id = db.session.execute(db.select(Post.id).order_by(Post.id)).scalars().first()
+        total = db.session.query(Post).count()
+
+    monkeypatch.setattr(post_routes.background, 'submit', lambda fn, *args: None)
+    client = purge_app.test_client()
+    assert client.delete(f'/api/posts/{post_id}', headers=headers).status_code == 202
+
+    assert client.get(f'/api/posts/by-id/{post_id}', headers=headers).status_code == 404
+    assert client.get(f'/api/posts/{post_id}/autosave', headers=headers).status_code == 404
+    listed = client.get('/api/posts?per_page=100', headers=headers).get_json()
+    assert listed['total'] == total - 1
+    assert post_id not in [post['id'] for post in listed['posts']]
+    exported = client.get('/api/admin/corpus/export', headers=headers).data.decode().splitlines()
+    assert len(exported) == total - 1
+
+    response = client.post('/api/posts/batch', headers=headers, json={'operations': [
+        {'op': 'publish', 'id': post_id},
+        {'op': 'update', 'id': post_id, 'data': {'title': 'Back from the dead'}},
+    ]})
+    assert [result['status'] for result in response.get_json()['results']] == [404, 404]
+    with purge_app.app_context():
+        assert db.session.get(Post, post_id).status == 'draft'
@@ -0,0 +1,63 @@
+"""SQL statement budgets per endpoint, so N+1 regressions fail in CI."""
+import pytest
+
+
+def budget(path, n, auth=False):
+    return pytest.param(path, auth, marks=pytest.mark.max_queries(n), id=path)
+
+
+# Post listings load authors, categories and tags with one query each per
+# page, so their budgets do not grow with the page size
+READ_BUDGETS = [
+    budget('/api/health', 0),
+    budget('/api/posts', 5),
+    budget('/api/posts?per_page=100', 5),
+    budget('/api/posts?per_page=5&tag=python-1', 6),
+    budget('/api/posts?facets=true', 6),
+    budget('/api/posts/suggest?q=pyth', 1),
+    budget('/api/posts/by-id/1', 5, auth=True),
+    budget('/api/posts/post-1', 8),
+    # At worst the index is built (inline in tests) and the post indexed on demand
+    budget('/api/posts/post-1/related', 10),
+    budget('/api/categories', 2),
+    budget('/api/categories/1', 2),
+    budget('/api/categories/suggest?q=cat', 1),
+    budget('/api/tags', 2),
+    budget('/api/tags/1', 2),
+    budget('/api/tags/suggest?q=py', 1),
+    budget('/api/media', 2, auth=True),
+    budget('/api/analytics/popular', 4),
+    budget('/api/auth/me', 1, auth=True),
+]
+
+
+@pytest.mark.parametrize('path, auth', READ_BUDGETS)
+def test_read_endpoint_budget(client, auth_headers, path, auth):
+    response = client.get(path, headers=auth_headers if auth else {})
+    assert response.status_code == 200, response.data
+
+
+def test_create_post_budget(client, auth_headers, max_queries):
+    with max_queries(12):
+        response = client.post('/api/posts', headers=auth_headers, json={
+            'title': 'Budgeted post', 'content': '<p>Body</p>',
+            'category_ids': [1, 2], 'tag_ids': [1, 2, 3], 'tag_names': ['budget']
+        })
+    assert response.status_code == 201, response.data
+
+
+def test_update_post_tags_budget(client, auth_headers, max_queries):
+    # Replacing tags costs the same however many the post has
+    with max_queries(16):
+        response = client.put('/api/posts/3', headers=auth_headers, json={
+            'title': 'Retitled post', 'tag_ids': list(range(1, 21))
+        })
+    assert response.status_code == 200, response.data
+
+
+def test_batch_budget_is_independent_of_size(client, auth_headers, max_queries):
+    operations = [{'op': 'create', 'data': {'title': f'Batch {i}', 'content': '<p>x</p>', 'tag_ids': [1, 2]}}
+                  for i in range(50)]
+    with max_queries(12):
+        response = client.post('/api/posts/batch', headers=auth_headers, json={'operations': operations})
+    assert response.status_code == 200 and response.json['committed'], response.data
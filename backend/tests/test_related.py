@@ -0,0 +1,88 @@
+"""Related posts: background rebuilds, precomputed lists and incremental updates."""
+import pytest
+from flask_jwt_extended import create_access_token
+
+from app import db
+from app.models.tag import post_tags
+from app.services.related import RelatedPostsEngine, related_posts
+
+
+def _doc(post_id, words, tag_ids=()):
+    return {'id': post_id, 'slug': f'post-{post_id}', 'title': words, 'excerpt': '', 'content': words,
+            'tag_ids': list(tag_ids), 'category_ids': []}
+
+
+DOCS = [
+    _doc(1, 'python flask routing', [1]),
+    _doc(2, 'python flask templates', [1]),
+    _doc(3, 'gardening tomatoes soil', [2]),
+    _doc(4, 'gardening roses soil', [2]),
+]
+
+
+@pytest.fixture
+def merge_app(make_app):
+    return make_app(seed={'n_posts': 30, 'n_tags': 5, 'n_categories': 2, 'n_authors': 1, 'published_ratio': 1.0})
+
+
+def test_precompute_and_incremental_updates():
+    engine = RelatedPostsEngine()
+    engine.build(DOCS)
+    assert engine.precompute()
+    assert set(engine._neighbours) == {1, 2, 3, 4}
+    assert engine.neighbours(1)[0][0] == 2
+
+    # Re-indexing a post moves it between neighbour lists
+    flask_column = engine._features['w:flask']
+    assert engine._df[flask_column] == 2
+    engine.update(_doc(2, 'gardening tomatoes roses', [2]))
+    assert engine._df[flask_column] == 1
+    assert [post_id for post_id, _ in engine.neighbours(1)] == []
+    assert 2 in [post_id for post_id, _ in engine.neighbours(3)]
+
+    engine.remove(2)
+    assert 2 not in [post_id for post_id, _ in engine.neighbours(3)]
+    assert all(count >= 0 for count in engine._df)
+
+
+def test_rebuild_keeps_serving_and_replays_changes():
+    engine = RelatedPostsEngine()
+    engine.build(DOCS)
+    engine.precompute()
+
+    def documents():
+        # A lookup and a write made while the new index is being read
+        assert engine.neighbours(1)[0][0] == 2
+        engine.update(_doc(5, 'python flask blueprints', [1]))
+        yield from DOCS
+
+    # As build_from_db does while it reads the database
+    engine._building = True
+    engine.build(documents())
+    assert len(engine) == 5
+    assert 5 in [post_id for post_id, _ in engine.neighbours(1)]
+
+
+def test_tag_merge_reindexes_moved_posts(merge_app):
+    with merge_app.app_context():
+        headers = {'Authorization': f'Bearer {create_access_token(identity="1")}'}
+        source, target = db.session.execute(
+            db.select(post_tags.c.tag_id).group_by(post_tags.c.tag_id).order_by(post_tags.c.tag_id).limit(2)
+        ).scalars().all()
+        moved = db.session.execute(
+            db.select(post_tags.c.post_id).where(post_tags.c.tag_id == source)
+        ).scalars().all()
+        related_posts.build_from_db()
+        built_at = related_posts._built_at
+
+    response = merge_app.test_client().post(f'/api/tags/{target}/merge', json={'source_ids': [source]}, headers=headers)
+    assert response.status_code == 200
+
+    # Patched in place rather than rebuilt
+    assert related_posts._built_at == built_at
+    source_column = related_posts._features[f't:{source}']
+    target_column = related_posts._features[f't:{target}']
+    assert moved
+    for post_id in moved:
+        columns = related_posts._rows[post_id][0]
+        assert source_column not in columns and target_column in columns
@@ -0,0 +1,66 @@
+"""``flask seed``: synthetic data bulk-loaded into an empty database."""
+import sqlite3
+
+import pytest
+
+from app import db
+
+
+@pytest.fixture
+def empty_app(make_app):
+    return make_app()
+
+
+def _snapshot():
+    return {
+        'posts': db.session.execute(db.text('SELECT count(*), sum(view_count) FROM posts')).one(),
+        'views': db.session.execute(db.text('SELECT count(*) FROM page_views')).scalar(),
+        'tags': db.session.execute(db.text('SELECT post_id, tag_id FROM post_tags ORDER BY 1, 2')).all(),
+        'indexes': db.session.execute(db.text(
+            "SELECT name FROM sqlite_master WHERE type = 'index' AND tbl_name = 'page_views' AND sql IS NOT NULL"
+        )).scalars().all(),
+    }
+
+
+def _seed(app):
+    # Pushed explicitly: pytest-flask already has the shared app's context active
+    with app.app_context():
+        return app.test_cli_runner().invoke(args=[
+            'seed', '--posts', '50', '--tags', '20', '--categories', '4', '--authors', '5', '--views', '2000'
+        ])
+
+
+def test_seed_loads_reproducible_data(empty_app, make_app):
+    result = _seed(empty_app)
+    assert result.exit_code == 0, result.output
+
+    with empty_app.app_context():
+        seeded = _snapshot()
+    assert tuple(seeded['posts']) == (50, 2000)
+    assert seeded['views'] == 2000
+    assert len(seeded['indexes']) == 3
+
+    # Refuses a database that already has data
+    again = _seed(empty_app)
+    assert again.exit_code != 0 and 'empty database' in again.output
+
+    other = make_app()
+    assert _seed(other).exit_code == 0
+    with other.app_context():
+        assert _snapshot()['tags'] == seeded['tags']
+
+
+def test_failed_load_keeps_indexes_and_drops_partial_batch(empty_app, monkeypatch):
+    from app.services.synthetic import SyntheticDataset, seed_database
+
+    dataset = SyntheticDataset(posts=10, tags=5, categories=2, authors=2, views=0)
+    row = (1, 1, '2024-01-01 00:00:00.000000')
+    # The duplicate id fails the batch after its first row was inserted
+    monkeypatch.setattr(dataset, 'page_views', lambda: (('id', 'post_id', 'viewed_at'), iter([row, row])))
+
+    with empty_app.app_context():
+        with pytest.raises(sqlite3.IntegrityError):
+            seed_database(dataset)
+        snapshot = _snapshot()
+    assert snapshot['views'] == 0
+    assert len(snapshot['indexes']) == 3
@@ -0,0 +1,31 @@
+"""Cold start: Flask-Migrate loaded on demand and the migrate.py fast path."""
+import sqlalchemy
+
+import migrate
+
+
+def test_migration_commands_load_on_demand(make_app):
+    app = make_app()
+    assert 'migrate' not in app.extensions
+
+    with app.app_context():
+        result = app.test_cli_runner().invoke(args=['db', '--help'])
+    assert result.exit_code == 0, result.output
+    assert 'upgrade' in result.output
+    assert 'migrate' in app.extensions
+
+
+def test_fast_path_compares_database_revision_with_heads(tmp_path, monkeypatch):
+    heads = migrate.script_heads()
+    assert len(heads) == 1
+
+    url = f"sqlite:///{tmp_path / 'app.db'}"
+    monkeypatch.setenv('DATABASE_URL', url)
+    assert migrate.database_revisions() is None
+
+    engine = sqlalchemy.create_engine(url)
+    with engine.begin() as conn:
+        conn.execute(sqlalchemy.text('CREATE TABLE alembic_version (version_num VARCHAR(32) NOT NULL)'))
+        conn.execute(sqlalchemy.text('INSERT INTO alembic_version VALUES (:head)'), {'head': next(iter(heads))})
+    engine.dispose()
+    assert migrate.database_revisions() == heads
@@ -0,0 +1,66 @@
+"""Request tracing: sampling, trace context propagation and span export."""
+import json
+
+import pytest
+from flask_jwt_extended import create_access_token
+
+from app.services.tracing import parse_traceparent, tracer
+
+
+@pytest.fixture
+def traced_app(make_app, tmp_path):
+    return make_app(
+        seed={'n_posts': 5, 'n_tags': 5, 'n_categories': 2, 'n_authors': 2},
+        TRACING_ENABLED=True,
+        TRACING_SAMPLE_RATE=1.0,
+        TRACING_EXPORT_PATH=str(tmp_path / 'traces.jsonl'),
+    )
+
+
+def _spans(app):
+    tracer.exporter.flush()
+    with open(app.config['TRACING_EXPORT_PATH']) as f:
+        return [json.loads(line) for line in f]
+
+
+def test_traced_request_exports_span_tree(traced_app):
+    with traced_app.app_context():
+        token = create_access_token(identity='1')
+    response = traced_app.test_client().get('/api/media', headers={'Authorization': f'Bearer {token}'})
+    assert response.status_code == 200
+
+    trace_id, root_id, sampled = parse_traceparent(response.headers['traceresponse'])
+    spans = [span for span in _spans(traced_app) if span['trace_id'] == trace_id]
+    by_name = {span['name']: span for span in spans}
+    assert sampled and by_name['GET /api/media']['span_id'] == root_id
+    assert by_name['GET /api/media']['attributes']['http.status_code'] == 200
+    assert by_name['jwt.verify']['parent_id'] == root_id
+    assert by_name['rbac.authenticated_user']['parent_id'] == root_id
+    # The user lookup runs inside the rbac span, the listing query directly under the request
+    queries = {span['parent_id'] for span in spans if span['name'] == 'db.query'}
+    assert queries == {root_id, by_name['rbac.authenticated_user']['span_id']}
+
+
+def test_incoming_trace_context_is_continued(traced_app, monkeypatch):
+    client = traced_app.test_client()
+    parent = '00-4bf92f3577b34da6a3ce929d0e0e4736-00f067aa0ba902b7-01'
+    response = client.get('/api/posts?page=1&_profile=secret', headers={'traceparent': parent})
+    trace_id, _, _ = parse_traceparent(response.headers['traceresponse'])
+    assert trace_id == '4bf92f3577b34da6a3ce929d0e0e4736'
+    spans = [span for span in _spans(traced_app) if span['trace_id'] == trace_id]
+    root = next(span for span in spans if span['name'] == 'GET /api/posts')
+    assert root['parent_id'] == '00f067aa0ba902b7'
+    assert root['attributes']['http.target'] == '/api/posts?page=1'
+    assert any(span['name'] == 'serialize.post' and span['parent_id'] == root['span_id'] for span in spans)
+
+    # An untrusted caller cannot turn sampling off, nor on
+    unsampled = client.get('/api/posts', headers={'traceparent': parent[:-2] + '00'})
+    assert 'traceresponse' in unsampled.headers
+    monkeypatch.setattr(tracer, 'sample_rate', 0.0)
+    assert 'traceresponse' not in client.get('/api/posts', headers={'traceparent': parent}).headers
+
+    # A trusted one can
+    monkeypatch.setattr(tracer, 'trust_incoming', True)
+    assert 'traceresponse' in client.get('/api/posts', headers={'traceparent': parent}).headers
+    monkeypatch.setattr(tracer, 'sample_rate', 1.0)
+    assert 'traceresponse' not in client.get('/api/posts', headers={'traceparent': parent[:-2] + '00'}).headers
@@ -0,0 +1,47 @@
+"""Trending: snapshots from several workers add up; popular skips drafts."""
+import pytest
+
+from app.models.post import Post
+from app.services.trending import TrendingService, trending
+
+
+@pytest.fixture
+def seeded_app(make_app):
+    return make_app(seed={'n_posts': 2, 'n_tags': 2, 'n_categories': 1, 'n_authors': 1, 'published_ratio': 1.0})
+
+
+def test_worker_snapshots_merge(seeded_app):
+    # Two worker processes, each with its own in-memory rankings
+    first, second = TrendingService(seeded_app), TrendingService(seeded_app)
+    with seeded_app.app_context():
+        for _ in range(3):
+            first.record_view(1)
+        second.record_view(1)
+        first.snapshot()
+        second.snapshot()
+        # The second worker's reload already includes the first one's views
+        assert second.top('24h')[0][1] == pytest.approx(4, rel=1e-3)
+        first.snapshot()
+        assert first.top('24h')[0][1] == pytest.approx(4, rel=1e-3)
+
+        # Nothing pending: the stored score only decays
+        second.snapshot()
+        assert second.top('24h')[0][1] == pytest.approx(4, rel=1e-3)
+
+
+def test_popular_fills_limit_past_drafts(app, client):
+    with app.app_context():
+        drafts = [post.id for post in Post.query.filter_by(status='draft').limit(3)]
+        published = [post.id for post in Post.query.filter_by(status='published').limit(3)]
+    try:
+        for post_id in drafts:
+            for _ in range(5):
+                trending.record_view(post_id)
+        for post_id in published:
+            trending.record_view(post_id)
+
+        response = client.get('/api/analytics/popular?limit=3')
+        assert sorted(post['id'] for post in response.get_json()['posts']) == sorted(published)
+    finally:
+        for post_id in drafts + published:
+            trending.forget(post_id)
@@ -0,0 +1,70 @@
+"""Worker warm-up: caches loaded within the time budget, without side effects."""
+import time
+
+import pytest
+
+from app import db
+from app.models.analytics import PageView
+from app.models.post import Post
+from app.services.background import background
+from app.services.related import related_posts
+from app.services.warmup import warmup
+
+
+SEED = {'n_posts': 30, 'n_tags': 10, 'n_categories': 3, 'n_authors': 2}
+
+
+@pytest.fixture
+def seeded_app(make_app):
+    # Rate limited (unlike the shared app), with more list pages than the
+    # default 50 per hour limit allows
+    return make_app(seed=SEED, RATELIMIT_ENABLED=True, WARMUP_LIST_PAGES=60)
+
+
+def _views():
+    return db.session.query(db.func.count(PageView.id)).scalar(), db.session.query(db.func.sum(Post.view_count)).scalar()
+
+
+def test_warmup_loads_caches_without_side_effects(seeded_app):
+    with seeded_app.app_context():
+        views = _views()
+
+    report = warmup.run(seeded_app)
+
+    assert [step['status'] for step in report['steps']] == ['ok'] * len(report['steps'])
+    # Warm-up requests are exempt from rate limits
+    assert all(step.get('errors', 0) == 0 for step in report['steps'])
+    assert report['caches']['related_posts'] > 0
+    assert report['caches']['tag_index'] == 10
+    assert report['caches']['category_index'] == 3
+    with seeded_app.app_context():
+        assert _views() == views
+
+    # Real clients are still limited
+    client = seeded_app.test_client()
+    assert any(client.get('/api/tags').status_code == 429 for _ in range(51))
+
+
+def test_warmup_stops_at_budget(seeded_app):
+    report = warmup.run(seeded_app, budget=0)
+    assert {step['status'] for step in report['steps']} == {'skipped'}
+    assert 'skipped' in warmup.summary()
+
+
+def test_slow_index_builds_do_not_hold_up_warmup(make_app, monkeypatch):
+    app = make_app(seed=SEED, BACKGROUND_WORKERS=1)
+
+    build = related_posts.build_from_db
+    monkeypatch.setattr(related_posts, 'build_from_db', lambda: (time.sleep(1.5), build()))
+    try:
+        report = warmup.run(app, budget=0.5)
+    finally:
+        background.shutdown(wait=True)
+
+    assert report['elapsed_ms'] < 1000
+    steps = {step['name']: step for step in report['steps']}
+    assert steps['indexes']['scheduled'][0] == 'related_posts'
+    assert steps['top_posts']['status'] == 'partial'
+    assert steps['top_posts']['pending'] == ['related_posts']
+    # Finished in the background after warm-up gave up on it
+    assert related_posts.ready
@@ -13,7 +13,27 @@ export default function PostCard({ post }) {
     <article className="post-card">
       {post.featured_image_url && (
         <div className="post-card-image">
-          <img src={post.featured_image_url} alt={post.title} />
+          {post.featured_image ? (
+            <picture>
+              {post.featured_image.sources.map((source) => (
+                <source
+                  key={source.type}
+                  type={source.type}
+                  srcSet={source.srcset}
+                  sizes={post.featured_image.sizes}
+                />
+              ))}
+              <img
+                src={post.featured_image.src}
+                srcSet={post.featured_image.srcset}
+                sizes={post.featured_image.sizes}
+                alt={post.title}
+                loading="lazy"
+              />
+            </picture>
+          ) : (
+            <img src={post.featured_image_url} alt={post.title} />
+          )}
         </div>
       )}
 